@@ -7,7 +7,7 @@ import { LineBasicMaterial, Vector2, MeshStandardMaterial, MeshPhysicalMaterial
 import ReactAudioPlayer from 'react-audio-player';
 import { io } from 'socket.io-client';
 import { logError, getSafeErrorMessage } from '@/lib/error-handler';
-import createAnimation from './converter';
+import createAnimation, { decodeBlendData } from './converter';
 import blinkData from './blendDataBlink.json';
 import * as THREE from 'three';
 import { SRGBColorSpace, LinearSRGBColorSpace } from 'three';
@@ -23,6 +23,16 @@ const _ = require('lodash');
 const host = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://127.0.0.1:5000'
 console.log('🔗 Backend URL:', host); // Debug log to verify URL
 
+// Opt-in interview modes, also set at BUILD time: NEXT_PUBLIC_STREAMING_TURNS, NEXT_PUBLIC_STREAMING_STT
+// and NEXT_PUBLIC_ACKNOWLEDGE = 'true' | 'false'. Unset ones are left to the server's defaults (off).
+// Streaming STT is limited to about 5 minutes per answer.
+const parseFlag = (value) => (value === undefined || value === '' ? undefined : value === 'true');
+const interviewModes = _.omitBy({
+  streaming: parseFlag(process.env.NEXT_PUBLIC_STREAMING_TURNS),
+  streamingStt: parseFlag(process.env.NEXT_PUBLIC_STREAMING_STT),
+  acknowledge: parseFlag(process.env.NEXT_PUBLIC_ACKNOWLEDGE),
+}, _.isUndefined);
+
 function Avatar({ avatar_url, speak, setSpeak, text, setAudioSource, playing, blendData: externalBlendData }) {
 
   let gltf = useGLTF(avatar_url);
@@ -424,6 +434,8 @@ function AppInterviewer() {
   const videoRef = useRef();
   const mediaRecorderRef = useRef();
   const audioChunksRef = useRef([]);
+  const speechQueueRef = useRef([]);  // Streamed sentences waiting for the current one to finish
+  const awaitingResponseRef = useRef(false);  // An acknowledgement played; the real response is on its way
   const transcriptScrollRef = useRef(null);
 
   // UI State
@@ -477,6 +489,9 @@ function AppInterviewer() {
   
   // Use ref to store media stream so cleanup can access it even if component unmounts before async completes
   const mediaStreamRef = useRef(null);
+
+  // Interview in progress ({ id, position }); sent again after a reconnect so the server resumes it
+  const interviewRef = useRef(null);
   
   // Auto-scroll transcript to bottom when new messages arrive
   useEffect(() => {
@@ -510,6 +525,11 @@ function AppInterviewer() {
       console.log(`✅ Connected to server (transport: ${transport})`);
       setConnected(true);
       setStatusMessage('Connected - Ready to start');
+      if (interviewRef.current) {
+        const { id, position } = interviewRef.current;
+        socket.emit('start_interview', { position, interviewId: id, ...interviewModes });
+        setStatusMessage('Reconnected - Resuming interview...');
+      }
     });
 
     socket.on('disconnect', () => {
@@ -522,6 +542,10 @@ function AppInterviewer() {
       console.log('Connection response:', data);
     });
 
+    socket.on('interview_session', (data) => {
+      console.log(data.resumed ? '♻️ Resumed interview:' : '🆕 Interview session:', data.interview_id);
+    });
+
     socket.on('connect_error', (error) => {
       // Cloud Run doesn't support WebSocket transport, so this error is expected
       // Socket.IO will automatically fall back to polling transport
@@ -549,19 +573,30 @@ function AppInterviewer() {
     });
 
     socket.on('avatar_speaks', (data) => {
-      console.log('🎤 Avatar speaking - BlendData frames:', data.blendData?.length || 0);
+      const frames = decodeBlendData(data);
+      console.log('🎤 Avatar speaking - BlendData frames:', frames?.length || 0);
       console.log('📁 Audio file:', data.filename);
       console.log('💬 Transcript:', data.transcript);
       
-      setBlendData(data.blendData);
-      
-      // Construct full audio URL
-      const audioUrl = host + data.filename;
-      console.log('🔊 Setting audio source:', audioUrl);
-      setAudioSource(audioUrl);
+      // Queue behind an acknowledgement that is still playing; without a file
+      // (speech synthesis missed the turn deadline) only the text is shown
+      awaitingResponseRef.current = false;
+      if (data.filename) {
+        const audioUrl = host + data.filename;
+        console.log('🔊 Setting audio source:', audioUrl);
+        speechQueueRef.current.push({ frames, audioUrl });
+        if (speechQueueRef.current.length === 1) {
+          playNextSentence();
+        }
+      }
       
       setAiTranscript(data.transcript || '');
-      setStatusMessage('AI Interviewer is speaking...');
+      // Nothing will play (and end) when there is no audio, so hand the turn back now
+      if (speechQueueRef.current.length) {
+        setStatusMessage('AI Interviewer is speaking...');
+      } else {
+        setStatusMessage('Your turn to speak');
+      }
       
       // Add to conversation history
       if (data.transcript) {
@@ -569,22 +604,29 @@ function AppInterviewer() {
       }
     });
 
+    // Short acknowledgement played while the real response is generated; it is not part of the transcript
+    socket.on('avatar_ack', (data) => {
+      console.log('💬 Acknowledgement:', data.transcript);
+      speechQueueRef.current.push({ frames: decodeBlendData(data), audioUrl: host + data.filename });
+      if (speechQueueRef.current.length === 1) {
+        playNextSentence();
+      }
+      awaitingResponseRef.current = true;
+      setStatusMessage('AI Interviewer is thinking...');
+    });
+
     // Handle streaming chunks from AI
     socket.on('avatar_speaks_chunk', (data) => {
-      console.log('🗣️ Avatar chunk:', data.text_chunk);
-      
-      // Append to current blend data for continuous animation
-      if (data.blendData) {
-        setBlendData(prevData => {
-          if (!prevData) return data.blendData;
-          // Merge animations for smooth streaming
-          return [...prevData, ...data.blendData];
-        });
-      }
+      console.log('🗣️ Avatar chunk:', data.index, data.text_chunk);
+      awaitingResponseRef.current = false;
       
-      // Queue audio for playback
+      // Queue each sentence's audio and animation; play immediately if nothing is speaking
       if (data.filename) {
-        setAudioSource(host + data.filename);
+        speechQueueRef.current.push({ frames: decodeBlendData(data), audioUrl: host + data.filename });
+        // The head of the queue is the sentence currently playing
+        if (speechQueueRef.current.length === 1) {
+          playNextSentence();
+        }
       }
       
       // Append text chunk to transcript
@@ -596,7 +638,44 @@ function AppInterviewer() {
     socket.on('avatar_speaks_complete', (data) => {
       console.log('✅ AI complete:', data.transcript);
       setAiTranscript(data.transcript);
-      setStatusMessage('Your turn to speak');
+      // Text-only sentences queue no audio; if nothing is playing, playerEnded will not reset the status
+      if (!speechQueueRef.current.length) {
+        setStatusMessage('Your turn to speak');
+      }
+      if (data.transcript) {
+        setConversationHistory(prev => [...prev, { role: 'ai', text: data.transcript }]);
+      }
+    });
+
+    // The server stopped buffering this answer (length or memory limit); the rest is dropped
+    socket.on('audio_limit_reached', (data) => {
+      console.warn('⚠️ Audio limit reached:', data);
+      setStatusMessage(`Answer limit reached (${Math.round(data.bufferedSeconds)}s) - stop recording to send your answer`);
+    });
+
+    // The server is at capacity: the answer is queued, or was turned away and should be repeated
+    socket.on('busy', (data) => {
+      console.warn('🚦 Server busy:', data);
+      if (data && data.queued) {
+        setStatusMessage(`Many candidates right now - your answer is queued (about ${Math.ceil(data.expectedWaitSeconds || 1)}s)`);
+      } else {
+        setStatusMessage('The interviewer is busy - please answer again in a few seconds');
+      }
+    });
+
+    // Hands-free mode: the server heard the end of the answer and is already processing it
+    socket.on('turn_closed', (data) => {
+      console.log('🔚 Turn closed by server:', data);
+      if (mediaRecorderRef.current && mediaRecorderRef.current.state === 'recording') {
+        mediaRecorderRef.current.stop();
+      }
+      setIsRecording(false);
+      setStatusMessage('Processing your answer... Please wait');
+    });
+
+    // Live transcript while the candidate is still talking (streaming recognition)
+    socket.on('transcription_interim', (data) => {
+      setUserTranscript(data.transcript);
     });
 
     socket.on('transcription_result', (data) => {
@@ -746,7 +825,12 @@ function AppInterviewer() {
     }
 
     console.log('🎬 Starting interview...');
-    socketRef.current.emit('start_interview', { position: selectedPosition.trim() });
+    interviewRef.current = { id: crypto.randomUUID(), position: selectedPosition.trim() };
+    socketRef.current.emit('start_interview', {
+      position: interviewRef.current.position,
+      interviewId: interviewRef.current.id,
+      ...interviewModes
+    });
     setInterviewStarted(true);
     setUiState('interview');
     setStatusMessage('Interview started - Waiting for AI...');
@@ -874,7 +958,8 @@ function AppInterviewer() {
             
             // Send PCM data to backend
             if (socketRef.current && socketRef.current.connected) {
-              socketRef.current.emit('audio_stream_data', { audio: Array.from(pcmInt16) });
+              // Raw Int16 bytes go out as a binary attachment (no per-sample JSON)
+              socketRef.current.emit('audio_stream_data', { audio: pcmInt16.buffer });
               console.log(`Sent chunk ${audioChunksRef.current.length}: ${pcmInt16.length} samples to backend (total: ${totalSamplesSent}, ${(totalSamplesSent/16000).toFixed(2)}s)`);
             } else {
               console.error('Socket not connected, cannot send audio data');
@@ -951,6 +1036,7 @@ function AppInterviewer() {
     if (socketRef.current) {
       socketRef.current.emit('end_interview');
     }
+    interviewRef.current = null;
     if (mediaStream) {
       mediaStream.getTracks().forEach(track => track.stop());
     }
@@ -983,12 +1069,25 @@ function AppInterviewer() {
     }
   };
 
+  // Start the next queued streamed sentence
+  function playNextSentence() {
+    const next = speechQueueRef.current[0];
+    if (!next) return false;
+    setBlendData(next.frames);
+    setAudioSource(next.audioUrl);
+    return true;
+  }
+
   // Audio player callbacks
   function playerEnded(e) {
     console.log('🎵 Audio ended');
+    if (speechQueueRef.current.length) {
+      speechQueueRef.current.shift();
+      if (playNextSentence()) return;
+    }
     setAudioSource(null);
     setPlaying(false);  // This will trigger the reset in the useEffect above
-    setStatusMessage('Your turn to speak');
+    setStatusMessage(awaitingResponseRef.current ? 'AI Interviewer is thinking...' : 'Your turn to speak');
   }
 
   function playerReady(e) {
@@ -20,7 +20,34 @@ function modifiedKey(key) {
   return key;
 }
 
+// Build tracks straight from server-decimated keyframes (blendFormat: 'keyframes');
+// Three.js interpolates between the surviving keyframes of each channel. The server
+// applies the dense path's 5-frame smoothing before decimating, so it is not repeated here
+function createKeyframeAnimation(keyframes, morphTargetDictionary, bodyPart) {
+  let tracks = [];
+
+  Object.entries(keyframes.tracks).forEach(([key, { times, values }]) => {
+    if (!(modifiedKey(key) in morphTargetDictionary)) {
+      return;
+    }
+
+    const offset = key == 'mouthShrugUpper' ? 0.3 : 0;
+    const adjusted = values.map(value => Math.max(0, Math.min(1, (value + offset) * 0.8)));
+
+    tracks.push(new NumberKeyframeTrack(
+      `${bodyPart}.morphTargetInfluences[${morphTargetDictionary[modifiedKey(key)]}]`,
+      times,
+      adjusted
+    ));
+  });
+
+  return new AnimationClip('animation', keyframes.duration, tracks);
+}
+
 function createAnimation(recordedData, morphTargetDictionary, bodyPart) {
+  if (recordedData && recordedData.format === 'keyframes') {
+    return createKeyframeAnimation(recordedData, morphTargetDictionary, bodyPart);
+  }
   if (recordedData.length != 0) {
     let animation = [];
     for (let i = 0; i < Object.keys(morphTargetDictionary).length; i++) {
@@ -93,4 +120,29 @@ function createAnimation(recordedData, morphTargetDictionary, bodyPart) {
   return null;
 }
 
+// Decode an avatar_speaks payload into frames. Binary payloads carry the shape names
+// once in blendFormat plus one packed frames x shapes buffer (see backend/blend_codec.py)
+export function decodeBlendData(data) {
+  if (data && data.blendKeyframes) {
+    return data.blendKeyframes;
+  }
+  if (!data || !data.blendFormat || !data.blendBuffer) {
+    return data ? data.blendData : null;
+  }
+
+  const { format, shapes, frames, scale = 1 } = data.blendFormat;
+  const ArrayType = { f32: Float32Array, u16: Uint16Array, u8: Uint8Array }[format];
+  const values = new ArrayType(data.blendBuffer);
+
+  let decoded = [];
+  for (let f = 0; f < frames; f++) {
+    let blendshapes = {};
+    for (let s = 0; s < shapes.length; s++) {
+      blendshapes[shapes[s]] = values[f * shapes.length + s] * scale;
+    }
+    decoded.push({ blendshapes });
+  }
+  return decoded;
+}
+
 export default createAnimation;
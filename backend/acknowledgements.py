@@ -0,0 +1,77 @@
+"""
+Pre-synthesized acknowledgement clips
+Short phrases ("Thanks, that's helpful.") synthesized once and kept in memory,
+so the avatar can react the moment an answer is transcribed while the real
+response is still being generated
+"""
+
+import random
+import threading
+
+DEFAULT_PHRASES = (
+    "Thanks, that's helpful.",
+    'Okay, got it.',
+    'Mm-hmm, I see.',
+    'Thank you for sharing that.',
+    'Alright, that makes sense.',
+    'Great, thanks.',
+)
+
+
+class AcknowledgementPool:
+    """Phrase -> (audio bytes, animation clip), filled once in the background"""
+
+    def __init__(self, phrases, synthesize):
+        self.phrases = [phrase for phrase in phrases if phrase.strip()]
+        self.synthesize = synthesize  # synthesize(text) -> (audio_bytes, clip)
+        self._clips = {}
+        self._lock = threading.Lock()
+        self._warming = False
+        self.failures = 0
+
+    @property
+    def ready(self):
+        return bool(self._clips)
+
+    def warm(self):
+        """Synthesize every phrase (blocking); phrases that fail are left out"""
+        for phrase in self.phrases:
+            if phrase in self._clips:
+                continue
+            try:
+                audio_bytes, clip = self.synthesize(phrase)
+                with self._lock:
+                    self._clips[phrase] = (audio_bytes, clip)
+            except Exception as e:
+                self.failures += 1
+                print(f'⚠️ Could not synthesize acknowledgement "{phrase}": {str(e)}')
+        print(f'✅ Acknowledgement clips ready: {len(self._clips)}/{len(self.phrases)}')
+        if not self._clips:
+            self._warming = False  # Try again on the next session that asks
+        return len(self._clips)
+
+    def ensure_warm(self, spawn):
+        """Start warming in the background the first time it is needed"""
+        with self._lock:
+            if self._warming:
+                return
+            self._warming = True
+        spawn(self.warm)
+
+    def pick(self, exclude=None):
+        """(phrase, audio_bytes, clip) at random, avoiding exclude when possible; None before warm-up"""
+        with self._lock:
+            phrases = [phrase for phrase in self._clips if phrase != exclude] or list(self._clips)
+            if not phrases:
+                return None
+            phrase = random.choice(phrases)
+            return (phrase,) + self._clips[phrase]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'phrases': len(self.phrases),
+                'ready': len(self._clips),
+                'bytes': sum(len(audio_bytes) + clip.nbytes for audio_bytes, clip in self._clips.values()),
+                'failures': self.failures,
+            }
@@ -0,0 +1,159 @@
+"""
+Admission control for interview turns
+Caps how many turns (recognition, Gemini, speech) run at once in the worker;
+the excess waits in a bounded FIFO queue for a limited time. A queue that
+stays non-empty means sustained overload, and admitted turns are then told
+to shed work (cached or text-only speech instead of fresh synthesis)
+"""
+
+import threading
+import time
+from collections import deque
+
+from metrics import LatencyStats
+
+
+class LoadShed(RuntimeError):
+    """Work skipped to shed load"""
+
+
+class Ticket:
+    """One admitted turn; hand it back to release()"""
+
+    def __init__(self, waited, shed):
+        self.waited = waited  # Seconds spent in the queue
+        self.shed = shed  # Admitted under sustained overload: skip optional work
+        self.admitted_at = time.perf_counter()
+
+
+class _Waiter:
+    def __init__(self):
+        self.granted = threading.Event()
+        self.abandoned = False
+
+
+class AdmissionController:
+    """Concurrency cap with a bounded, time-limited FIFO queue
+
+    Slots are handed directly from a finishing turn to the oldest waiter, so
+    queued turns are admitted in order. shed_after_seconds of continuous
+    queueing marks the worker overloaded.
+    """
+
+    def __init__(self, max_in_flight=8, max_queue=32, max_wait_seconds=10.0, shed_after_seconds=5.0,
+                 typical_turn_seconds=3.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.shed_after_seconds = shed_after_seconds
+        self.typical_turn_seconds = typical_turn_seconds  # Service time guess until turns have finished
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._queued_since = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.peak_queue_depth = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0  # Queue full
+        self.timed_out = 0  # Waited max_wait_seconds without a slot
+        self.shed = {}  # What admitted turns skipped under overload, by kind
+        self.wait = LatencyStats()
+        self.service = LatencyStats()
+
+    def _overloaded(self, now):
+        return self._queued_since is not None and now - self._queued_since >= self.shed_after_seconds
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def overloaded(self):
+        with self._lock:
+            return self._overloaded(time.monotonic())
+
+    def expected_wait(self, position):
+        """Rough seconds until the position-th waiter (1-based) gets a slot"""
+        mean = self.service.total / self.service.count if self.service.count else self.typical_turn_seconds
+        return mean * position / max(self.max_in_flight, 1)
+
+    def admit(self, on_queued=None):
+        """Ticket once a slot is free, or None when the queue is full or the wait runs out
+
+        on_queued(position, expected_wait_seconds) is called if the turn has to wait.
+        """
+        queued_at = time.perf_counter()
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._queue:
+                return self._grant(0.0)
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                return None
+            waiter = _Waiter()
+            self._queue.append(waiter)
+            if self._queued_since is None:
+                self._queued_since = time.monotonic()
+            self.queued += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, len(self._queue))
+            position = len(self._queue)
+        if on_queued is not None:
+            on_queued(position, self.expected_wait(position))
+
+        granted = waiter.granted.wait(self.max_wait_seconds)
+        with self._lock:
+            if not granted and not waiter.granted.is_set():
+                waiter.abandoned = True
+                self._queue.remove(waiter)
+                if not self._queue:
+                    self._queued_since = None
+                self.timed_out += 1
+                return None
+            # The releasing turn already counted this slot as in flight
+            return self._ticket(time.perf_counter() - queued_at)
+
+    def _grant(self, waited):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return self._ticket(waited)
+
+    def _ticket(self, waited):
+        self.admitted += 1
+        self.wait.record(waited)
+        return Ticket(waited, self._overloaded(time.monotonic()))
+
+    def release(self, ticket):
+        """Finish a turn; its slot goes to the oldest waiter, if any"""
+        self.service.record(time.perf_counter() - ticket.admitted_at)
+        with self._lock:
+            while self._queue:
+                waiter = self._queue.popleft()
+                if not self._queue:
+                    self._queued_since = None
+                if not waiter.abandoned:
+                    waiter.granted.set()
+                    return
+            self.in_flight -= 1
+
+    def record_shed(self, kind):
+        with self._lock:
+            self.shed[kind] = self.shed.get(kind, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'queue_depth': len(self._queue),
+                'max_queue': self.max_queue,
+                'peak_queue_depth': self.peak_queue_depth,
+                'overloaded': self._overloaded(time.monotonic()),
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'shed': dict(self.shed),
+            }
+        counters['wait'] = self.wait.snapshot()
+        counters['service'] = self.service.snapshot()
+        return counters
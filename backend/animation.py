@@ -0,0 +1,157 @@
+"""
+Blend shape animation engine for AI Interviewer Avatar
+Computes a whole lip-sync clip as one frames x shapes float array
+"""
+
+import numpy as np
+
+# Animation timing
+FPS = 60
+NEUTRAL_TAIL_FRAMES = 30  # Extended neutral closing (0.5 seconds)
+DAMPING = 0.6  # Reduce all values by 40% for more subtle movement
+
+# Simplified, slower phoneme cycle for natural speech
+PHONEME_CYCLE = ['sil', 'AA', 'EH', 'OW', 'M', 'sil']
+
+# Viseme mapping: Maps phonemes to facial blend shape indices
+PHONEME_TO_VISEME_MAP = {
+    # Silence
+    'sil': 0, 'pau': 0,
+
+    # Vowels
+    'AA': 1, 'aa': 1, 'AE': 2, 'ae': 2, 'AH': 3, 'ah': 3,
+    'AO': 4, 'ao': 4, 'AW': 5, 'aw': 5, 'AY': 6, 'ay': 6,
+    'EH': 7, 'eh': 7, 'ER': 8, 'er': 8, 'EY': 9, 'ey': 9,
+    'IH': 10, 'ih': 10, 'IY': 11, 'iy': 11, 'OW': 12, 'ow': 12,
+    'OY': 13, 'oy': 13, 'UH': 14, 'uh': 14, 'UW': 15, 'uw': 15,
+
+    # Consonants
+    'B': 16, 'b': 16, 'CH': 17, 'ch': 17, 'D': 18, 'd': 18,
+    'DH': 19, 'dh': 19, 'F': 20, 'f': 20, 'G': 21, 'g': 21,
+    'HH': 22, 'hh': 22, 'JH': 17, 'jh': 17, 'K': 21, 'k': 21,
+    'L': 23, 'l': 23, 'M': 16, 'm': 16, 'N': 18, 'n': 18,
+    'NG': 21, 'ng': 21, 'P': 16, 'p': 16, 'R': 24, 'r': 24,
+    'S': 25, 's': 25, 'SH': 17, 'sh': 17, 'T': 18, 't': 18,
+    'TH': 26, 'th': 26, 'V': 20, 'v': 20, 'W': 15, 'w': 15,
+    'Y': 11, 'y': 11, 'Z': 25, 'z': 25, 'ZH': 17, 'zh': 17,
+}
+
+BLEND_SHAPES = [
+    'mouthClose', 'mouthFunnel', 'mouthPucker', 'mouthLeft', 'mouthRight',
+    'mouthSmileLeft', 'mouthSmileRight', 'mouthFrownLeft', 'mouthFrownRight',
+    'mouthDimpleLeft', 'mouthDimpleRight', 'mouthStretchLeft', 'mouthStretchRight',
+    'mouthRollLower', 'mouthRollUpper', 'mouthShrugLower', 'mouthShrugUpper',
+    'mouthPressLeft', 'mouthPressRight', 'mouthLowerDownLeft', 'mouthLowerDownRight',
+    'mouthUpperUpLeft', 'mouthUpperUpRight', 'browDownLeft', 'browDownRight',
+    'browInnerUp', 'browOuterUpLeft', 'browOuterUpRight', 'cheekPuff', 'cheekSquintLeft',
+    'cheekSquintRight', 'noseSneerLeft', 'noseSneerRight', 'tongueOut', 'jawForward',
+    'jawLeft', 'jawRight', 'jawOpen', 'eyeBlinkLeft', 'eyeBlinkRight',
+    'eyeLookDownLeft', 'eyeLookDownRight', 'eyeLookInLeft', 'eyeLookInRight',
+    'eyeLookOutLeft', 'eyeLookOutRight', 'eyeLookUpLeft', 'eyeLookUpRight',
+    'eyeSquintLeft', 'eyeSquintRight', 'eyeWideLeft', 'eyeWideRight'
+]
+
+
+SHAPE_INDEX = {shape: i for i, shape in enumerate(BLEND_SHAPES)}
+
+# Full-intensity pose per viseme index (shapes not listed stay at 0.0)
+# Silence/neutral (0) is the perfect resting position: relaxed, lips together, jaw closed
+VISEME_POSES = {
+    0: {},
+    1: {'jawOpen': 0.6, 'mouthFunnel': 0.3},  # Open vowels
+    2: {'jawOpen': 0.6, 'mouthFunnel': 0.3},
+    3: {'jawOpen': 0.6, 'mouthFunnel': 0.3},
+    4: {'jawOpen': 0.4, 'mouthFunnel': 0.7, 'mouthPucker': 0.5},  # O sounds
+    12: {'jawOpen': 0.4, 'mouthFunnel': 0.7, 'mouthPucker': 0.5},
+    5: {'jawOpen': 0.5, 'mouthStretchLeft': 0.3, 'mouthStretchRight': 0.3},  # Diphthongs
+    6: {'jawOpen': 0.5, 'mouthStretchLeft': 0.3, 'mouthStretchRight': 0.3},
+    7: {'jawOpen': 0.3, 'mouthSmileLeft': 0.4, 'mouthSmileRight': 0.4},  # E sounds
+    9: {'jawOpen': 0.3, 'mouthSmileLeft': 0.4, 'mouthSmileRight': 0.4},
+    10: {'jawOpen': 0.2, 'mouthStretchLeft': 0.5, 'mouthStretchRight': 0.5},  # I sounds
+    11: {'jawOpen': 0.2, 'mouthStretchLeft': 0.5, 'mouthStretchRight': 0.5},
+    14: {'mouthPucker': 0.7, 'jawOpen': 0.2},  # U sounds
+    15: {'mouthPucker': 0.7, 'jawOpen': 0.2},
+    16: {'mouthClose': 0.9, 'mouthPressLeft': 0.5, 'mouthPressRight': 0.5},  # Bilabials
+    17: {'jawOpen': 0.2, 'mouthFunnel': 0.4},  # Palatals
+    18: {'jawOpen': 0.3, 'mouthRollUpper': 0.3},  # Alveolars
+    19: {'jawOpen': 0.3, 'tongueOut': 0.5},  # Dental
+    20: {'mouthRollLower': 0.6, 'jawOpen': 0.2},  # Labiodentals
+    21: {'jawOpen': 0.4},  # Velars
+    23: {'jawOpen': 0.3, 'tongueOut': 0.3},  # L
+    24: {'mouthFunnel': 0.4, 'jawOpen': 0.3},  # R
+    25: {'mouthStretchLeft': 0.3, 'mouthStretchRight': 0.3, 'jawOpen': 0.1},  # Sibilants
+    26: {'jawOpen': 0.2, 'tongueOut': 0.4},  # TH
+}
+
+
+def _build_pose_table():
+    """Build the read-only viseme x shapes pose table once at import"""
+    table = np.zeros((max(PHONEME_TO_VISEME_MAP.values()) + 1, len(BLEND_SHAPES)), dtype=np.float64)
+    for index, pose in VISEME_POSES.items():
+        for shape, value in pose.items():
+            table[index, SHAPE_INDEX[shape]] = value
+    table.setflags(write=False)
+    return table
+
+
+POSE_TABLE = _build_pose_table()
+NEUTRAL_POSE = POSE_TABLE[PHONEME_TO_VISEME_MAP['sil']]
+
+
+def viseme_index(phoneme):
+    """Look up the viseme index for a phoneme (unknown phonemes map to silence)"""
+    return PHONEME_TO_VISEME_MAP.get(phoneme, 0)
+
+
+def pose_vector(phoneme, intensity=1.0):
+    """Blend shape vector (ordered like BLEND_SHAPES) for a phoneme at the given intensity"""
+    return POSE_TABLE[viseme_index(phoneme)] * intensity
+
+
+def phoneme_to_blend_shapes(phoneme, intensity=1.0):
+    """Convert a phoneme to blend shape values"""
+    return dict(zip(BLEND_SHAPES, pose_vector(phoneme, intensity).tolist()))
+
+
+# Every pose is linear in intensity, so each phoneme in the cycle is a row of the
+# pose table scaled per frame in bulk
+_CYCLE_POSES = POSE_TABLE[[viseme_index(phoneme) for phoneme in PHONEME_CYCLE]]
+
+
+def generate_blend_matrix(text, total_frames):
+    """Generate a (total_frames + neutral tail) x len(BLEND_SHAPES) animation clip"""
+    total_frames = max(int(total_frames), 0)
+    word_count = max(len(text.split()), 1)
+    frames_per_phoneme = max(8, total_frames // (word_count * 3))  # Slower transitions
+
+    frame = np.arange(total_frames)
+    phoneme_index = (frame // frames_per_phoneme) % len(PHONEME_CYCLE)
+
+    # Very subtle intensity (0.2 to 0.5 range for natural look), damped in the same pass
+    phase = (frame % frames_per_phoneme) / frames_per_phoneme
+    intensity = (0.3 + 0.2 * np.sin(phase * np.pi)) * DAMPING
+
+    clip = np.empty((total_frames + NEUTRAL_TAIL_FRAMES, len(BLEND_SHAPES)), dtype=np.float64)
+    np.multiply(_CYCLE_POSES[phoneme_index], intensity[:, None], out=clip[:total_frames])
+    clip[total_frames:] = NEUTRAL_POSE
+    return clip
+
+
+def blend_matrix_from_text(text, speaking_rate=1.0):
+    """Generate an animation clip from text with estimated timing"""
+    word_count = max(len(text.split()), 1)
+
+    # Natural speaking: ~2 words per second, adjusted by rate
+    words_per_second = 2.0 * speaking_rate
+    duration = max(word_count / words_per_second, 0.5)
+    return generate_blend_matrix(text, int(duration * FPS))
+
+
+def blend_matrix_from_duration(text, duration):
+    """Generate an animation clip from text with actual audio duration"""
+    return generate_blend_matrix(text, int(duration * FPS))
+
+
+def blend_matrix_to_frames(clip):
+    """Convert an animation clip to the legacy [{'blendshapes': {...}}, ...] frame list"""
+    return [{'blendshapes': dict(zip(BLEND_SHAPES, row))} for row in clip.tolist()]
@@ -0,0 +1,53 @@
+"""
+Compress candidate PCM before uploading it to Speech-to-Text
+FLAC is lossless; Ogg/Opus is lossy but far smaller. Both need the optional
+soundfile package (libsndfile); without it audio is sent as LINEAR16.
+"""
+
+import io
+
+from pcm_audio import SAMPLE_RATE, pcm_samples
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+ENCODING_LINEAR16 = 'linear16'
+ENCODING_FLAC = 'flac'
+ENCODING_OGG_OPUS = 'ogg_opus'
+STT_ENCODINGS = (ENCODING_LINEAR16, ENCODING_FLAC, ENCODING_OGG_OPUS)
+
+# libsndfile container/subtype per encoding
+_SOUNDFILE_FORMATS = {
+    ENCODING_FLAC: ('FLAC', 'PCM_16'),
+    ENCODING_OGG_OPUS: ('OGG', 'OPUS'),
+}
+
+
+def normalize_stt_encoding(value):
+    value = (value or ENCODING_LINEAR16).lower().replace('-', '_')
+    return value if value in STT_ENCODINGS else ENCODING_LINEAR16
+
+
+def encoding_available(encoding):
+    if encoding == ENCODING_LINEAR16:
+        return True
+    if soundfile is None:
+        return False
+    container, subtype = _SOUNDFILE_FORMATS[encoding]
+    return subtype in soundfile.available_subtypes(container)
+
+
+def encode_pcm(pcm_bytes, encoding):
+    """Return (audio_bytes, encoding) for upload; falls back to raw LINEAR16 when encoding is unavailable"""
+    if encoding == ENCODING_LINEAR16 or not encoding_available(encoding):
+        return pcm_bytes, ENCODING_LINEAR16
+    container, subtype = _SOUNDFILE_FORMATS[encoding]
+    output = io.BytesIO()
+    try:
+        soundfile.write(output, pcm_samples(pcm_bytes), SAMPLE_RATE, format=container, subtype=subtype)
+    except Exception as e:
+        print(f'⚠️ {encoding} encode failed, sending LINEAR16: {str(e)}')
+        return pcm_bytes, ENCODING_LINEAR16
+    return output.getvalue(), encoding
@@ -0,0 +1,237 @@
+"""
+Content-addressed storage for generated audio files
+Deduplicates identical outputs, evicts by age and LRU against a disk budget,
+and keeps recently synthesized files hot in memory for serving
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+# Only finished content-hashed files are ever served (never temp files or anything else in the directory)
+STORED_NAME = re.compile(r'[0-9a-f]{32}\.mp3')
+
+
+class AudioStore:
+    """MP3 files named by content hash, with size tracking and eviction"""
+
+    def __init__(self, directory, max_bytes=500 * 1024 * 1024, max_age_seconds=24 * 3600,
+                 pin_seconds=15 * 60, sweep_interval_seconds=60, hot_max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.pin_seconds = pin_seconds  # Files referenced this recently are never evicted
+        self.sweep_interval_seconds = sweep_interval_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._files = OrderedDict()  # filename -> [size, created_at, last_used_at], LRU order
+        self._bytes = 0
+        self._last_sweep = 0.0
+
+        # Bounded in-memory copy of recent files: filename -> (bytes, etag), LRU order
+        self.hot_max_bytes = hot_max_bytes
+        self._hot = OrderedDict()
+        self._hot_bytes = 0
+        self.hot_hits = 0
+        self.disk_reads = 0
+
+        self.writes = 0
+        self.deduplicated = 0
+        self.evicted_by_age = 0
+        self.evicted_by_budget = 0
+
+        # Index files left over from a previous run (oldest first)
+        existing = sorted(
+            (entry for entry in os.scandir(directory) if entry.is_file() and entry.name.endswith('.mp3')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in existing:
+            stat = entry.stat()
+            self._files[entry.name] = [stat.st_size, stat.st_mtime, stat.st_mtime]
+            self._bytes += stat.st_size
+
+    @staticmethod
+    def filename_for(audio_bytes):
+        """Content-addressed filename for audio bytes"""
+        return f'{hashlib.sha256(audio_bytes).hexdigest()[:32]}.mp3'
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def put(self, audio_bytes, source_path=None):
+        """Store audio (once per distinct content) and return its filename
+
+        source_path is an existing file holding the same bytes (e.g. the TTS
+        cache's copy); it is hard-linked instead of written out again.
+        """
+        filename = self.filename_for(audio_bytes)
+        now = time.time()
+
+        with self._lock:
+            if filename in self._files and os.path.exists(self.path(filename)):
+                self._files[filename][2] = now
+                self._files.move_to_end(filename)
+                self.deduplicated += 1
+                self._remember_hot(filename, audio_bytes, etag=filename[:-len('.mp3')])
+                return filename
+
+        # Link the existing copy, or write to a temp file of our own first, so readers never
+        # see a partial file and concurrent puts of the same audio never share one
+        filepath = self.path(filename)
+        if not self._link(source_path, filepath, len(audio_bytes)):
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as audio_file:
+                    audio_file.write(audio_bytes)
+                os.replace(temp_path, filepath)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+
+        with self._lock:
+            previous = self._files.pop(filename, None)
+            if previous:
+                self._bytes -= previous[0]
+            self._files[filename] = [len(audio_bytes), now, now]
+            self._bytes += len(audio_bytes)
+            self.writes += 1
+            # The client fetches right after avatar_speaks, so serve that fetch from memory
+            self._remember_hot(filename, audio_bytes, etag=filename[:-len('.mp3')])
+            sweep_due = self._bytes > self.max_bytes or now - self._last_sweep >= self.sweep_interval_seconds
+        if sweep_due:
+            self.evict()
+        return filename
+
+    @staticmethod
+    def _link(source_path, filepath, size):
+        """Hard-link source_path as filepath (atomic, so never partial); False to write a copy instead"""
+        if source_path is None:
+            return False
+        try:
+            if os.path.getsize(source_path) != size:
+                return False
+            os.link(source_path, filepath)
+        except FileExistsError:
+            pass  # Content-addressed: whatever is already there holds the same bytes
+        except OSError:
+            return False  # Source gone, another filesystem, or no hard link support
+        return True
+
+    def touch(self, filename):
+        """Mark a file as referenced (emitted or served) so it stays pinned"""
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is None:
+                return False
+            entry[2] = time.time()
+            self._files.move_to_end(filename)
+            return True
+
+    def read(self, filename):
+        """Return (audio_bytes, etag) from memory or disk, or None if the file is gone"""
+        if not STORED_NAME.fullmatch(filename):
+            return None
+        with self._lock:
+            entry = self._hot.get(filename)
+            if entry is not None:
+                self._hot.move_to_end(filename)
+                self.hot_hits += 1
+                return entry
+
+        filepath = self.path(filename)
+        try:
+            with open(filepath, 'rb') as audio_file:
+                audio_bytes = audio_file.read()
+        except OSError:
+            return None
+
+        with self._lock:
+            self.disk_reads += 1
+            return self._remember_hot(filename, audio_bytes)
+
+    def _remember_hot(self, filename, audio_bytes, etag=None):
+        """Add a file to the in-memory LRU (caller holds the lock)"""
+        entry = (audio_bytes, etag or self.etag_for(filename, audio_bytes))
+        if len(audio_bytes) > self.hot_max_bytes:
+            return entry
+        previous = self._hot.pop(filename, None)
+        if previous:
+            self._hot_bytes -= len(previous[0])
+        self._hot[filename] = entry
+        self._hot_bytes += len(audio_bytes)
+        while self._hot_bytes > self.hot_max_bytes:
+            _, (evicted, _) = self._hot.popitem(last=False)
+            self._hot_bytes -= len(evicted)
+        return entry
+
+    def etag_for(self, filename, audio_bytes):
+        """Strong ETag: the content hash (already the name for content-addressed files)"""
+        if filename == self.filename_for(audio_bytes):
+            return filename[:-len('.mp3')]
+        return hashlib.sha256(audio_bytes).hexdigest()[:32]
+
+    def contains(self, filename):
+        with self._lock:
+            return filename in self._files
+
+    def evict(self):
+        """Drop files past max age, then least recently used files until under budget"""
+        now = time.time()
+        victims = []
+        with self._lock:
+            self._last_sweep = now
+            for filename, (size, created_at, last_used_at) in list(self._files.items()):
+                if now - last_used_at < self.pin_seconds:
+                    continue
+                if now - created_at > self.max_age_seconds:
+                    victims.append(filename)
+                    self._forget(filename)
+                    self.evicted_by_age += 1
+
+            for filename, (size, created_at, last_used_at) in list(self._files.items()):
+                if self._bytes <= self.max_bytes:
+                    break
+                if now - last_used_at < self.pin_seconds:
+                    continue
+                victims.append(filename)
+                self._forget(filename)
+                self.evicted_by_budget += 1
+
+        for filename in victims:
+            try:
+                os.remove(self.path(filename))
+            except OSError:
+                pass
+        return len(victims)
+
+    def _forget(self, filename):
+        size = self._files.pop(filename)[0]
+        self._bytes -= size
+        hot = self._hot.pop(filename, None)
+        if hot:
+            self._hot_bytes -= len(hot[0])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'bytes': self._bytes,
+                'files': len(self._files),
+                'max_bytes': self.max_bytes,
+                'writes': self.writes,
+                'deduplicated': self.deduplicated,
+                'evicted_by_age': self.evicted_by_age,
+                'evicted_by_budget': self.evicted_by_budget,
+                'hot_bytes': self._hot_bytes,
+                'hot_files': len(self._hot),
+                'hot_hits': self.hot_hits,
+                'disk_reads': self.disk_reads,
+            }
@@ -0,0 +1,91 @@
+"""Benchmark a burst of interview turns against a worker with fixed capacity: unbounded vs admission control
+
+The fake worker has CAPACITY turns' worth of throughput; every turn beyond
+that slows all in-flight turns down proportionally (shared CPU, provider
+quota, event loop). Turns arrive faster than the worker can serve them.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission import AdmissionController
+from metrics import LatencyStats
+
+TURNS = 120
+ARRIVAL_INTERVAL = 0.002  # One turn every 2 ms (scaled), about 2x what the worker can serve
+CAPACITY = 4
+TURN_SECONDS = 0.015  # Service time of one turn on an idle worker (scaled)
+TIME_SCALE = 0.01  # Reported in unscaled seconds: 1.5 s per turn
+
+
+class Worker:
+    """Processor sharing: each turn progresses at min(1, CAPACITY / active) speed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def serve(self):
+        with self._lock:
+            self.active += 1
+        try:
+            work = TURN_SECONDS
+            while work > 0:
+                with self._lock:
+                    speed = min(1.0, CAPACITY / self.active)
+                time.sleep(0.001)
+                work -= 0.001 * speed
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def scenario(name, admission):
+    worker = Worker()
+    stats = LatencyStats(window=TURNS)
+    refused = [0]
+
+    def turn(arrived_at):
+        ticket = None
+        if admission is not None:
+            ticket = admission.admit()
+            if ticket is None:
+                refused[0] += 1
+                return
+        try:
+            worker.serve()
+        finally:
+            if ticket is not None:
+                admission.release(ticket)
+        stats.record(time.perf_counter() - arrived_at)
+
+    with ThreadPoolExecutor(TURNS) as executor:
+        for _ in range(TURNS):
+            executor.submit(turn, time.perf_counter())
+            time.sleep(ARRIVAL_INTERVAL)
+    snap = stats.snapshot()
+    scale = 1 / TIME_SCALE
+    print(f"{name:>22} {snap['count']:>7} {refused[0]:>8} {snap['p50'] * scale:>7.1f} {snap['p95'] * scale:>7.1f} "
+          f"{snap['max'] * scale:>7.1f}")
+    return snap, refused[0]
+
+
+print(f"{TURNS} turns arriving every {ARRIVAL_INTERVAL / TIME_SCALE:.1f}s; worker capacity {CAPACITY} turns "
+      f"of {TURN_SECONDS / TIME_SCALE:.1f}s")
+print("\n" + "=" * 64)
+print(f"{'worker':>22} {'served':>7} {'refused':>8} {'p50':>7} {'p95':>7} {'max':>7}  (s)")
+print("=" * 64)
+unbounded, _ = scenario('unbounded', None)
+controller = AdmissionController(max_in_flight=CAPACITY, max_queue=4 * CAPACITY,
+                                 max_wait_seconds=10 * TURN_SECONDS, shed_after_seconds=5 * TURN_SECONDS)
+bounded, refused = scenario('admission control', controller)
+print("=" * 64)
+
+assert bounded['p95'] < unbounded['p95'], (bounded['p95'], unbounded['p95'])
+print(f"\n[OK] p95 of served turns {unbounded['p95'] / TIME_SCALE:.1f}s unbounded -> "
+      f"{bounded['p95'] / TIME_SCALE:.1f}s with admission control ({refused} turns told to retry, "
+      f"peak queue {controller.peak_queue_depth})")
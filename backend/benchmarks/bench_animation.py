@@ -0,0 +1,69 @@
+"""Benchmark per-clip CPU time of the blend shape animation engine vs. the per-frame loop"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import (
+    FPS, NEUTRAL_TAIL_FRAMES, PHONEME_CYCLE, phoneme_to_blend_shapes,
+    blend_matrix_from_duration, blend_matrix_to_frames,
+)
+
+TEXT = ' '.join(['interview'] * 75)  # ~30 seconds of speech at 2.5 words per second
+DURATIONS = [2, 5, 10, 30, 60, 120]
+REPEATS = 5
+
+
+def legacy_blend_data(text, duration):
+    """Original frame-by-frame implementation (one dict per frame, scaled key by key)"""
+    total_frames = int(duration * FPS)
+    blend_data = []
+    word_count = max(len(text.split()), 1)
+    cycle_length = len(PHONEME_CYCLE)
+    frames_per_phoneme = max(8, total_frames // (word_count * 3))
+
+    for frame in range(total_frames):
+        phoneme = PHONEME_CYCLE[(frame // frames_per_phoneme) % cycle_length]
+        phase = (frame % frames_per_phoneme) / frames_per_phoneme
+        intensity = 0.3 + 0.2 * math.sin(phase * math.pi)
+        blend_values = phoneme_to_blend_shapes(phoneme, intensity)
+        for key in blend_values:
+            blend_values[key] *= 0.6
+        blend_data.append({'blendshapes': blend_values})
+
+    neutral_values = phoneme_to_blend_shapes('sil', 1.0)
+    for _ in range(NEUTRAL_TAIL_FRAMES):
+        blend_data.append({'blendshapes': neutral_values})
+    return blend_data
+
+
+def best_of(fn, *args):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.process_time()
+        fn(*args)
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+# Sanity check: both paths produce the same animation
+legacy = legacy_blend_data(TEXT, 3.0)
+engine = blend_matrix_to_frames(blend_matrix_from_duration(TEXT, 3.0))
+assert len(legacy) == len(engine)
+for old, new in zip(legacy, engine):
+    for shape, value in old['blendshapes'].items():
+        assert abs(value - new['blendshapes'][shape]) < 1e-9, shape
+print('[OK] Engine output matches the per-frame implementation')
+
+print("\n" + "=" * 72)
+print(f"{'duration':>9} {'frames':>7} {'legacy ms':>10} {'matrix ms':>10} {'matrix+frames ms':>17} {'speedup':>8}")
+print("=" * 72)
+for duration in DURATIONS:
+    frames = int(duration * FPS) + NEUTRAL_TAIL_FRAMES
+    legacy_ms = best_of(legacy_blend_data, TEXT, duration)
+    matrix_ms = best_of(blend_matrix_from_duration, TEXT, duration)
+    frames_ms = best_of(lambda t, d: blend_matrix_to_frames(blend_matrix_from_duration(t, d)), TEXT, duration)
+    print(f"{duration:>8}s {frames:>7} {legacy_ms:>10.2f} {matrix_ms:>10.3f} {frames_ms:>17.2f} {legacy_ms / max(matrix_ms, 1e-6):>7.0f}x")
+print("=" * 72)
@@ -0,0 +1,75 @@
+"""Benchmark how a slow blocking provider call stalls the gevent hub, called directly vs through ProviderPool
+
+A heartbeat greenlet wakes every 10 ms (a stand-in for socket I/O of other
+interviews); its lateness is the delay every other session would see.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gevent
+
+from metrics import LatencyStats
+from offload import ProviderPool
+
+# A native sleep blocks the calling OS thread exactly like a blocking gRPC/HTTP call does
+blocking_sleep = monkey.get_original('time', 'sleep')
+
+SLOW_CALL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 0.01
+
+
+class FakeTTSClient:
+    def synthesize_speech(self, seconds):
+        blocking_sleep(seconds)
+        return b'audio'
+
+
+def heartbeat(stats, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        gevent.sleep(HEARTBEAT_SECONDS)
+        stats.record(max(0.0, time.perf_counter() - started - HEARTBEAT_SECONDS))
+
+
+def scenario(name, calls, call):
+    stats = LatencyStats(window=100000)
+    stop = gevent.event.Event()
+    beat = gevent.spawn(heartbeat, stats, stop)
+    gevent.sleep(0.05)
+    started = time.perf_counter()
+    gevent.joinall([gevent.spawn(call) for _ in range(calls)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    beat.join()
+    lag = stats.snapshot()
+    print(f"{name:>34} {calls:>6} {elapsed:>9.2f} {lag['p50'] * 1000:>9.1f} {lag['p99'] * 1000:>9.1f} "
+          f"{lag['max'] * 1000:>9.1f}")
+    return lag['max']
+
+
+client = FakeTTSClient()
+pool = ProviderPool('tts', size=4, clients=[FakeTTSClient(), FakeTTSClient()])
+
+print(f"slow call: {SLOW_CALL_SECONDS}s of blocking I/O; heartbeat every {HEARTBEAT_SECONDS * 1000:.0f} ms")
+print("\n" + "=" * 100)
+print(f"{'path':>34} {'calls':>6} {'wall s':>9} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}  (ms)")
+print("=" * 100)
+direct_max = scenario('direct call on the hub', 1, lambda: client.synthesize_speech(SLOW_CALL_SECONDS))
+pooled_max = scenario('ProviderPool (4 threads)', 1, lambda: pool.run(pool.client.synthesize_speech, SLOW_CALL_SECONDS))
+scenario('direct, 4 concurrent sessions', 4, lambda: client.synthesize_speech(SLOW_CALL_SECONDS))
+scenario('ProviderPool, 4 concurrent sessions', 4, lambda: pool.run(pool.client.synthesize_speech, SLOW_CALL_SECONDS))
+scenario('ProviderPool, 8 sessions (2 waves)', 8, lambda: pool.run(pool.client.synthesize_speech, SLOW_CALL_SECONDS))
+print("=" * 100)
+print(f"pool stats: {pool.stats()}")
+
+# The guarantee: a slow call through the pool never holds the hub for more than a few ticks
+assert pooled_max < 0.05, pooled_max
+assert direct_max > SLOW_CALL_SECONDS * 0.9, direct_max
+print(f"\n[OK] max heartbeat delay {direct_max * 1000:.0f} ms direct vs {pooled_max * 1000:.1f} ms pooled")
@@ -0,0 +1,89 @@
+"""Benchmark ingesting a 60 second answer: JSON int lists vs binary Int16 attachments"""
+import array
+import json
+import math
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from pcm_audio import SAMPLE_RATE, SAMPLE_WIDTH, PCMBuffer, pcm_chunk_bytes, peak_amplitude, sample_count
+
+SECONDS = 60
+CHUNK_SECONDS = 0.25
+REPEATS = 3
+
+# Synthetic speech-like signal: a 220 Hz tone with a slow amplitude envelope
+t = np.arange(SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+signal = (8000 * np.sin(2 * math.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * math.pi * 0.3 * t))).astype('<i2')
+chunk_samples = int(CHUNK_SECONDS * SAMPLE_RATE)
+chunks = [signal[i:i + chunk_samples] for i in range(0, len(signal), chunk_samples)]
+
+# What arrives at the server for each chunk
+json_payloads = [json.dumps({'audio': chunk.tolist()}) for chunk in chunks]
+binary_payloads = [chunk.tobytes() for chunk in chunks]
+
+
+def legacy(payloads):
+    """Previous path: JSON list -> list.extend -> array.array + struct.pack at stream end"""
+    buffer = []
+    for payload in payloads:
+        buffer.extend(json.loads(payload)['audio'])
+    audio_array = array.array('h', buffer)
+    peak = max(abs(min(audio_array)), abs(max(audio_array)))
+    return struct.pack(f'{len(buffer)}h', *buffer), peak
+
+
+def json_fallback(payloads):
+    """JSON list packed once per chunk into the session bytearray"""
+    buffer = bytearray()
+    for payload in payloads:
+        buffer += pcm_chunk_bytes(json.loads(payload)['audio'])
+    return bytes(buffer), peak_amplitude(buffer)
+
+
+def binary(payloads):
+    """Binary attachments copied straight into the session's preallocated PCMBuffer"""
+    buffer = PCMBuffer(300 * SAMPLE_RATE * SAMPLE_WIDTH, initial_bytes=10 * SAMPLE_RATE * SAMPLE_WIDTH)
+    for payload in payloads:
+        buffer.append(pcm_chunk_bytes(payload))
+    return bytes(buffer.view()), peak_amplitude(buffer.view())
+
+
+def measure(fn, payloads):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(payloads)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(payloads)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best * 1000, peak_memory
+
+
+expected = signal.tobytes()
+print(f"{SECONDS}s answer at {SAMPLE_RATE} Hz in {len(chunks)} chunks of {CHUNK_SECONDS}s "
+      f"({sample_count(expected)} samples, {len(expected) / 1024:.0f} KB of PCM)")
+print("\n" + "=" * 100)
+print(f"{'path':>14} {'wire KB':>9} {'ingest+finalize ms':>19} {'peak alloc MB':>14} {'speedup':>8}")
+print("=" * 100)
+rows = [
+    ('legacy json', legacy, json_payloads),
+    ('json fallback', json_fallback, json_payloads),
+    ('binary', binary, binary_payloads),
+]
+baseline = None
+for name, fn, payloads in rows:
+    (audio_bytes, peak), ms, peak_memory = measure(fn, payloads)
+    assert audio_bytes == expected and peak == int(np.abs(signal.astype(np.int32)).max()), name
+    baseline = baseline or ms
+    wire = sum(len(p) for p in payloads)
+    print(f"{name:>14} {wire / 1024:>9.0f} {ms:>19.1f} {peak_memory / 1024 / 1024:>14.1f} {baseline / ms:>7.1f}x")
+print("=" * 100)
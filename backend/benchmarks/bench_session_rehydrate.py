@@ -0,0 +1,81 @@
+"""Benchmark rebuilding a Gemini chat from a stored interview, by history length and store backend
+
+Measures what a worker that has never seen the interview pays before its first
+send_message(): loading the turns, building the chat history and start_chat().
+start_chat() makes no request, so no credentials are needed.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_store import (
+    ROLE_CANDIDATE, ROLE_INTERVIEWER, MemorySessionStore, SQLiteSessionStore, chat_history,
+)
+
+try:
+    import vertexai
+    from vertexai.preview.generative_models import Content, GenerativeModel, Part
+    vertexai.init(project='bench', location='us-central1')
+    model = GenerativeModel('gemini-2.0-flash')
+except Exception as e:
+    print(f'vertexai unavailable ({e}) - timing history building only')
+    model = None
+
+TURNS = [2, 10, 40, 100, 200]
+REPEATS = 20
+QUESTION = 'That makes sense. Could you walk me through how you handled the rollout, and what you would do differently? '
+ANSWER = ('So we started by putting the new path behind a flag and ramping it per region while watching error '
+          'rates and latency, and when the p99 moved we rolled back and added caching in front of the lookup. ') * 2
+CONTEXT = 'You are Alicia, a professional AI interviewer. Continue the interview.'
+
+
+def fill(store, interview_id, turns):
+    store.create(interview_id, 'Software Engineer')
+    for i in range(turns):
+        store.append(interview_id, ROLE_INTERVIEWER if i % 2 == 0 else ROLE_CANDIDATE, QUESTION if i % 2 == 0 else ANSWER)
+
+
+def rehydrate(store, interview_id):
+    started = time.perf_counter()
+    record = store.load(interview_id)
+    loaded = time.perf_counter()
+    messages = chat_history(record, CONTEXT)
+    if model is not None:
+        model.start_chat(history=[Content(role=role, parts=[Part.from_text(text)]) for role, text in messages])
+    return loaded - started, time.perf_counter() - loaded
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+with tempfile.TemporaryDirectory() as directory:
+    stores = {
+        'memory': MemorySessionStore(),
+        'sqlite': SQLiteSessionStore(os.path.join(directory, 'sessions.db')),
+    }
+    print(f"{REPEATS} repeats per row, median reported; turns alternate interviewer question / candidate answer")
+    print("\n" + "=" * 100)
+    print(f"{'backend':>8} {'turns':>6} {'history KB':>11} {'append ms':>10} {'load ms':>9} {'build ms':>9} {'total ms':>9}")
+    print("=" * 100)
+    for name, store in stores.items():
+        for turns in TURNS:
+            interview_id = f'{name}-{turns}'
+            started = time.perf_counter()
+            fill(store, interview_id, turns)
+            append_ms = (time.perf_counter() - started) * 1000 / (turns + 1)
+            size = sum(len(turn['content']) for turn in store.load(interview_id)['turns']) / 1024
+            samples = [rehydrate(store, interview_id) for _ in range(REPEATS)]
+            load = median([sample[0] for sample in samples]) * 1000
+            build = median([sample[1] for sample in samples]) * 1000
+            print(f"{name:>8} {turns:>6} {size:>11.1f} {append_ms:>10.3f} {load:>9.3f} {build:>9.3f} "
+                  f"{load + build:>9.3f}")
+    print("=" * 100)
+
+    # A restarted process sees the same interview through a fresh connection
+    reopened = SQLiteSessionStore(os.path.join(directory, 'sessions.db'))
+    assert reopened.load('sqlite-40')['turns'] == stores['sqlite'].load('sqlite-40')['turns']
+    print('[OK] sqlite history survives reopening the store')
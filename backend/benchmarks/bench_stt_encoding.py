@@ -0,0 +1,58 @@
+"""Benchmark compressing candidate answers before STT upload: encode CPU cost vs bytes saved"""
+import io
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from audio_encoding import STT_ENCODINGS, encode_pcm, encoding_available, soundfile
+from pcm_audio import SAMPLE_RATE
+
+DURATIONS = [10, 60, 180]
+REPEATS = 3
+UPLINK_MBPS = 20  # Rough egress bandwidth for the upload time estimate
+
+
+def speech_like(seconds, seed=0):
+    """Voiced tone with syllable-rate envelope, pauses, and a little room noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = np.clip(np.sin(2 * math.pi * 4 * t), 0, None) * (np.sin(2 * math.pi * 0.2 * t) > -0.3)
+    voiced = 6000 * envelope * (np.sin(2 * math.pi * 160 * t) + 0.4 * np.sin(2 * math.pi * 480 * t))
+    return (voiced + rng.normal(0, 60, len(t))).astype('<i2').tobytes()
+
+
+if soundfile is None:
+    print('soundfile is not installed - only LINEAR16 is available (pip install soundfile)')
+
+# Sanity check: FLAC is lossless
+if encoding_available('flac'):
+    pcm = speech_like(3)
+    flac, _ = encode_pcm(pcm, 'flac')
+    decoded, _ = soundfile.read(io.BytesIO(flac), dtype='int16')
+    assert decoded.tobytes() == pcm
+    print('[OK] flac round trip is bit exact')
+
+print("\n" + "=" * 100)
+print(f"{'duration':>9} {'encoding':>9} {'KB':>9} {'ratio':>7} {'encode ms':>10} {'ms/audio s':>11} "
+      f"{'upload ms @' + str(UPLINK_MBPS) + 'Mbps':>19}")
+print("=" * 100)
+for duration in DURATIONS:
+    pcm = speech_like(duration)
+    for encoding in STT_ENCODINGS:
+        if not encoding_available(encoding):
+            print(f"{duration:>8}s {encoding:>9} {'unavailable':>9}")
+            continue
+        best = float('inf')
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            payload, _ = encode_pcm(pcm, encoding)
+            best = min(best, time.perf_counter() - start)
+        upload_ms = len(payload) * 8 / (UPLINK_MBPS * 1e6) * 1000
+        print(f"{duration:>8}s {encoding:>9} {len(payload) / 1024:>9.0f} {len(pcm) / len(payload):>6.1f}x "
+              f"{best * 1000:>10.1f} {best * 1000 / duration:>11.2f} {upload_ms:>19.0f}")
+print("=" * 100)
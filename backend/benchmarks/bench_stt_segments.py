@@ -0,0 +1,89 @@
+"""Benchmark single-call vs parallel segmented recognition of long answers with a fake recognizer"""
+import os
+import sys
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from pcm_audio import SAMPLE_RATE, SAMPLE_WIDTH
+from stt_routing import recognize_segments, stitch_responses
+from vad import split_at_pauses
+
+DURATIONS = [60, 120, 300]
+WORKERS = [2, 4, 8]
+SEGMENT_SECONDS = 20
+BASE_LATENCY = 0.15          # Fixed cost per request (seconds)
+SECONDS_PER_AUDIO_SECOND = 0.02  # Recognition time per second of audio; ~6s for a 5 minute answer
+WORDS_PER_SECOND = 2.5
+
+
+class FakeSpeechClient:
+    """recognize() that sleeps for a per-request plus per-audio-second latency and returns timed words"""
+
+    def __init__(self, base_latency=BASE_LATENCY, seconds_per_audio_second=SECONDS_PER_AUDIO_SECOND):
+        self.base_latency = base_latency
+        self.seconds_per_audio_second = seconds_per_audio_second
+
+    def recognize(self, config=None, audio=None, timeout=None):
+        seconds = len(audio.content) / (SAMPLE_RATE * SAMPLE_WIDTH)
+        time.sleep(self.base_latency + seconds * self.seconds_per_audio_second)
+        words = [
+            SimpleNamespace(word=f'w{i}', start_time=timedelta(seconds=i / WORDS_PER_SECOND),
+                            end_time=timedelta(seconds=(i + 0.8) / WORDS_PER_SECOND), confidence=0.9)
+            for i in range(int(seconds * WORDS_PER_SECOND))
+        ]
+        alternative = SimpleNamespace(transcript=' '.join(word.word for word in words), confidence=0.9, words=words)
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+def answer(seconds, seed=0):
+    """Phrases of 4-10s of voiced audio separated by 0.4-1.2s pauses"""
+    rng = np.random.default_rng(seed)
+    parts, length = [], 0
+    while length < seconds * SAMPLE_RATE:
+        phrase = int(rng.uniform(4, 10) * SAMPLE_RATE)
+        t = np.arange(phrase) / SAMPLE_RATE
+        parts.append(6000 * np.sin(2 * np.pi * 170 * t))
+        pause = int(rng.uniform(0.4, 1.2) * SAMPLE_RATE)
+        parts.append(rng.normal(0, 40, pause))
+        length += phrase + pause
+    return np.concatenate(parts)[:seconds * SAMPLE_RATE].astype('<i2').tobytes()
+
+
+client = FakeSpeechClient()
+
+
+def recognize_one(segment_bytes):
+    return client.recognize(audio=SimpleNamespace(content=segment_bytes))
+
+
+print(f"fake recognizer: {BASE_LATENCY}s per request + {SECONDS_PER_AUDIO_SECOND}s per audio second; "
+      f"segments up to {SEGMENT_SECONDS}s")
+print("\n" + "=" * 100)
+print(f"{'answer':>7} {'path':>16} {'segments':>9} {'wall s':>8} {'speedup':>8} {'words':>7}")
+print("=" * 100)
+for duration in DURATIONS:
+    pcm = answer(duration)
+    start = time.perf_counter()
+    single = stitch_responses([recognize_one(pcm)], [0.0])
+    single_seconds = time.perf_counter() - start
+    print(f"{duration:>6}s {'single call':>16} {1:>9} {single_seconds:>8.2f} {'1.0x':>8} {len(single['words']):>7}")
+
+    split_start = time.perf_counter()
+    spans = split_at_pauses(pcm, SEGMENT_SECONDS)
+    split_ms = (time.perf_counter() - split_start) * 1000
+    for workers in WORKERS:
+        start = time.perf_counter()
+        stitched = recognize_segments(recognize_one, pcm, spans, workers)
+        elapsed = time.perf_counter() - start
+        starts = [word['start'] for word in stitched['words']]
+        assert starts == sorted(starts), 'stitched word offsets must be in order'
+        assert stitched['words'][-1]['end'] <= duration + 1
+        print(f"{'':>7} {f'{workers} workers':>16} {len(spans):>9} {elapsed:>8.2f} "
+              f"{single_seconds / elapsed:>7.1f}x {len(stitched['words']):>7}")
+    print(f"{'':>7} (pause detection + split: {split_ms:.1f} ms)")
+print("=" * 100)
@@ -0,0 +1,119 @@
+"""Benchmark turn latency (STT -> Gemini -> TTS) with heavy-tailed fake providers: plain calls vs hedging vs hedging + deadlines
+
+Each fake call takes a log-normal latency, and TAIL_PROBABILITY of calls hit
+a Pareto-distributed stall (a slow replica, a GC pause, a retried packet).
+Turns run concurrently through ProviderPools the way the server runs them.
+"""
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlines import Deadline, DeadlineExceeded, Hedger, run_with_deadline
+from metrics import LatencyStats
+from offload import ProviderPool
+
+TURNS = 600
+CONCURRENT_TURNS = 16
+TIME_SCALE = 0.1  # Every latency below is divided by 10 so the run takes seconds, not minutes
+TAIL_PROBABILITY = 0.03
+TAIL_ALPHA = 1.5  # Pareto shape; lower means a heavier tail
+
+# Median latency and tail scale per provider (seconds, before TIME_SCALE)
+PROVIDERS = {
+    'stt': (0.35, 2.0),
+    'llm': (0.9, 4.0),
+    'tts': (0.3, 2.0),
+}
+
+TURN_BUDGET_SECONDS = 3.5 * TIME_SCALE
+LLM_BUDGET_SECONDS = 2.0 * TIME_SCALE
+TTS_BUDGET_SECONDS = 0.8 * TIME_SCALE
+
+
+def sample_latency(rng, median, tail_scale):
+    seconds = median * rng.lognormvariate(0, 0.25)
+    if rng.random() < TAIL_PROBABILITY:
+        seconds += tail_scale * rng.paretovariate(TAIL_ALPHA)
+    return seconds * TIME_SCALE
+
+
+class FakeClient:
+    """One channel of a provider; honours timeout= the way a gRPC call does"""
+
+    def __init__(self, provider, seed):
+        self.median, self.tail_scale = PROVIDERS[provider]
+        self.rng = random.Random(seed)
+
+    def call(self, timeout=None):
+        seconds = sample_latency(self.rng, self.median, self.tail_scale)
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('deadline exceeded')
+        time.sleep(seconds)
+        return 'ok'
+
+
+def build(hedge, seed):
+    pools = {
+        name: ProviderPool(name, 64, [FakeClient(name, seed * 10 + i) for i in range(2)])
+        for name in PROVIDERS
+    }
+    hedgers = {name: Hedger(name, enabled=hedge, max_ratio=0.1) for name in ('stt', 'tts')}
+    return pools, hedgers
+
+
+def run_turn(pools, hedgers, deadlines, fallbacks):
+    started_at = time.perf_counter()
+    turn = Deadline(TURN_BUDGET_SECONDS if deadlines else None)
+    request = lambda client, timeout: client.call(timeout)
+    try:
+        hedgers['stt'].run(pools['stt'], request, turn.within(LLM_BUDGET_SECONDS + TTS_BUDGET_SECONDS))
+    except DeadlineExceeded:
+        fallbacks['stt'] += 1  # The server asks the candidate to repeat
+        return time.perf_counter() - started_at
+    try:
+        run_with_deadline(pools['llm'], turn.within(TTS_BUDGET_SECONDS), 'llm', pools['llm'].client.call)
+    except DeadlineExceeded:
+        fallbacks['llm'] += 1  # Generic follow-up question instead
+    try:
+        hedgers['tts'].run(pools['tts'], request, turn)
+    except DeadlineExceeded:
+        fallbacks['tts'] += 1  # Text without audio
+    return time.perf_counter() - started_at
+
+
+def scenario(name, hedge, deadlines, seed=7):
+    pools, hedgers = build(hedge, seed)
+    fallbacks = {'stt': 0, 'llm': 0, 'tts': 0}
+    stats = LatencyStats(window=TURNS)
+    with ThreadPoolExecutor(CONCURRENT_TURNS) as executor:
+        for seconds in executor.map(lambda _: run_turn(pools, hedgers, deadlines, fallbacks), range(TURNS)):
+            stats.record(seconds)
+    snap = stats.snapshot()
+    hedge_rate = sum(h.hedges for h in hedgers.values()) / max(sum(h.calls for h in hedgers.values()), 1)
+    degraded = sum(fallbacks.values()) / TURNS
+    scale = 1000 / TIME_SCALE  # Report in unscaled milliseconds
+    print(f"{name:>24} {snap['p50'] * scale:>8.0f} {snap['p95'] * scale:>8.0f} {snap['p99'] * scale:>8.0f} "
+          f"{snap['max'] * scale:>8.0f} {hedge_rate:>9.1%} {degraded:>9.1%}  {fallbacks}")
+    return snap
+
+
+print(f"{TURNS} turns, {CONCURRENT_TURNS} concurrent; {TAIL_PROBABILITY:.0%} of calls stall (Pareto alpha {TAIL_ALPHA}); "
+      f"turn budget {TURN_BUDGET_SECONDS / TIME_SCALE:.1f}s")
+print("\n" + "=" * 110)
+print(f"{'pipeline':>24} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'hedged':>9} {'degraded':>9}  (ms)")
+print("=" * 110)
+plain = scenario('plain calls', hedge=False, deadlines=False)
+hedged = scenario('hedged STT/TTS', hedge=True, deadlines=False)
+bounded = scenario('hedged + deadlines', hedge=True, deadlines=True)
+print("=" * 110)
+
+assert hedged['p95'] < plain['p95'], (hedged['p95'], plain['p95'])
+assert bounded['max'] < TURN_BUDGET_SECONDS * 1.2, bounded['max']
+print(f"\n[OK] p95 {plain['p95'] / TIME_SCALE:.2f}s plain -> {hedged['p95'] / TIME_SCALE:.2f}s hedged; "
+      f"p99 {plain['p99'] / TIME_SCALE:.2f}s plain -> {bounded['p99'] / TIME_SCALE:.2f}s with deadlines "
+      f"(max {bounded['max'] / TIME_SCALE:.2f}s)")
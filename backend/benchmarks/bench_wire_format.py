@@ -0,0 +1,73 @@
+"""Benchmark avatar_speaks blend data payload size and serialize time per wire format"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from animation import blend_matrix_from_duration, blend_matrix_to_frames
+from blend_codec import (
+    BINARY_BLEND_FORMATS, decode_blend_buffer, decode_blend_keyframes, encode_blend_keyframes,
+    encode_blend_matrix, smooth_frames,
+)
+
+TEXT = ' '.join(['interview'] * 75)
+DURATIONS = [5, 30, 60, 120]
+REPEATS = 5
+
+
+def serialize_json(clip):
+    return json.dumps({'blendData': blend_matrix_to_frames(clip)}).encode('utf-8')
+
+
+def serialize_binary(clip, blend_format):
+    header, buffer = encode_blend_matrix(clip, blend_format)
+    return json.dumps({'blendFormat': header}).encode('utf-8'), buffer
+
+
+def serialize_keyframes(clip):
+    return json.dumps({'blendKeyframes': encode_blend_keyframes(clip)}).encode('utf-8')
+
+
+def timed(fn, *args):
+    best, result = float('inf'), None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+# Sanity check: quantized formats stay within half a quantization step
+clip = blend_matrix_from_duration(TEXT, 3.0)
+for blend_format, (_, scale) in BINARY_BLEND_FORMATS.items():
+    header, buffer = encode_blend_matrix(clip, blend_format)
+    error = np.abs(decode_blend_buffer(header, buffer) - clip).max()
+    limit = 0.5 / scale if scale else 1e-6
+    assert error <= limit + 1e-9, (blend_format, error)
+    print(f'[OK] {blend_format} round trip max error {error:.2e}')
+keyframes = encode_blend_keyframes(clip)
+error = np.abs(decode_blend_keyframes(keyframes) - smooth_frames(clip)).max()  # Smoothed like the dense path
+assert error <= keyframes['tolerance'] + 1e-4, error  # values are rounded to 4 decimals
+print(f'[OK] keyframes round trip max error {error:.2e} (tolerance {keyframes["tolerance"]})')
+
+print("\n" + "=" * 100)
+print(f"{'duration':>9} {'format':>7} {'payload KB':>11} {'serialize ms':>13} {'vs json':>9}")
+print("=" * 100)
+for duration in DURATIONS:
+    clip = blend_matrix_from_duration(TEXT, duration)
+    payload, json_ms = timed(serialize_json, clip)
+    json_size = len(payload)
+    print(f"{duration:>8}s {'json':>7} {json_size / 1024:>11.1f} {json_ms:>13.2f} {'1.0x':>9}")
+    for blend_format in BINARY_BLEND_FORMATS:
+        (header, buffer), binary_ms = timed(serialize_binary, clip, blend_format)
+        size = len(header) + len(buffer)
+        print(f"{'':>9} {blend_format:>7} {size / 1024:>11.1f} {binary_ms:>13.3f} {json_size / size:>8.1f}x")
+    payload, keyframes_ms = timed(serialize_keyframes, clip)
+    keys = sum(len(track['times']) for track in encode_blend_keyframes(clip)['tracks'].values())
+    print(f"{'':>9} {'keys':>7} {len(payload) / 1024:>11.1f} {keyframes_ms:>13.2f} {json_size / len(payload):>8.1f}x"
+          f"  ({keys} keyframes vs {clip.size} frame values to build)")
+print("=" * 100)
@@ -0,0 +1,157 @@
+"""
+Wire formats for avatar blend shape animation clips
+Legacy JSON frame lists, a shape-name header plus one packed frames x shapes buffer,
+or per-channel keyframes decimated against linear interpolation
+"""
+
+import json
+import struct
+
+import numpy as np
+
+from animation import BLEND_SHAPES, FPS
+
+BLEND_FORMAT_JSON = 'json'
+BLEND_FORMAT_KEYFRAMES = 'keyframes'
+
+# Binary formats: numpy dtype (little-endian, matches JS typed arrays) and quantization scale
+BINARY_BLEND_FORMATS = {
+    'f32': ('<f4', None),
+    'u16': ('<u2', 65535),
+    'u8': ('u1', 255),
+}
+BLEND_FORMATS = (BLEND_FORMAT_JSON, BLEND_FORMAT_KEYFRAMES) + tuple(BINARY_BLEND_FORMATS)
+
+# Maximum deviation from linear interpolation allowed when dropping keyframes
+DEFAULT_KEYFRAME_TOLERANCE = 0.005
+
+# The client smooths dense frames (converter.js createAnimation) with a 5-frame Gaussian-like
+# kernel, 3 frames next to the ends; keyframes get the same smoothing before decimation
+SMOOTHING_WEIGHTS = (0.05, 0.25, 0.4, 0.25, 0.05)
+EDGE_SMOOTHING_WEIGHTS = (0.25, 0.5, 0.25)
+
+
+def normalize_blend_format(value):
+    """Return a supported blend format name, falling back to JSON"""
+    value = str(value or '').lower()
+    return value if value in BLEND_FORMATS else BLEND_FORMAT_JSON
+
+
+def encode_blend_matrix(clip, blend_format):
+    """Pack a clip into (header, bytes); rows are frames, columns follow header['shapes']"""
+    dtype, scale = BINARY_BLEND_FORMATS[blend_format]
+    if scale is None:
+        packed = np.ascontiguousarray(clip, dtype=dtype)
+    else:
+        # Blend shape weights live in [0, 1], so quantize linearly over that range
+        packed = np.rint(np.clip(clip, 0.0, 1.0) * scale).astype(dtype)
+
+    header = {
+        'format': blend_format,
+        'shapes': BLEND_SHAPES,
+        'frames': int(clip.shape[0]),
+        'fps': FPS,
+    }
+    if scale is not None:
+        header['scale'] = 1.0 / scale
+    return header, packed.tobytes()
+
+
+def decode_blend_buffer(header, buffer):
+    """Unpack a binary blend buffer back into a frames x shapes float array"""
+    dtype, _ = BINARY_BLEND_FORMATS[header['format']]
+    values = np.frombuffer(buffer, dtype=dtype).reshape(header['frames'], len(header['shapes']))
+    return values.astype(np.float64) * header.get('scale', 1.0)
+
+
+def pack_blend_envelope(header, buffer):
+    """Single binary body: uint32 header length, JSON header, packed buffer (4-byte aligned)"""
+    header_bytes = json.dumps(header).encode('utf-8')
+    # Pad the JSON header with spaces so the typed array starts on a 4-byte boundary
+    header_bytes += b' ' * ((-(4 + len(header_bytes))) % 4)
+    return struct.pack('<I', len(header_bytes)) + header_bytes + buffer
+
+
+def simplify_channel(values, tolerance=DEFAULT_KEYFRAME_TOLERANCE):
+    """Indices of the keyframes to keep so linear interpolation stays within tolerance
+
+    Ramer-Douglas-Peucker on the value axis: split each span at its worst
+    interpolation error until every dropped frame is within tolerance.
+    """
+    count = len(values)
+    if count <= 2:
+        return np.arange(count)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    frame = np.arange(count, dtype=np.float64)
+    spans = [(0, count - 1)]
+    while spans:
+        start, end = spans.pop()
+        if end - start < 2:
+            continue
+        slope = (values[end] - values[start]) / (end - start)
+        error = np.abs(values[start:end + 1] - (values[start] + slope * (frame[start:end + 1] - start)))
+        split = int(error.argmax())
+        if error[split] > tolerance:
+            split += start
+            keep[split] = True
+            spans.append((start, split))
+            spans.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def smooth_frames(clip):
+    """The client's dense-path smoothing of a frames x shapes clip (first and last frames unchanged)"""
+    frames = clip.shape[0]
+    smoothed = np.array(clip, dtype=np.float64)
+    if frames >= 5:
+        smoothed[2:frames - 2] = sum(
+            weight * clip[offset:frames - 4 + offset] for offset, weight in enumerate(SMOOTHING_WEIGHTS)
+        )
+    for i in range(1, frames - 1):
+        if not 2 <= i < frames - 2:
+            smoothed[i] = sum(weight * clip[i - 1 + offset] for offset, weight in enumerate(EDGE_SMOOTHING_WEIGHTS))
+    return smoothed
+
+
+def encode_blend_keyframes(clip, tolerance=DEFAULT_KEYFRAME_TOLERANCE):
+    """Decimate every blend shape channel independently into (time, value) keyframes
+
+    The clip is smoothed first the way the client smooths every other format,
+    so the avatar moves the same whichever format a session negotiated.
+    """
+    clip = smooth_frames(clip)
+    tracks = {}
+    simplified = {}  # Mirrored channels (Left/Right pairs) and idle channels share one result
+    for column, shape in enumerate(BLEND_SHAPES):
+        values = np.ascontiguousarray(clip[:, column])
+        key = values.tobytes()
+        if key not in simplified:
+            if values.size and np.ptp(values) <= tolerance:
+                keyframes = np.array([0, values.size - 1]) if values.size > 1 else np.arange(values.size)
+            else:
+                keyframes = simplify_channel(values, tolerance)
+            simplified[key] = {
+                'times': np.round(keyframes / FPS, 4).tolist(),
+                'values': np.round(values[keyframes], 4).tolist(),
+            }
+        tracks[shape] = simplified[key]
+
+    return {
+        'format': BLEND_FORMAT_KEYFRAMES,
+        'fps': FPS,
+        'frames': int(clip.shape[0]),
+        'duration': clip.shape[0] / FPS,
+        'tolerance': tolerance,
+        'tracks': tracks,
+    }
+
+
+def decode_blend_keyframes(keyframes):
+    """Resample keyframe tracks back into a dense frames x shapes float array"""
+    frame_times = np.arange(keyframes['frames']) / keyframes['fps']
+    return np.stack([
+        np.interp(frame_times, keyframes['tracks'][shape]['times'], keyframes['tracks'][shape]['values'])
+        for shape in BLEND_SHAPES
+    ], axis=1)
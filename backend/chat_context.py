@@ -0,0 +1,119 @@
+"""
+Bounded Gemini context for long interviews
+Once a chat grows past its token budget it is rebuilt from the persona, a
+rolling summary of older turns and the most recent turns verbatim; the
+summary is refreshed in the background, off the turn's critical path
+"""
+
+import threading
+import time
+
+from metrics import LatencyStats
+from session_store import chat_history
+
+CHARS_PER_TOKEN = 4  # Rough average for English text; good enough for budgeting
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def bounded_history(turns, persona, summary=None, keep_turns=8, token_budget=6000):
+    """Alternating [(role, text)] chat history for stored turns that fits in token_budget
+
+    summary is (text, upto): a summary of turns[:upto]. The last keep_turns
+    turns are always candidates to keep verbatim; older turns the summary does
+    not cover yet are added back newest first while they fit. Whatever still
+    does not fit is dropped (it is covered once the summary catches up).
+    """
+    summary_text, upto = summary or ('', 0)
+    context = persona
+    if summary_text:
+        context += f'\n\nSummary of the interview so far:\n{summary_text}'
+    budget = token_budget - estimate_tokens(context)
+
+    start = max(len(turns) - keep_turns, 0)
+    used = sum(estimate_tokens(turn['content']) for turn in turns[start:])
+    # Drop the oldest recent turns if even they do not fit, but always keep the last exchange
+    while used > budget and start < len(turns) - 2:
+        used -= estimate_tokens(turns[start]['content'])
+        start += 1
+    while start > upto and used + estimate_tokens(turns[start - 1]['content']) <= budget:
+        start -= 1
+        used += estimate_tokens(turns[start]['content'])
+    return chat_history({'turns': turns[start:]}, context)
+
+
+def summary_prompt(previous_summary, turns):
+    lines = [f"{turn['role'].capitalize()}: {turn['content']}" for turn in turns]
+    earlier = f'Summary so far:\n{previous_summary}\n\n' if previous_summary else ''
+    return (f'{earlier}Further interview turns:\n' + '\n'.join(lines) + '\n\n'
+            'Update the summary of this job interview for the interviewer. Keep the topics covered, '
+            "the candidate's key claims, experience and skills, and any open threads to follow up. "
+            'Plain prose, at most 200 words.')
+
+
+class RollingSummaries:
+    """Per-interview summary of older turns, refreshed by one background job at a time"""
+
+    def __init__(self, summarize, spawn, min_new_turns=4):
+        self.summarize = summarize  # summarize(prompt) -> text; blocking
+        self.spawn = spawn
+        self.min_new_turns = min_new_turns
+        self._lock = threading.Lock()
+        self._summaries = {}  # interview_id -> (text, upto)
+        self._refreshing = set()
+        self.refreshes = 0
+        self.failures = 0
+        self.latency = LatencyStats()
+
+    def get(self, interview_id):
+        with self._lock:
+            return self._summaries.get(interview_id)
+
+    def drop(self, interview_id):
+        with self._lock:
+            self._summaries.pop(interview_id, None)
+            self._refreshing.discard(interview_id)  # A refresh still running is discarded
+
+    def maybe_refresh(self, interview_id, turns, keep_turns):
+        """Start a background refresh when enough turns have aged out of the verbatim window"""
+        target = len(turns) - keep_turns
+        with self._lock:
+            text, upto = self._summaries.get(interview_id, ('', 0))
+            if interview_id in self._refreshing or target - upto < self.min_new_turns:
+                return False
+            self._refreshing.add(interview_id)
+        self.spawn(self._refresh, interview_id, text, upto, turns[upto:target], target)
+        return True
+
+    def _refresh(self, interview_id, previous, upto, new_turns, target):
+        started_at = time.perf_counter()
+        try:
+            text = self.summarize(summary_prompt(previous, new_turns)).strip()
+            self.latency.record(time.perf_counter() - started_at)
+            with self._lock:
+                current = self._summaries.get(interview_id, ('', 0))
+                if interview_id in self._refreshing and current[1] == upto:
+                    self._summaries[interview_id] = (text, target)
+                    self.refreshes += 1
+            print(f'📝 Summarized turns {upto}-{target} for {interview_id} '
+                  f'({(time.perf_counter() - started_at) * 1000:.0f} ms)')
+        except Exception as e:
+            self.failures += 1
+            print(f'⚠️ Context summary failed for {interview_id}: {str(e)}')
+        finally:
+            with self._lock:
+                self._refreshing.discard(interview_id)
+
+    def stats(self):
+        with self._lock:
+            interviews = len(self._summaries)
+            refreshing = len(self._refreshing)
+        return {
+            'interviews': interviews,
+            'refreshing': refreshing,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'latency': self.latency.snapshot(),
+        }
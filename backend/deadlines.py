@@ -0,0 +1,179 @@
+"""
+Per-turn deadlines and hedged provider calls
+A turn's latency budget starts when the candidate stops speaking and is
+split across STT -> Gemini -> TTS: each stage gets what the turn has left
+minus what the later stages reserve, so time one stage does not use flows
+downstream. Idempotent calls (TTS, short STT) can be hedged: a second
+request after the p95 delay, first one back wins, capped to a share of calls
+"""
+
+import threading
+import time
+
+from metrics import LatencyStats
+
+# A client-side timeout set from the same deadline can fire a hair before it
+EXPIRY_SLACK_SECONDS = 0.05
+
+
+class DeadlineExceeded(TimeoutError):
+    """A stage ran out of its share of the turn's latency budget"""
+
+
+class Deadline:
+    """Point in time a stage must finish by; seconds=None means no deadline"""
+
+    def __init__(self, seconds=None, expires_at=None):
+        if expires_at is None and seconds is not None:
+            expires_at = time.monotonic() + seconds
+        self.expires_at = expires_at
+
+    def remaining(self):
+        """Seconds left (never negative), or None without a deadline"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self, slack=0.0):
+        return self.expires_at is not None and time.monotonic() + slack >= self.expires_at
+
+    def within(self, reserve=0.0):
+        """Deadline for a stage that must leave reserve seconds for the stages after it"""
+        if self.expires_at is None:
+            return Deadline()
+        return Deadline(expires_at=self.expires_at - reserve)
+
+    def renewed(self, seconds):
+        """A fresh deadline seconds from now, unbounded if this one is"""
+        return Deadline(None if self.expires_at is None else seconds)
+
+    def timeout(self, cap=None):
+        """remaining() for passing as a client-side timeout, optionally capped"""
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(remaining, cap)
+
+    def check(self, stage):
+        if self.expired():
+            raise DeadlineExceeded(f'{stage} deadline passed')
+
+
+def _wait_within(calls, deadline, stage, timeout):
+    """wait_first(), with a failure at the deadline (e.g. the client's own timeout) as DeadlineExceeded"""
+    try:
+        return wait_first(calls, timeout)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        if deadline.expired(EXPIRY_SLACK_SECONDS):
+            raise DeadlineExceeded(f'{stage} deadline passed') from e
+        raise
+
+
+def wait_first(calls, timeout=None):
+    """First PendingCall to succeed; raises the first error once every call failed, None on timeout"""
+    wake = threading.Event()
+    for call in calls:
+        call.notify(wake)
+    expires_at = None if timeout is None else time.monotonic() + timeout
+    while True:
+        wake.clear()
+        finished = [call for call in calls if call.done.is_set()]
+        for call in finished:
+            if call.error is None:
+                return call
+        if len(finished) == len(calls):
+            raise finished[0].error
+        remaining = None if expires_at is None else expires_at - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return None
+        wake.wait(remaining)
+
+
+def run_with_deadline(pool, deadline, stage, fn, *args, **kwargs):
+    """pool.run() that stops waiting at the deadline (the call itself finishes on its thread)"""
+    deadline.check(stage)
+    call = _wait_within([pool.submit(fn, *args, **kwargs)], deadline, stage, deadline.remaining())
+    if call is None:
+        raise DeadlineExceeded(f'{stage} deadline passed')
+    return call.result
+
+
+class Hedger:
+    """Hedged idempotent requests for one call type
+
+    request(client, timeout) runs on pool.client; when it has not returned
+    after the rolling p95 latency a second request goes to the next client,
+    as long as hedges stay under max_ratio of calls. Hedging starts once
+    min_samples latencies have been seen.
+    """
+
+    def __init__(self, name, enabled=True, max_ratio=0.1, percentile=95, min_samples=20, min_delay=0.02):
+        self.name = name
+        self.enabled = enabled
+        self.max_ratio = max_ratio
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latency = LatencyStats(window=200)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_misses = 0
+
+    def delay(self):
+        """Seconds to wait before hedging, or None while there are too few samples"""
+        if not self.enabled or self.latency.count < self.min_samples:
+            return None
+        return max(self.latency.percentile(self.percentile), self.min_delay)
+
+    def _claim_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def run(self, pool, request, deadline, timeout_cap=None):
+        """Result of request(client, timeout), hedged; DeadlineExceeded when nothing returns in time"""
+        deadline.check(self.name)
+        with self._lock:
+            self.calls += 1
+        calls = [pool.submit(request, pool.client, deadline.timeout(timeout_cap))]
+        delay = self.delay()
+        winner = None
+        remaining = deadline.remaining()
+        if delay is not None and (remaining is None or delay < remaining):
+            winner = _wait_within(calls, deadline, self.name, delay)
+            if winner is None and self._claim_hedge():
+                calls.append(pool.submit(request, pool.client, deadline.timeout(timeout_cap)))
+        try:
+            if winner is None:
+                winner = _wait_within(calls, deadline, self.name, deadline.remaining())
+            if winner is None:
+                raise DeadlineExceeded(f'{self.name} deadline passed')
+        except DeadlineExceeded:
+            with self._lock:
+                self.deadline_misses += 1
+            raise
+        if winner is not calls[0]:
+            with self._lock:
+                self.hedge_wins += 1
+        self.latency.record(winner.seconds)
+        return winner.result
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'enabled': self.enabled,
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_rate': round(self.hedges / self.calls, 3) if self.calls else 0.0,
+                'hedge_wins': self.hedge_wins,
+                'deadline_misses': self.deadline_misses,
+            }
+        counters['delay'] = self.delay()
+        counters['latency'] = self.latency.snapshot()
+        return counters
@@ -0,0 +1,64 @@
+"""
+Lightweight runtime metrics for the AI Interviewer backend
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+
+def _pick(sorted_samples, p):
+    """Nearest-rank percentile of an already sorted list"""
+    index = math.ceil(p / 100.0 * len(sorted_samples)) - 1
+    return sorted_samples[min(len(sorted_samples) - 1, max(0, index))]
+
+
+class LatencyStats:
+    """Rolling window of latency samples (seconds) with count and percentiles"""
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, p):
+        """p in [0, 100] over the rolling window, or None when empty"""
+        with self._lock:
+            samples = sorted(self._samples)
+        return _pick(samples, p) if samples else None
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self.count, self.total
+        if not samples:
+            return {'count': count}
+        return {
+            'count': count,
+            'mean': total / count,
+            'p50': _pick(samples, 50),
+            'p95': _pick(samples, 95),
+            'p99': _pick(samples, 99),
+            'max': samples[-1],
+        }
+
+
+def monitor_event_loop_lag(stats, interval=0.1, sleep=time.sleep):
+    """Record how late each interval-second sleep wakes up; run as a background task
+
+    Under gevent/eventlet any blocking call on the hub shows up here as lag,
+    and so as delay on every socket in the worker. Pass the server's
+    cooperative sleep (socketio.sleep) so the monitor itself never blocks it.
+    """
+    while True:
+        started = time.perf_counter()
+        sleep(interval)
+        stats.record(max(0.0, time.perf_counter() - started - interval))
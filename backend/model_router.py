@@ -0,0 +1,228 @@
+"""
+Latency- and error-aware routing across the configured Gemini models
+Each model keeps a rolling window of call outcomes and a circuit breaker;
+turns go to the healthiest model whose breaker admits traffic, so a slow or
+failing model is taken out of rotation mid-interview and probed again later
+"""
+
+import threading
+import time
+from collections import deque
+
+from metrics import LatencyStats
+
+BREAKER_CLOSED = 'closed'
+BREAKER_OPEN = 'open'
+BREAKER_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Opens on consecutive failures or a high failure rate; one trial call after the cooldown"""
+
+    def __init__(self, failure_threshold=3, failure_rate=0.5, min_calls=4, cooldown_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.state = BREAKER_CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        self.opened = 0
+
+    def allows(self, now):
+        """Whether a call may be sent now (claims the single half-open trial)"""
+        if self.state == BREAKER_OPEN and now - self.opened_at >= self.cooldown_seconds:
+            self.state = BREAKER_HALF_OPEN
+            self.trial_in_flight = False
+        if self.state == BREAKER_HALF_OPEN:
+            return not self.trial_in_flight
+        return self.state == BREAKER_CLOSED
+
+    def claim(self):
+        if self.state == BREAKER_HALF_OPEN:
+            self.trial_in_flight = True
+
+    def record(self, ok, outcomes, now):
+        """Update from one call's outcome; outcomes is the model's recent (healthy, seconds) window"""
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+        if self.state == BREAKER_HALF_OPEN:
+            self.trial_in_flight = False
+            if ok:
+                self.state = BREAKER_CLOSED
+            else:
+                self._open(now)
+            return
+        failures = sum(1 for healthy, _ in outcomes if not healthy)
+        if not ok and self.state == BREAKER_CLOSED and (
+            self.consecutive_failures >= self.failure_threshold
+            or (len(outcomes) >= self.min_calls and failures / len(outcomes) >= self.failure_rate)
+        ):
+            self._open(now)
+
+    def _open(self, now):
+        self.state = BREAKER_OPEN
+        self.opened_at = now
+        self.opened += 1
+
+
+class _ModelHealth:
+    def __init__(self, name, model, index, window, breaker):
+        self.name = name
+        self.model = model
+        self.index = index  # Position in the configured preference order
+        self.outcomes = deque(maxlen=window)  # (healthy, seconds); slow calls are not healthy
+        self.latency = LatencyStats(window=window)
+        self.breaker = breaker
+        self.calls = 0
+        self.errors = 0
+        self.slow_calls = 0
+        self.routed = 0
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for healthy, _ in self.outcomes if not healthy) / len(self.outcomes)
+
+    def median_latency(self):
+        samples = sorted(seconds for healthy, seconds in self.outcomes if healthy)
+        return samples[len(samples) // 2] if samples else None
+
+
+class ModelRouter:
+    """Chooses a model per call and learns from each outcome
+
+    A half-open model gets its single trial call first (the caller fails over
+    if it fails). Otherwise, among closed models, each scores its rolling median
+    latency inflated by its error rate; every model within latency_tolerance of
+    the best score, or without enough samples to judge, is a contender, and the
+    first contender in configured order wins. So the primary model keeps
+    traffic until it fails, trips on slow calls or is clearly slower than a
+    measured alternative. A model whose breaker closes again starts with a
+    clean window.
+    """
+
+    def __init__(self, window=50, min_samples=4, slow_call_seconds=10.0, error_penalty=4.0,
+                 latency_tolerance=1.5, failure_threshold=3, failure_rate=0.5, cooldown_seconds=30.0):
+        self.window = window
+        self.min_samples = min_samples
+        self.slow_call_seconds = slow_call_seconds
+        self.error_penalty = error_penalty
+        self.latency_tolerance = latency_tolerance
+        self._breaker_settings = dict(failure_threshold=failure_threshold, failure_rate=failure_rate,
+                                      min_calls=min_samples, cooldown_seconds=cooldown_seconds)
+        self._lock = threading.Lock()
+        self._models = {}
+        self.switches = 0
+        self.decisions = deque(maxlen=20)
+
+    def set_models(self, models):
+        """models: [(name, model)] in preference order"""
+        with self._lock:
+            self._models = {
+                name: _ModelHealth(name, model, index, self.window, CircuitBreaker(**self._breaker_settings))
+                for index, (name, model) in enumerate(models)
+            }
+
+    @property
+    def names(self):
+        return list(self._models)
+
+    def model(self, name):
+        return self._models[name].model
+
+    def _score(self, health):
+        """Error-weighted median latency, or None without enough samples"""
+        median = health.median_latency()
+        if len(health.outcomes) < self.min_samples or median is None:
+            return None
+        return median * (1 + self.error_penalty * health.error_rate())
+
+    def choose(self, exclude=()):
+        """Name of the model to use next, or None when every breaker is open"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [health for name, health in self._models.items()
+                          if name not in exclude and health.breaker.allows(now)]
+            if not candidates:
+                return None
+            trials = [health for health in candidates if health.breaker.state == BREAKER_HALF_OPEN]
+            if trials:
+                best = trials[0]
+            else:
+                scores = {health.name: self._score(health) for health in candidates}
+                known = [score for score in scores.values() if score is not None]
+                cutoff = min(known) * self.latency_tolerance if known else None
+                best = min(
+                    (health for health in candidates
+                     if cutoff is None or scores[health.name] is None or scores[health.name] <= cutoff),
+                    key=lambda health: health.index,
+                )
+            best.breaker.claim()
+            best.routed += 1
+            return best.name
+
+    def release(self, name):
+        """Give back a chosen model whose call was never made or never finished (no outcome to record)
+
+        Frees a half-open breaker's trial so the model is probed again.
+        """
+        with self._lock:
+            breaker = self._models[name].breaker
+            if breaker.state == BREAKER_HALF_OPEN:
+                breaker.trial_in_flight = False
+
+    def record(self, name, ok, seconds):
+        """Feed one call's outcome (ok=False for errors) and duration back to the router"""
+        now = time.monotonic()
+        with self._lock:
+            health = self._models[name]
+            health.calls += 1
+            slow = ok and seconds > self.slow_call_seconds
+            if ok:
+                health.latency.record(seconds)
+            else:
+                health.errors += 1
+            if slow:
+                health.slow_calls += 1
+            health.outcomes.append((ok and not slow, seconds))
+            state = health.breaker.state
+            health.breaker.record(ok and not slow, health.outcomes, now)
+            if health.breaker.state != state:
+                if health.breaker.state == BREAKER_CLOSED:
+                    health.outcomes.clear()
+                print(f'🔌 Model {name} circuit {state} -> {health.breaker.state}')
+
+    def note_switch(self, interview_id, previous, current, reason):
+        """Log a mid-interview move from one model to another"""
+        with self._lock:
+            self.switches += 1
+            self.decisions.append({
+                'at': time.time(),
+                'interview_id': interview_id,
+                'from': previous,
+                'to': current,
+                'reason': reason,
+            })
+        print(f'🔀 Interview {interview_id}: {previous} -> {current} ({reason})')
+
+    def stats(self):
+        with self._lock:
+            models = {
+                name: {
+                    'state': health.breaker.state,
+                    'routed': health.routed,
+                    'calls': health.calls,
+                    'errors': health.errors,
+                    'slow_calls': health.slow_calls,
+                    'error_rate': round(health.error_rate(), 3),
+                    'opened': health.breaker.opened,
+                    'latency': health.latency.snapshot(),
+                }
+                for name, health in self._models.items()
+            }
+            return {
+                'models': models,
+                'switches': self.switches,
+                'recent_switches': list(self.decisions),
+            }
@@ -0,0 +1,187 @@
+"""
+Run blocking or CPU-heavy work on a real OS thread
+Under gevent/eventlet monkey patching a plain call would stall every socket
+on the only worker, so work is handed to native threads and the calling
+greenlet waits cooperatively
+"""
+
+import itertools
+import sys
+import threading
+import time
+
+from metrics import LatencyStats
+
+
+def _async_mode():
+    if 'gevent' in sys.modules:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return 'gevent'
+    if 'eventlet' in sys.modules:
+        from eventlet import patcher
+        if patcher.is_monkey_patched('thread'):
+            return 'eventlet'
+    return None
+
+
+def run_blocking(fn, *args, **kwargs):
+    """Call fn on a native thread and wait for it cooperatively; plain call when not monkey patched"""
+    mode = _async_mode()
+    if mode == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(fn, args, kwargs)
+    if mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+class PendingCall:
+    """Result of ProviderPool.submit: wait for it with a timeout, or listen for completion"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.seconds = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def notify(self, event):
+        """Set event when the call finishes (right away if it already has)"""
+        with self._lock:
+            if not self.done.is_set():
+                self._listeners.append(event)
+                return
+        event.set()
+
+    def _finish(self, result=None, error=None, seconds=None):
+        self.result, self.error, self.seconds = result, error, seconds
+        with self._lock:
+            self.done.set()
+            listeners, self._listeners = self._listeners, []
+        for event in listeners:
+            event.set()
+
+    def get(self, timeout=None):
+        """The call's result (or its exception raised); TimeoutError if it is still running"""
+        if not self.done.wait(timeout):
+            raise TimeoutError('call still running')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class ProviderPool:
+    """Bounded native-thread pool for one upstream provider, with round-robin clients
+
+    Each client normally owns its own gRPC channel, so several clients spread
+    concurrent calls over several connections.
+    """
+
+    def __init__(self, name, size, clients=()):
+        self.name = name
+        self.size = size
+        self.clients = list(clients)
+        self._next_client = itertools.cycle(self.clients) if self.clients else None
+        self._mode = _async_mode()
+        self._threadpool = None
+        if self._mode == 'gevent':
+            from gevent.threadpool import ThreadPool
+            self._threadpool = ThreadPool(size)
+        # eventlet's tpool is process wide; bound this provider's share of it
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.wait = LatencyStats()
+        self.duration = LatencyStats()
+
+    def set_clients(self, clients):
+        """Attach clients created after the pool (e.g. by background initialization)"""
+        self.clients = list(clients)
+        self._next_client = itertools.cycle(self.clients) if self.clients else None
+
+    @property
+    def client(self):
+        """Next client in rotation, or None when the provider failed to initialize"""
+        return next(self._next_client) if self._next_client else None
+
+    def run(self, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) on one of this provider's threads and return its result"""
+        queued_at = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        def timed():
+            started_at = time.perf_counter()
+            self.wait.record(started_at - queued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.duration.record(time.perf_counter() - started_at)
+
+        try:
+            if self._threadpool is not None:
+                return self._threadpool.apply(timed)
+            if self._mode == 'eventlet':
+                from eventlet import tpool
+                with self._slots:
+                    return tpool.execute(timed)
+            return timed()
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Start fn(*args, **kwargs) on one of this provider's threads; returns a PendingCall
+
+        The caller may stop waiting (a deadline) or start a second attempt (a
+        hedge); an abandoned call still finishes on its thread.
+        """
+        call = PendingCall()
+
+        def runner():
+            started_at = time.perf_counter()
+            try:
+                result = self.run(fn, *args, **kwargs)
+            except Exception as e:
+                call._finish(error=e, seconds=time.perf_counter() - started_at)
+            else:
+                call._finish(result=result, seconds=time.perf_counter() - started_at)
+
+        # A greenlet under monkey patching (run() then moves fn to a native thread), else a thread
+        threading.Thread(target=runner, daemon=True).start()
+        return call
+
+    def iterate(self, iterator):
+        """Yield from a blocking iterator (e.g. a streamed response), pulling each item on a pool thread"""
+        done = object()
+        while True:
+            item = self.run(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'pool_size': self.size,
+                'clients': len(self.clients),
+                'calls': self.calls,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+            }
+        counters['queue_wait'] = self.wait.snapshot()
+        counters['duration'] = self.duration.snapshot()
+        return counters
@@ -0,0 +1,144 @@
+"""
+16-bit PCM helpers for candidate audio streamed from the browser
+Chunks arrive as raw Int16 binary attachments (or, from older clients, JSON
+lists of ints) and are kept as bytes end to end
+"""
+
+import array
+import sys
+import threading
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes per LINEAR16 sample
+
+
+def pcm_chunk_bytes(audio_chunk):
+    """Raw little-endian Int16 bytes for one audio_stream_data payload
+
+    Binary attachments are returned as-is; the legacy JSON list of ints is
+    packed once per chunk.
+    """
+    if isinstance(audio_chunk, (bytes, bytearray, memoryview)):
+        if len(audio_chunk) % SAMPLE_WIDTH:
+            audio_chunk = memoryview(audio_chunk)[:len(audio_chunk) - 1]  # drop a dangling half sample
+        return audio_chunk
+    samples = array.array('h', audio_chunk)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def pcm_samples(buffer):
+    """Int16 view over a PCM buffer without copying it"""
+    return np.frombuffer(buffer, dtype='<i2', count=len(buffer) // SAMPLE_WIDTH)
+
+
+def sample_count(buffer):
+    return len(buffer) // SAMPLE_WIDTH
+
+
+def peak_amplitude(buffer):
+    """Largest absolute sample value in a PCM buffer"""
+    samples = pcm_samples(buffer)
+    if not samples.size:
+        return 0
+    return int(max(-int(samples.min()), int(samples.max())))
+
+
+class AudioMemoryBudget:
+    """Process-wide cap on the bytes reserved by all PCM buffers"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.reserved = 0
+        self.peak_reserved = 0
+        self.refused = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes):
+        with self._lock:
+            if self.reserved + nbytes > self.max_bytes:
+                self.refused += 1
+                return False
+            self.reserved += nbytes
+            self.peak_reserved = max(self.peak_reserved, self.reserved)
+            return True
+
+    def release(self, nbytes):
+        with self._lock:
+            self.reserved = max(0, self.reserved - nbytes)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'reserved_bytes': self.reserved,
+                'peak_reserved_bytes': self.peak_reserved,
+                'max_bytes': self.max_bytes,
+                'refused_reservations': self.refused,
+            }
+
+
+class PCMBuffer:
+    """Preallocated PCM buffer capped at max_bytes
+
+    Capacity grows in place (doubling, never past max_bytes) and every byte of
+    capacity is reserved from the shared budget first. Input past the cap is
+    dropped and counted; the start of the answer is always kept.
+    """
+
+    def __init__(self, max_bytes, budget=None, initial_bytes=0):
+        self.max_bytes = max_bytes - max_bytes % SAMPLE_WIDTH
+        self.budget = budget
+        self.length = 0
+        self.dropped_bytes = 0
+        self.limit_reason = None  # 'session_limit' or 'memory_budget' once input was dropped
+        self._data = bytearray()
+        self._grow(min(initial_bytes, self.max_bytes))
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def __len__(self):
+        return self.length
+
+    def _grow(self, target):
+        """Grow capacity toward target; returns False when the budget refused"""
+        extra = target - len(self._data)
+        if extra <= 0:
+            return True
+        if self.budget is not None and not self.budget.reserve(extra):
+            return False
+        self._data.extend(bytes(extra))
+        return True
+
+    def append(self, chunk):
+        """Copy chunk in after the buffered audio; returns the number of bytes kept"""
+        needed = self.length + len(chunk)
+        if needed > self.capacity and self.capacity < self.max_bytes:
+            target = min(self.max_bytes, max(needed, self.capacity * 2))
+            if not self._grow(target):
+                self._grow(min(self.max_bytes, needed))  # Settle for exactly what this chunk needs
+        space = self.capacity - self.length
+        accepted = min(len(chunk), space - space % SAMPLE_WIDTH)
+        if accepted:
+            self._data[self.length:self.length + accepted] = memoryview(chunk)[:accepted]
+            self.length += accepted
+        if accepted < len(chunk):
+            self.dropped_bytes += len(chunk) - accepted
+            if self.limit_reason is None:
+                self.limit_reason = 'session_limit' if self.capacity >= self.max_bytes else 'memory_budget'
+        return accepted
+
+    def view(self):
+        """Buffered audio without copying it"""
+        return memoryview(self._data)[:self.length]
+
+    def release(self):
+        """Free the storage and return its reservation to the budget"""
+        if self.budget is not None:
+            self.budget.release(len(self._data))
+        self._data = bytearray()
+        self.length = 0
@@ -20,15 +20,16 @@ if sys.platform == 'win32':
         # If we can't set UTF-8, continue - Python will handle encoding errors with 'replace'
         pass
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import os
 import json
-import uuid
 from datetime import datetime
 import base64
 import threading
+import queue
+import time
 from dotenv import load_dotenv, find_dotenv
 
 # Load environment variables from the project root .env so the whole project uses a single env file.
@@ -63,7 +64,38 @@ else:
 # Now import Google Cloud clients (they will use the credentials we just set)
 from google.cloud import texttospeech, speech
 import vertexai
-from vertexai.preview.generative_models import GenerativeModel
+from vertexai.preview.generative_models import Content, GenerativeModel, Part
+
+# Columnar lip-sync animation engine (frames x shapes arrays)
+from animation import FPS, blend_matrix_from_duration, blend_matrix_from_text, blend_matrix_to_frames
+from blend_codec import (
+    BINARY_BLEND_FORMATS, BLEND_FORMAT_JSON, BLEND_FORMAT_KEYFRAMES, DEFAULT_KEYFRAME_TOLERANCE,
+    encode_blend_keyframes, encode_blend_matrix, normalize_blend_format, pack_blend_envelope,
+)
+from tts_cache import TTSCache
+from audio_store import AudioStore
+from metrics import LatencyStats, monitor_event_loop_lag
+from turn_streaming import split_sentences
+from stt_streaming import FakeRecognizer, GoogleStreamingRecognizer
+from vad import EndpointDetector, detect_speech, split_at_pauses
+from audio_encoding import ENCODING_LINEAR16, encode_pcm, encoding_available, normalize_stt_encoding
+from model_router import ModelRouter
+from deadlines import EXPIRY_SLACK_SECONDS, Deadline, DeadlineExceeded, Hedger, run_with_deadline
+from offload import ProviderPool, run_blocking
+from service_init import ServiceInitializer
+from stt_routing import (
+    ROUTE_MODELS, ROUTE_SEGMENTED, ROUTE_SHORT, STT_ROUTES, choose_stt_route, recognize_routed, recognize_segments,
+    stitch_responses,
+)
+from pcm_audio import (
+    SAMPLE_RATE, SAMPLE_WIDTH, AudioMemoryBudget, PCMBuffer, pcm_chunk_bytes, pcm_samples, peak_amplitude,
+    sample_count,
+)
+from session_registry import SessionRegistry
+from acknowledgements import DEFAULT_PHRASES, AcknowledgementPool
+from admission import AdmissionController, LoadShed
+from chat_context import CHARS_PER_TOKEN, RollingSummaries, bounded_history, estimate_tokens
+from session_store import ROLE_CANDIDATE, ROLE_INTERVIEWER, build_session_store, chat_history, new_record
 
 app = Flask(__name__)
 
@@ -101,294 +133,475 @@ CORS(app, resources={
 production_mode = os.environ.get('PRODUCTION', '').lower() in ('1', 'true', 'yes')
 async_mode = 'gevent' if production_mode else 'eventlet'
 
+# Candidate audio limits: per answer, and across every session in this worker
+AUDIO_SESSION_MAX_SECONDS = float(os.environ.get('AUDIO_SESSION_MAX_SECONDS', '300'))
+AUDIO_SESSION_MAX_BYTES = int(AUDIO_SESSION_MAX_SECONDS * SAMPLE_RATE * SAMPLE_WIDTH)
+AUDIO_PREALLOCATE_SECONDS = float(os.environ.get('AUDIO_PREALLOCATE_SECONDS', '10'))
+AUDIO_INGEST_BUDGET_MB = int(os.environ.get('AUDIO_INGEST_BUDGET_MB', '256'))
+
 socketio = SocketIO(app, cors_allowed_origins=allowed_origins, async_mode=async_mode, 
    ping_timeout=600,  # Increase timeout to 600 seconds (10 minutes) for very long audio processing
    ping_interval=120,  # Send ping every 120 seconds to keep connection alive
-   max_http_buffer_size=100 * 1024 * 1024  # 100MB buffer for very large audio data
+   # Room for a whole answer in one message, even as a JSON int list (~3x the PCM size)
+   max_http_buffer_size=AUDIO_SESSION_MAX_BYTES * 3 + 1024 * 1024
 )
 
-# Initialize Google Cloud clients with error handling
+# Google clients are created in the background (see Service initialization at the end of this module)
+# so the port binds immediately; until a service is ready its client stays None
 tts_client = None
 stt_client = None
+gemini_model = None
 
-try:
-    print('🔊 Initializing Text-to-Speech client...')
-    tts_client = texttospeech.TextToSpeechClient()
-    print('✅ Text-to-Speech client initialized successfully')
-except Exception as e:
-    print(f'❌ ERROR: Failed to initialize Text-to-Speech client: {e}')
-    print(f'   Error type: {type(e).__name__}')
-    print('   This will prevent the interviewer from speaking!')
-    print('   Please check:')
-    print('   1. GOOGLE_APPLICATION_CREDENTIALS is set correctly')
-    print('   2. Service account has Text-to-Speech API enabled')
-    print('   3. Service account has proper permissions')
-    import traceback
-    traceback.print_exc()
-
-try:
-    print('🎤 Initializing Speech-to-Text client...')
-    stt_client = speech.SpeechClient()
-    print('✅ Speech-to-Text client initialized successfully')
-except Exception as e:
-    print(f'❌ ERROR: Failed to initialize Speech-to-Text client: {e}')
-    print(f'   Error type: {type(e).__name__}')
-    print('   This will prevent speech recognition!')
-    import traceback
-    traceback.print_exc()
-
-# Initialize Vertex AI (uses service account - no API key needed!)
+# Vertex AI (uses service account - no API key needed!)
 project_id = os.environ.get('GOOGLE_CLOUD_PROJECT_ID') or os.environ.get('GCP_PROJECT_ID')
 location = os.environ.get('GOOGLE_CLOUD_REGION', 'us-central1')
 
-if not project_id:
-    print('⚠️ WARNING: GOOGLE_CLOUD_PROJECT_ID not set in environment variables')
-    print('Please set GOOGLE_CLOUD_PROJECT_ID in your .env file')
-else:
-    try:
-        vertexai.init(project=project_id, location=location)
-        print(f'✅ Vertex AI initialized successfully (Project: {project_id}, Region: {location})')
-    except Exception as e:
-        print(f'❌ Error initializing Vertex AI: {e}')
-
 # Use Gemini via Vertex AI (no API key needed!)
 # Try multiple models with fallback (in order of preference)
 # Note: gemini-1.5-flash is not available in this project - using 2.0 instead
-gemini_model = None
 model_names = [
     'gemini-2.0-flash',      # Gemini 2.0 stable (confirmed working)
     'gemini-2.0-flash-exp',  # Gemini 2.0 experimental (confirmed working as fallback)
 ]
+if os.environ.get('GEMINI_MODELS'):
+    model_names = [name.strip() for name in os.environ['GEMINI_MODELS'].split(',') if name.strip()]
+
+# Every loaded model stays in rotation: each turn goes to the healthiest one (circuit closed,
+# lowest error-weighted median latency, then the order above) and fails over mid-interview
+model_router = ModelRouter(
+    slow_call_seconds=float(os.environ.get('GEMINI_SLOW_CALL_SECONDS', '10')),
+    cooldown_seconds=float(os.environ.get('GEMINI_CIRCUIT_COOLDOWN_SECONDS', '30')),
+)
+
+
+def _client_channels(first_client, factory, count):
+    """first_client plus count - 1 more clients, each with its own gRPC channel"""
+    if first_client is None:
+        return []
+    clients = [first_client]
+    for _ in range(count - 1):
+        try:
+            clients.append(factory())
+        except Exception as e:
+            print(f'⚠️ Could not open extra client channel: {e}')
+            break
+    return clients
+
+
+# Provider execution layer: blocking Google calls run on bounded native-thread pools, one per
+# provider, so a slow call never stalls the event loop that serves every other interview.
+# Clients are attached when their service finishes initializing.
+tts_pool = ProviderPool('tts', int(os.environ.get('TTS_POOL_SIZE', '8')))
+stt_pool = ProviderPool('stt', int(os.environ.get('STT_POOL_SIZE', '8')))
+# A streaming recognizer keeps a thread waiting on its response stream for the whole answer; those
+# get their own pool (one thread per concurrent stream) so they never starve batch and hedged calls
+stt_stream_pool = ProviderPool('stt_stream', int(os.environ.get('STT_STREAM_POOL_SIZE', '16')))
+# The Vertex AI SDK manages its own channel; only the thread pool applies
+gemini_pool = ProviderPool('gemini', int(os.environ.get('GEMINI_POOL_SIZE', '8')))
+provider_pools = (tts_pool, stt_pool, stt_stream_pool, gemini_pool)
+
+
+def init_tts():
+    global tts_client
+    print('🔊 Initializing Text-to-Speech client...')
+    try:
+        client = texttospeech.TextToSpeechClient()
+    except Exception as e:
+        print(f'❌ ERROR: Failed to initialize Text-to-Speech client: {e}')
+        print(f'   Error type: {type(e).__name__}')
+        print('   This will prevent the interviewer from speaking!')
+        print('   Please check:')
+        print('   1. GOOGLE_APPLICATION_CREDENTIALS is set correctly')
+        print('   2. Service account has Text-to-Speech API enabled')
+        print('   3. Service account has proper permissions')
+        raise
+    tts_pool.set_clients(
+        _client_channels(client, texttospeech.TextToSpeechClient, int(os.environ.get('TTS_CHANNELS', '2')))
+    )
+    tts_client = client
+
 
-for model_name in model_names:
+def init_stt():
+    global stt_client
+    print('🎤 Initializing Speech-to-Text client...')
     try:
-        print(f'Attempting to load model: {model_name}...')
-        gemini_model = GenerativeModel(model_name)
-        print(f'✅ Successfully loaded {model_name} via Vertex AI')
-        break
+        client = speech.SpeechClient()
     except Exception as e:
-        print(f'⚠️ Failed to load {model_name}: {str(e)}')
-        continue
+        print(f'❌ ERROR: Failed to initialize Speech-to-Text client: {e}')
+        print(f'   Error type: {type(e).__name__}')
+        print('   This will prevent speech recognition!')
+        raise
+    stt_pool.set_clients(
+        _client_channels(client, speech.SpeechClient, int(os.environ.get('STT_CHANNELS', '2')))
+    )
+    stt_stream_pool.set_clients(stt_pool.clients)
+    stt_client = client
+
 
-if gemini_model is None:
+def init_gemini():
+    global gemini_model
+    if not project_id:
+        print('⚠️ WARNING: GOOGLE_CLOUD_PROJECT_ID not set in environment variables')
+        print('Please set GOOGLE_CLOUD_PROJECT_ID in your .env file')
+    else:
+        try:
+            vertexai.init(project=project_id, location=location)
+            print(f'✅ Vertex AI initialized successfully (Project: {project_id}, Region: {location})')
+        except Exception as e:
+            print(f'❌ Error initializing Vertex AI: {e}')
+    
+    loaded = []
+    for model_name in model_names:
+        try:
+            print(f'Attempting to load model: {model_name}...')
+            loaded.append((model_name, GenerativeModel(model_name)))
+            print(f'✅ Successfully loaded {model_name} via Vertex AI')
+        except Exception as e:
+            print(f'⚠️ Failed to load {model_name}: {str(e)}')
+    
+    if loaded:
+        model_router.set_models(loaded)
+        gemini_model = loaded[0][1]
+        return
+    
     print('❌ ERROR: Failed to load any Gemini model. AI responses will be disabled.')
     print('   Please check:')
     print('   1. GOOGLE_CLOUD_PROJECT_ID is set correctly')
     print('   2. Vertex AI API is enabled for your project')
     print('   3. Service account has proper permissions')
     print('   4. Model names are correct for your region')
+    raise RuntimeError('no Gemini model could be loaded')
+
+
+# Lateness of a 100 ms timer on the event loop: what every socket in this worker waits extra
+event_loop_lag = LatencyStats()
 
 # Directory to store generated audio files
 AUDIO_DIR = 'audio_files'
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
-# Store active chat sessions per socket connection
+# Content-addressed audio files with age/LRU eviction against a disk budget.
+# Files referenced by a recent avatar_speaks event stay pinned for AUDIO_PIN_SECONDS.
+audio_store = AudioStore(
+    AUDIO_DIR,
+    max_bytes=int(os.environ.get('AUDIO_DIR_MAX_MB', '500')) * 1024 * 1024,
+    max_age_seconds=int(os.environ.get('AUDIO_MAX_AGE_SECONDS', str(24 * 3600))),
+    pin_seconds=int(os.environ.get('AUDIO_PIN_SECONDS', str(15 * 60))),
+    hot_max_bytes=int(os.environ.get('AUDIO_HOT_CACHE_MB', '64')) * 1024 * 1024,
+)
+
+# Cache of synthesized speech + animation (memory LRU backed by disk)
+tts_cache = TTSCache(
+    os.environ.get('TTS_CACHE_DIR', 'tts_cache'),
+    max_entries=int(os.environ.get('TTS_CACHE_MEMORY_ENTRIES', '256')),
+    max_disk_bytes=int(os.environ.get('TTS_CACHE_DISK_MB', '200')) * 1024 * 1024,
+    max_memory_bytes=int(os.environ.get('TTS_CACHE_MEMORY_MB', '64')) * 1024 * 1024,
+)
+
+# Live Gemini chat objects per interview, rebuilt from the session store when this process has none
 chat_sessions = {}
-conversation_histories = {}
+chat_models = {}  # interview_id -> name of the model its live chat runs on
+
+# Compact turn history of each interview: 'memory' (per process, TTL) or 'sqlite' (survives restarts,
+# shared by every worker on the host). Clients resume an interview by sending its interviewId again.
+session_store = build_session_store(
+    os.environ.get('SESSION_STORE', 'memory'),
+    os.environ.get('SESSION_STORE_PATH', 'sessions.db'),
+    ttl_seconds=int(os.environ.get('SESSION_TTL_SECONDS', '0')) or None,
+)
+interview_ids = {}  # socket session id -> interview id (the socket id unless the client supplied one)
+chat_rehydrate_latency = LatencyStats()
+
+# Bounded Gemini context: a chat past CONTEXT_TOKEN_BUDGET (estimated) is rebuilt from the persona, a rolling
+# summary of older turns and the last CONTEXT_KEEP_TURNS turns verbatim (0 disables). The summary is
+# refreshed in the background once CONTEXT_SUMMARY_MIN_TURNS more turns have aged out of the window.
+CONTEXT_TOKEN_BUDGET = int(os.environ.get('CONTEXT_TOKEN_BUDGET', '6000'))
+CONTEXT_KEEP_TURNS = int(os.environ.get('CONTEXT_KEEP_TURNS', '8'))
+CONTEXT_SUMMARY_MIN_TURNS = int(os.environ.get('CONTEXT_SUMMARY_MIN_TURNS', '4'))
+gemini_turn_stats = {
+    'prompt_tokens': LatencyStats(),  # Estimated tokens per follow-up request (history + prompt)
+    'latency': LatencyStats(),  # Seconds from send_message to the complete response
+    'context_rebuilds': 0,
+}
 
-# Store active audio streaming sessions
+# Store active audio streaming sessions (capped PCMBuffer per session)
 audio_stream_buffers = {}
-stt_stream_configs = {}
+audio_memory_budget = AudioMemoryBudget(AUDIO_INGEST_BUDGET_MB * 1024 * 1024)
+stt_stream_configs = {}  # session_id -> {'streaming': bool, 'hands_free': bool, 'end_silence_seconds': float}
+stt_streams = {}  # session_id -> StreamingRecognizer for the answer in progress
+
+# Streaming recognition: feed each answer to Speech-to-Text while the candidate is still talking.
+# Off by default; clients opt in per session with streamingStt: true in start_interview.
+STT_STREAMING = os.environ.get('STT_STREAMING', '').lower() in ('1', 'true', 'yes')
+STT_RECOGNIZER = os.environ.get('STT_RECOGNIZER', 'google').lower()  # 'google', or 'fake' to test offline
+
+# Hands-free turns: the server ends the answer after this much trailing silence, without audio_stream_end.
+# Off by default; clients opt in per session with handsFree: true in start_interview.
+HANDS_FREE = os.environ.get('HANDS_FREE', '').lower() in ('1', 'true', 'yes')
+HANDS_FREE_SILENCE_SECONDS = float(os.environ.get('HANDS_FREE_SILENCE_SECONDS', '0.8'))
+endpointers = {}  # session_id -> EndpointDetector for the hands-free answer in progress
+
+# Voice activity detection: only the speech span (plus padding) of each answer is sent to recognize()
+VAD_TRIM = os.environ.get('VAD_TRIM', 'true').lower() in ('1', 'true', 'yes')
+VAD_PADDING_SECONDS = float(os.environ.get('VAD_PADDING_SECONDS', '0.2'))
+vad_stats = {
+    'answers': 0,
+    'rejected_silent': 0,
+    'received_seconds': 0.0,
+    'speech_seconds': 0.0,
+    'sent_seconds': 0.0,
+}
 
-# Viseme mapping: Maps phonemes to facial blend shape indices
-PHONEME_TO_VISEME_MAP = {
-    # Silence
-    'sil': 0, 'pau': 0,
-    
-    # Vowels
-    'AA': 1, 'aa': 1, 'AE': 2, 'ae': 2, 'AH': 3, 'ah': 3,
-    'AO': 4, 'ao': 4, 'AW': 5, 'aw': 5, 'AY': 6, 'ay': 6,
-    'EH': 7, 'eh': 7, 'ER': 8, 'er': 8, 'EY': 9, 'ey': 9,
-    'IH': 10, 'ih': 10, 'IY': 11, 'iy': 11, 'OW': 12, 'ow': 12,
-    'OY': 13, 'oy': 13, 'UH': 14, 'uh': 14, 'UW': 15, 'uw': 15,
-    
-    # Consonants
-    'B': 16, 'b': 16, 'CH': 17, 'ch': 17, 'D': 18, 'd': 18,
-    'DH': 19, 'dh': 19, 'F': 20, 'f': 20, 'G': 21, 'g': 21,
-    'HH': 22, 'hh': 22, 'JH': 17, 'jh': 17, 'K': 21, 'k': 21,
-    'L': 23, 'l': 23, 'M': 16, 'm': 16, 'N': 18, 'n': 18,
-    'NG': 21, 'ng': 21, 'P': 16, 'p': 16, 'R': 24, 'r': 24,
-    'S': 25, 's': 25, 'SH': 17, 'sh': 17, 'T': 18, 't': 18,
-    'TH': 26, 'th': 26, 'V': 20, 'v': 20, 'W': 15, 'w': 15,
-    'Y': 11, 'y': 11, 'Z': 25, 'z': 25, 'ZH': 17, 'zh': 17,
+# Compress answers before recognize(): 'flac' (lossless, cheap) or 'ogg_opus' (smallest, CPU heavy).
+# Needs the optional soundfile package; falls back to LINEAR16 without it.
+STT_UPLOAD_ENCODING = normalize_stt_encoding(os.environ.get('STT_UPLOAD_ENCODING'))
+stt_upload_stats = {
+    'requests': 0,
+    'pcm_bytes': 0,
+    'uploaded_bytes': 0,
+    'encode_seconds': 0.0,
+}
+STT_ENCODING_ENUMS = {
+    'linear16': speech.RecognitionConfig.AudioEncoding.LINEAR16,
+    'flac': speech.RecognitionConfig.AudioEncoding.FLAC,
+    'ogg_opus': speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
 }
 
-BLEND_SHAPES = [
-    'mouthClose', 'mouthFunnel', 'mouthPucker', 'mouthLeft', 'mouthRight',
-    'mouthSmileLeft', 'mouthSmileRight', 'mouthFrownLeft', 'mouthFrownRight',
-    'mouthDimpleLeft', 'mouthDimpleRight', 'mouthStretchLeft', 'mouthStretchRight',
-    'mouthRollLower', 'mouthRollUpper', 'mouthShrugLower', 'mouthShrugUpper',
-    'mouthPressLeft', 'mouthPressRight', 'mouthLowerDownLeft', 'mouthLowerDownRight',
-    'mouthUpperUpLeft', 'mouthUpperUpRight', 'browDownLeft', 'browDownRight',
-    'browInnerUp', 'browOuterUpLeft', 'browOuterUpRight', 'cheekPuff', 'cheekSquintLeft',
-    'cheekSquintRight', 'noseSneerLeft', 'noseSneerRight', 'tongueOut', 'jawForward',
-    'jawLeft', 'jawRight', 'jawOpen', 'eyeBlinkLeft', 'eyeBlinkRight',
-    'eyeLookDownLeft', 'eyeLookDownRight', 'eyeLookInLeft', 'eyeLookInRight',
-    'eyeLookOutLeft', 'eyeLookOutRight', 'eyeLookUpLeft', 'eyeLookUpRight',
-    'eyeSquintLeft', 'eyeSquintRight', 'eyeWideLeft', 'eyeWideRight'
-]
+# Batch recognition is routed by duration: latest_short up to STT_SHORT_MAX_SECONDS of speech,
+# synchronous latest_long up to STT_SYNC_MAX_SECONDS of audio, long_running_recognize beyond
+STT_SHORT_MAX_SECONDS = float(os.environ.get('STT_SHORT_MAX_SECONDS', '10'))
+STT_SYNC_MAX_SECONDS = float(os.environ.get('STT_SYNC_MAX_SECONDS', '55'))
+STT_POLL_INTERVAL_SECONDS = float(os.environ.get('STT_POLL_INTERVAL_SECONDS', '0.5'))
+# Answers longer than this are split at pauses into segments of at most this length and
+# recognized concurrently by up to STT_SEGMENT_WORKERS requests (0 disables)
+STT_SEGMENT_SECONDS = float(os.environ.get('STT_SEGMENT_SECONDS', '20'))
+STT_SEGMENT_WORKERS = int(os.environ.get('STT_SEGMENT_WORKERS', '4'))
+
+# Time from audio_stream_end to the final transcript, per streaming mode or batch route
+stt_latency = {route: LatencyStats() for route in ('streaming',) + STT_ROUTES}
+
+# Blend data wire format negotiated per socket connection (JSON unless the client opts in)
+blend_formats = {}
+
+# Sentence-pipelined turns: stream Gemini tokens and synthesize each sentence as soon as it ends.
+# Off by default; clients opt in per session with streaming: true in start_interview.
+STREAMING_TURNS = os.environ.get('STREAMING_TURNS', '').lower() in ('1', 'true', 'yes')
+STREAMING_MAX_SYNTH_AHEAD = int(os.environ.get('STREAMING_MAX_SYNTH_AHEAD', '3'))
+streaming_sessions = {}
+
+# Instant acknowledgements: as soon as the answer is transcribed, play a short pre-synthesized clip
+# ("Thanks, that's helpful.") while the real response is generated behind it.
+# Off by default; clients opt in per session with acknowledge: true in start_interview.
+ACK_RESPONSES = os.environ.get('ACK_RESPONSES', '').lower() in ('1', 'true', 'yes')
+ACK_PHRASES = [phrase.strip() for phrase in os.environ['ACK_PHRASES'].split('|')] \
+    if os.environ.get('ACK_PHRASES') else DEFAULT_PHRASES
+ack_sessions = {}  # session_id -> last acknowledgement phrase sent ('' before the first)
+
+# Per-turn latency budget, from the end of the candidate's answer to the response being sent.
+# Speech-to-Text gets what the turn has left minus the Gemini and TTS reserves, Gemini what is
+# left minus the TTS reserve. A stage out of time degrades instead of holding up the turn: the
+# candidate is asked to repeat, gets a generic follow-up, or sees the words without audio.
+# TURN_BUDGET_SECONDS=0 turns deadlines off.
+TURN_BUDGET_SECONDS = float(os.environ.get('TURN_BUDGET_SECONDS', '12'))
+TURN_BUDGET_PER_AUDIO_SECOND = float(os.environ.get('TURN_BUDGET_PER_AUDIO_SECOND', '0.5'))  # Long answers take longer to recognize
+LLM_BUDGET_SECONDS = float(os.environ.get('LLM_BUDGET_SECONDS', '6'))
+TTS_BUDGET_SECONDS = float(os.environ.get('TTS_BUDGET_SECONDS', '3'))
+LLM_FALLBACK_RESPONSE = "Thanks for sharing that. Could you walk me through a specific example from your experience?"
+turn_fallbacks = {'stt': 0, 'llm': 0, 'tts': 0}
+
+# Hedged requests for the idempotent TTS and short Speech-to-Text calls: once a call has taken
+# longer than the rolling p95, a second request goes out on another channel and the first
+# response wins. Off by default; at most HEDGE_MAX_RATIO of calls are hedged.
+HEDGE_REQUESTS = os.environ.get('HEDGE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+HEDGE_MAX_RATIO = float(os.environ.get('HEDGE_MAX_RATIO', '0.1'))
+tts_hedger = Hedger('tts', HEDGE_REQUESTS, HEDGE_MAX_RATIO)
+stt_hedger = Hedger('stt_short', HEDGE_REQUESTS, HEDGE_MAX_RATIO)
+
+
+# Admission control: at most MAX_CONCURRENT_TURNS turns (recognition, Gemini, speech) run at once;
+# the rest wait in a FIFO queue of TURN_QUEUE_SIZE for up to TURN_QUEUE_WAIT_SECONDS, and the client
+# gets a busy event with the expected wait. Once turns have been queueing for SHED_AFTER_SECONDS,
+# admitted turns only use cached speech (else text only) until the queue drains.
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get('MAX_CONCURRENT_TURNS', '8')),
+    max_queue=int(os.environ.get('TURN_QUEUE_SIZE', '32')),
+    max_wait_seconds=float(os.environ.get('TURN_QUEUE_WAIT_SECONDS', '10')),
+    shed_after_seconds=float(os.environ.get('SHED_AFTER_SECONDS', '5')),
+)
+BUSY_RESPONSE = "I'm talking with a lot of candidates right now. Could you give me a moment and answer again?"
 
 
-def phoneme_to_blend_shapes(phoneme, intensity=1.0):
-    """Convert a phoneme to blend shape values"""
-    blend_values = {shape: 0.0 for shape in BLEND_SHAPES}
-    
-    viseme_index = PHONEME_TO_VISEME_MAP.get(phoneme, 0)
-    
-    if viseme_index == 0:  # Silence/neutral - Perfect resting position
-        # Neutral face: completely relaxed, lips together, jaw closed
-        blend_values['mouthClose'] = 0.0  # Don't force close, let it rest naturally
-        blend_values['jawOpen'] = 0.0  # Jaw completely closed
-        # Keep everything else at 0 for natural resting face
-    elif viseme_index in [1, 2, 3]:  # Open vowels
-        blend_values['jawOpen'] = 0.6 * intensity
-        blend_values['mouthFunnel'] = 0.3 * intensity
-    elif viseme_index in [4, 12]:  # O sounds
-        blend_values['jawOpen'] = 0.4 * intensity
-        blend_values['mouthFunnel'] = 0.7 * intensity
-        blend_values['mouthPucker'] = 0.5 * intensity
-    elif viseme_index in [5, 6]:  # Diphthongs
-        blend_values['jawOpen'] = 0.5 * intensity
-        blend_values['mouthStretchLeft'] = 0.3 * intensity
-        blend_values['mouthStretchRight'] = 0.3 * intensity
-    elif viseme_index in [7, 9]:  # E sounds
-        blend_values['jawOpen'] = 0.3 * intensity
-        blend_values['mouthSmileLeft'] = 0.4 * intensity
-        blend_values['mouthSmileRight'] = 0.4 * intensity
-    elif viseme_index in [10, 11]:  # I sounds
-        blend_values['jawOpen'] = 0.2 * intensity
-        blend_values['mouthStretchLeft'] = 0.5 * intensity
-        blend_values['mouthStretchRight'] = 0.5 * intensity
-    elif viseme_index in [14, 15]:  # U sounds
-        blend_values['mouthPucker'] = 0.7 * intensity
-        blend_values['jawOpen'] = 0.2 * intensity
-    elif viseme_index == 16:  # Bilabials
-        blend_values['mouthClose'] = 0.9 * intensity
-        blend_values['mouthPressLeft'] = 0.5 * intensity
-        blend_values['mouthPressRight'] = 0.5 * intensity
-    elif viseme_index == 17:  # Palatals
-        blend_values['jawOpen'] = 0.2 * intensity
-        blend_values['mouthFunnel'] = 0.4 * intensity
-    elif viseme_index == 18:  # Alveolars
-        blend_values['jawOpen'] = 0.3 * intensity
-        blend_values['mouthRollUpper'] = 0.3 * intensity
-    elif viseme_index == 19:  # Dental
-        blend_values['jawOpen'] = 0.3 * intensity
-        blend_values['tongueOut'] = 0.5 * intensity
-    elif viseme_index == 20:  # Labiodentals
-        blend_values['mouthRollLower'] = 0.6 * intensity
-        blend_values['jawOpen'] = 0.2 * intensity
-    elif viseme_index == 21:  # Velars
-        blend_values['jawOpen'] = 0.4 * intensity
-    elif viseme_index == 23:  # L
-        blend_values['jawOpen'] = 0.3 * intensity
-        blend_values['tongueOut'] = 0.3 * intensity
-    elif viseme_index == 24:  # R
-        blend_values['mouthFunnel'] = 0.4 * intensity
-        blend_values['jawOpen'] = 0.3 * intensity
-    elif viseme_index == 25:  # Sibilants
-        blend_values['mouthStretchLeft'] = 0.3 * intensity
-        blend_values['mouthStretchRight'] = 0.3 * intensity
-        blend_values['jawOpen'] = 0.1 * intensity
-    elif viseme_index == 26:  # TH
-        blend_values['jawOpen'] = 0.2 * intensity
-        blend_values['tongueOut'] = 0.4 * intensity
-    
-    return blend_values
+def turn_deadline(audio_seconds=0.0, elapsed=0.0):
+    """Deadline for a turn whose answer ended elapsed seconds ago (unbounded with TURN_BUDGET_SECONDS=0)"""
+    if not TURN_BUDGET_SECONDS:
+        return Deadline()
+    return Deadline(TURN_BUDGET_SECONDS + TURN_BUDGET_PER_AUDIO_SECOND * audio_seconds - elapsed)
+
+
+def stage_deadline(seconds):
+    """Deadline for a single call outside a turn (unbounded with TURN_BUDGET_SECONDS=0)"""
+    return Deadline(seconds if TURN_BUDGET_SECONDS else None)
+
+
+def grpc_timeout(timeout):
+    """timeout= keyword for a Google client call, or none to keep the client default"""
+    return {} if timeout is None else {'timeout': timeout}
+
+# Time from the candidate's answer being known to the first interviewer audio being sent
+time_to_first_audio = {
+    'full': LatencyStats(),
+    'streaming': LatencyStats(),
+}
+
+# Time from the answer being known to the first sound the candidate hears, with and without acknowledgements
+time_to_first_sound = {
+    'with_ack': LatencyStats(),
+    'without_ack': LatencyStats(),
+}
+
+# Max deviation from linear interpolation when decimating animation into keyframes
+KEYFRAME_TOLERANCE = float(os.environ.get('KEYFRAME_TOLERANCE', DEFAULT_KEYFRAME_TOLERANCE))
 
 
 def generate_blend_data_from_text(text, speaking_rate=1.0):
     """Generate blend shape animation data from text with natural timing"""
-    import math
-    
-    words = text.split()
-    word_count = max(len(words), 1)
-    
-    # Natural speaking: ~2 words per second, adjusted by rate
-    words_per_second = 2.0 * speaking_rate
-    duration = max(word_count / words_per_second, 0.5)
-    
-    fps = 60
-    total_frames = int(duration * fps)
-    blend_data = []
-    
-    # Simplified, slower phoneme cycle for natural speech
-    phoneme_cycle = ['sil', 'AA', 'EH', 'OW', 'M', 'sil']
-    cycle_length = len(phoneme_cycle)
-    frames_per_phoneme = max(8, total_frames // (word_count * 3))  # Slower transitions
-    
-    for frame in range(total_frames):
-        # Slow phoneme cycling
-        phoneme_index = (frame // frames_per_phoneme) % cycle_length
-        phoneme = phoneme_cycle[phoneme_index]
-        
-        # Very subtle intensity (0.2 to 0.5 range for natural look)
-        phase = (frame % frames_per_phoneme) / frames_per_phoneme
-        intensity = 0.3 + 0.2 * math.sin(phase * math.pi)
-        
-        blend_values = phoneme_to_blend_shapes(phoneme, intensity)
-        
-        # Reduce all values by 40% for more subtle movement
-        for key in blend_values:
-            blend_values[key] *= 0.6
-        
-        frame_data = {'blendshapes': blend_values}
-        blend_data.append(frame_data)
+    return blend_matrix_to_frames(blend_matrix_from_text(text, speaking_rate))
+
+
+def generate_blend_data_from_actual_duration(text, duration):
+    """Generate blend shape animation data from text with actual audio duration"""
+    blend_data = blend_matrix_to_frames(blend_matrix_from_duration(text, duration))
     
-    # Extended neutral closing (30 frames = 0.5 seconds)
-    neutral_values = phoneme_to_blend_shapes('sil', 1.0)
-    for _ in range(30):
-        blend_data.append({'blendshapes': neutral_values})
+    print(f'🎭 Generated {len(blend_data)} frames for {duration:.2f}s audio ({len(blend_data)/FPS:.2f}s animation)')
     
     return blend_data
 
 
-def generate_blend_data_from_actual_duration(text, duration):
-    """Generate blend shape animation data from text with actual audio duration"""
-    import math
+def synthesize_speech(text, voice_name, speaking_rate, pitch, deadline=None):
+    """Call the TTS API (hedged, within deadline) and build the animation clip matching the returned audio"""
+    # Configure TTS
+    synthesis_input = texttospeech.SynthesisInput(text=text)
     
-    fps = 60
-    total_frames = int(duration * fps)
-    blend_data = []
+    voice = texttospeech.VoiceSelectionParams(
+        language_code='en-US',
+        name=voice_name,
+    )
     
-    words = text.split()
-    word_count = max(len(words), 1)
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        speaking_rate=speaking_rate,  # Natural, clear speech
+        pitch=pitch,
+    )
     
-    # Simplified, slower phoneme cycle for natural speech
-    phoneme_cycle = ['sil', 'AA', 'EH', 'OW', 'M', 'sil']
-    cycle_length = len(phoneme_cycle)
-    frames_per_phoneme = max(8, total_frames // (word_count * 3))  # Slower transitions
+    # Synthesize speech
+    print(f'📞 Calling TTS API with voice: {voice.name}...')
+    response = tts_hedger.run(
+        tts_pool,
+        lambda client, timeout: client.synthesize_speech(
+            input=synthesis_input,
+            voice=voice,
+            audio_config=audio_config,
+            **grpc_timeout(timeout)
+        ),
+        deadline or Deadline(),
+    )
     
-    for frame in range(total_frames):
-        # Slow phoneme cycling
-        phoneme_index = (frame // frames_per_phoneme) % cycle_length
-        phoneme = phoneme_cycle[phoneme_index]
-        
-        # Very subtle intensity (0.2 to 0.5 range for natural look)
-        phase = (frame % frames_per_phoneme) / frames_per_phoneme
-        intensity = 0.3 + 0.2 * math.sin(phase * math.pi)
-        
-        blend_values = phoneme_to_blend_shapes(phoneme, intensity)
-        
-        # Reduce all values by 40% for more subtle movement
-        for key in blend_values:
-            blend_values[key] *= 0.6
-        
-        frame_data = {'blendshapes': blend_values}
-        blend_data.append(frame_data)
+    if not response or not response.audio_content:
+        error_msg = 'TTS API returned empty response'
+        print(f'❌ {error_msg}')
+        raise RuntimeError(error_msg)
     
-    # Extended neutral closing (30 frames = 0.5 seconds)
-    neutral_values = phoneme_to_blend_shapes('sil', 1.0)
-    for _ in range(30):
-        blend_data.append({'blendshapes': neutral_values})
+    print(f'✅ TTS API returned {len(response.audio_content)} bytes of audio')
     
-    print(f' Generated {len(blend_data)} frames for {duration:.2f}s audio ({len(blend_data)/fps:.2f}s animation)')
+    # Get actual audio duration for perfect sync
+    try:
+        from mutagen.mp3 import MP3
+        actual_duration = MP3(io.BytesIO(response.audio_content)).info.length
+        print(f'⏱️ Audio duration: {actual_duration:.2f}s for text: "{text[:50]}..."')
+        
+        # Generate blend data matching actual audio duration
+        clip = blend_matrix_from_duration(text, actual_duration)
+        print(f'🎭 Generated {len(clip)} frames for {actual_duration:.2f}s audio ({len(clip)/FPS:.2f}s animation)')
+    except ImportError:
+        print('⚠️ mutagen not installed, using estimated duration')
+        # Fallback to estimated duration
+        clip = blend_matrix_from_text(text, speaking_rate)
+    except Exception as e:
+        print(f'⚠️ Could not get audio duration: {e}, using estimated')
+        clip = blend_matrix_from_text(text, speaking_rate)
     
-    return blend_data
+    return response.audio_content, clip
 
 
-def generate_speech_and_animation(text):
-    """Generate speech audio and blend shape data"""
+def voice_settings():
+    """(voice name, speaking rate, pitch) from environment or defaults"""
+    speaking_rate = float(os.environ.get('SPEAKING_RATE', '0.9'))  # Natural speaking speed
+    voice_name = os.environ.get('VOICE_NAME', 'en-US-Neural2-F')
+    pitch = float(os.environ.get('VOICE_PITCH', '0.0'))
+    return voice_name, speaking_rate, pitch
+
+
+def speech_cache_key(text):
+    """TTS cache key for text in the interviewer's voice"""
+    return TTSCache.make_key(text, *voice_settings(), 'MP3')
+
+
+def store_speech_audio(text, audio_bytes):
+    """Put synthesized audio in the served store, sharing the TTS cache's file rather than copying it"""
+    return audio_store.put(audio_bytes, source_path=tts_cache.audio_path(speech_cache_key(text)))
+
+
+def synthesize_cached(text, deadline=None, cache_only=False):
+    """(MP3 bytes, animation clip) for text in the interviewer's voice, through the TTS cache
+
+    cache_only (shedding load) never calls the TTS API: LoadShed on a cache miss.
+    """
+    voice_name, speaking_rate, pitch = voice_settings()
+    
+    # Identical requests (fixed prompts, repeated fallbacks) are served from the cache,
+    # and concurrent identical requests share a single TTS call
+    cache_key = speech_cache_key(text)
+    if cache_only:
+        entry = tts_cache.peek(cache_key, text)
+        admission.record_shed('cached_audio' if entry is not None else 'text_only')
+        if entry is None:
+            raise LoadShed('no cached audio for this text')
+        return entry
+    # A request coalesced onto another caller's synthesis waits no longer than its own deadline,
+    # and synthesizes itself if that caller's deadline ran out first
+    deadline = deadline or Deadline()
+    try:
+        return tts_cache.get_or_create(
+            cache_key, text, lambda: synthesize_speech(text, voice_name, speaking_rate, pitch, deadline),
+            wait_timeout=deadline.timeout(), retry_on=(DeadlineExceeded,)
+        )
+    except TimeoutError as e:
+        if isinstance(e, DeadlineExceeded) or not deadline.expired(EXPIRY_SLACK_SECONDS):
+            raise
+        raise DeadlineExceeded('tts deadline passed') from e
+
+
+ack_pool = AcknowledgementPool(ACK_PHRASES, synthesize_cached)
+
+
+def send_acknowledgement(session_id, started_at):
+    """Emit a pre-synthesized acknowledgement clip right away; False if the session has none ready"""
+    if session_id not in ack_sessions or not ack_pool.ready:
+        return False
+    phrase, audio_bytes, clip = ack_pool.pick(exclude=ack_sessions[session_id])
+    ack_sessions[session_id] = phrase
+    # Re-put is a dedup hit that also keeps the file on disk and hot in memory
+    audio_filename = f'/audio/{store_speech_audio(phrase, audio_bytes)}'
+    payload = build_avatar_payload(clip, audio_filename, phrase, **blend_formats.get(session_id, {}))
+    socketio.emit('avatar_ack', payload, room=session_id)
+    first_sound = time.perf_counter() - started_at
+    time_to_first_sound['with_ack'].record(first_sound)
+    print(f'💬 Acknowledged after {first_sound * 1000:.0f} ms: "{phrase}"')
+    return True
+
+
+def generate_speech_clip(text, deadline=None, cache_only=False):
+    """Generate speech audio and its blend shape animation clip (frames x shapes array)"""
     # Check if TTS client is initialized
     if tts_client is None:
         error_msg = 'Text-to-Speech client is not initialized. Cannot generate audio.'
@@ -397,65 +610,18 @@ def generate_speech_and_animation(text):
     
     try:
         print(f'🎙️ Generating speech for: "{text[:50]}..."')
-        # Configure TTS
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        
-        # Get speaking rate from environment or use default
-        speaking_rate = float(os.environ.get('SPEAKING_RATE', '0.9'))  # Natural speaking speed
-        
-        voice = texttospeech.VoiceSelectionParams(
-            language_code='en-US',
-            name=os.environ.get('VOICE_NAME', 'en-US-Neural2-F'),
-        )
         
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=speaking_rate,  # Natural, clear speech
-            pitch=float(os.environ.get('VOICE_PITCH', '0.0')),
-        )
-        
-        # Synthesize speech
-        print(f'📞 Calling TTS API with voice: {voice.name}...')
-        response = tts_client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-        
-        if not response or not response.audio_content:
-            error_msg = 'TTS API returned empty response'
-            print(f'❌ {error_msg}')
-            raise RuntimeError(error_msg)
-        
-        print(f'✅ TTS API returned {len(response.audio_content)} bytes of audio')
-        
-        # Save audio file
-        filename = f'{uuid.uuid4()}.mp3'
-        filepath = os.path.join(AUDIO_DIR, filename)
-        
-        with open(filepath, 'wb') as audio_file:
-            audio_file.write(response.audio_content)
+        audio_content, clip = synthesize_cached(text, deadline, cache_only)
         
-        print(f'💾 Saved audio file: {filepath} ({len(response.audio_content)} bytes)')
+        # Save audio file (content-addressed, so repeated utterances share one file)
+        filename = store_speech_audio(text, audio_content)
         
-        # Get actual audio duration for perfect sync
-        try:
-            from mutagen.mp3 import MP3
-            audio_file = MP3(filepath)
-            actual_duration = audio_file.info.length
-            print(f' Audio duration: {actual_duration:.2f}s for text: "{text[:50]}..."')
-            
-            # Generate blend data matching actual audio duration
-            blend_data = generate_blend_data_from_actual_duration(text, actual_duration)
-        except ImportError:
-            print('️ mutagen not installed, using estimated duration')
-            # Fallback to estimated duration
-            blend_data = generate_blend_data_from_text(text, speaking_rate)
-        except Exception as e:
-            print(f'️ Could not get audio duration: {e}, using estimated')
-            blend_data = generate_blend_data_from_text(text, speaking_rate)
+        print(f'💾 Saved audio file: {audio_store.path(filename)} ({len(audio_content)} bytes)')
         
-        return blend_data, f'/audio/{filename}'
+        return clip, f'/audio/{filename}'
+    
+    except (DeadlineExceeded, LoadShed):
+        raise  # Expected under load; callers send the text without audio
     
     except Exception as e:
         print(f' Error generating speech: {str(e)}')
@@ -465,17 +631,272 @@ def generate_speech_and_animation(text):
         raise
 
 
-def get_ai_response(session_id, user_text):
-    """Get AI interviewer response using Gemini"""
+def generate_speech_and_animation(text):
+    """Generate speech audio and blend shape data"""
+    clip, audio_filename = generate_speech_clip(text)
+    return blend_matrix_to_frames(clip), audio_filename
+
+
+def build_avatar_payload(clip, audio_filename, transcript, blend_format=BLEND_FORMAT_JSON,
+                         keyframe_tolerance=KEYFRAME_TOLERANCE):
+    """Build an avatar_speaks payload with blend data in the negotiated wire format"""
+    payload = {
+        'filename': audio_filename,
+        'transcript': transcript
+    }
+    if blend_format in BINARY_BLEND_FORMATS:
+        # Shape names once in the header, frames as a binary attachment
+        payload['blendFormat'], payload['blendBuffer'] = encode_blend_matrix(clip, blend_format)
+    elif blend_format == BLEND_FORMAT_KEYFRAMES:
+        # Only the (time, value) keyframes that linear interpolation can't reproduce
+        payload['blendKeyframes'] = encode_blend_keyframes(clip, keyframe_tolerance)
+    else:
+        payload['blendData'] = blend_matrix_to_frames(clip)
+    return payload
+
+
+def send_avatar_speech(session_id, text, event='avatar_speaks', deadline=None, shed=False):
+    """Synthesize text and send the audio and animation to one client
+
+    When synthesis misses its deadline, or shed is set and the audio is not
+    cached, the text is sent without audio.
+    """
+    try:
+        clip, audio_filename = generate_speech_clip(text, deadline or stage_deadline(TTS_BUDGET_SECONDS), shed)
+    except (DeadlineExceeded, LoadShed) as e:
+        if isinstance(e, DeadlineExceeded):
+            turn_fallbacks['tts'] += 1
+        print(f'⏰ {str(e)} - sending {event} without audio')
+        socketio.emit(event, {'filename': None, 'transcript': text}, room=session_id)
+        return
+    payload = build_avatar_payload(clip, audio_filename, text, **blend_formats.get(session_id, {}))
+    
+    print(f'📤 Sending {event} event with audio: {audio_filename}')
+    socketio.emit(event, payload, room=session_id)
+
+
+def interview_id_for(session_id):
+    return interview_ids.get(session_id, session_id)
+
+
+def interview_context_prompt(position):
+    """Stands in for the opening prompt when a chat is rebuilt from stored turns"""
+    role = f' for the {position} position' if position else ''
+    return (f'You are Alicia, a professional AI interviewer, interviewing a candidate{role}. '
+            'Continue the interview: ask relevant follow-up questions, 1-3 natural, conversational sentences at a time.')
+
+
+def drop_chat(interview_id):
+    chat_sessions.pop(interview_id, None)
+    chat_models.pop(interview_id, None)
+
+
+def start_interview_record(interview_id, position):
+    """Store a new, empty interview and drop any live chat left over under the same id"""
+    drop_chat(interview_id)
+    session_store.create(interview_id, position)
+    return new_record(position)
+
+
+def chat_tokens(chat):
+    return chat_text_bytes(chat) // CHARS_PER_TOKEN
+
+
+def summarize_context(prompt):
+    model_name = model_router.choose()
+    if model_name is None:
+        raise RuntimeError('no Gemini model available')
+    started_at = time.perf_counter()
+    try:
+        text = gemini_pool.run(model_router.model(model_name).generate_content, prompt).text
+    except Exception:
+        model_router.record(model_name, False, time.perf_counter() - started_at)
+        raise
+    model_router.record(model_name, True, time.perf_counter() - started_at)
+    return text
+
+
+context_summaries = RollingSummaries(
+    summarize_context, socketio.start_background_task, min_new_turns=CONTEXT_SUMMARY_MIN_TURNS
+)
+
+
+def get_chat(interview_id, record, model_name, switch_reason='rerouted'):
+    """Live Gemini chat for an interview on model_name, rebuilt from its stored turns if this process has none
+
+    With a context budget the chat is also rebuilt once its history outgrows the
+    budget, keeping the persona, the rolling summary and the most recent turns.
+    Moving an interview to another model replays its stored turns the same way.
+    """
+    chat = chat_sessions.get(interview_id)
+    previous_model = chat_models.get(interview_id)
+    if chat is not None and previous_model != model_name:
+        model_router.note_switch(interview_id, previous_model, model_name, switch_reason)
+        chat = None
+    over_budget = chat is not None and CONTEXT_TOKEN_BUDGET and chat_tokens(chat) > CONTEXT_TOKEN_BUDGET
+    if chat is not None and not over_budget:
+        return chat
+    started_at = time.perf_counter()
+    persona = interview_context_prompt(record['position'])
+    if CONTEXT_TOKEN_BUDGET:
+        messages = bounded_history(record['turns'], persona, context_summaries.get(interview_id),
+                                   CONTEXT_KEEP_TURNS, CONTEXT_TOKEN_BUDGET)
+    else:
+        messages = chat_history(record, persona)
+    history = [Content(role=role, parts=[Part.from_text(text)]) for role, text in messages]
+    chat = model_router.model(model_name).start_chat(history=history)
+    if over_budget:
+        gemini_turn_stats['context_rebuilds'] += 1
+        print(f'✂️ Context for {interview_id} over {CONTEXT_TOKEN_BUDGET} tokens - rebuilt with '
+              f'{len(messages)} messages (~{chat_tokens(chat)} tokens)')
+    elif record['turns']:
+        chat_rehydrate_latency.record(time.perf_counter() - started_at)
+        print(f'♻️ Rebuilt chat for {interview_id} on {model_name} from {len(record["turns"])} stored turns')
+    chat_sessions[interview_id] = chat
+    chat_models[interview_id] = model_name
+    return chat
+
+
+def routed_chats(interview_id, record, deadline):
+    """(model_name, chat) for each attempt at one turn: the healthiest model first, then the
+    next healthiest after each failure, with the chat rebuilt from the stored turns
+
+    The caller records each attempt's outcome with model_router.record(), or
+    model_router.release() when it has none. DeadlineExceeded before a model is chosen.
+    """
+    failed = []
+    while True:
+        deadline.check('llm')
+        model_name = model_router.choose(exclude=failed)
+        if model_name is None:
+            break
+        reason = f'{failed[-1]} failed' if failed else 'rerouted'
+        if failed:
+            # Rebuild from the latest stored turns: the caller stored the candidate's answer before the
+            # first attempt (after loading record); the rebuilt history drops that trailing, unanswered
+            # answer, since the prompt resent to this model carries it
+            record = session_store.load(interview_id) or record
+        try:
+            chat = get_chat(interview_id, record, model_name, reason)
+        except Exception:
+            model_router.release(model_name)
+            raise
+        yield model_name, chat
+        failed.append(model_name)
+    raise RuntimeError(f'no Gemini model available (tried: {", ".join(failed) or "none"})')
+
+
+def abandon_gemini_call(interview_id, model_name, started_at):
+    """Count a call that ran out of time against its model and drop the chat it may still complete on"""
+    model_router.record(model_name, False, time.perf_counter() - started_at)
+    drop_chat(interview_id)
+    turn_fallbacks['llm'] += 1
+    print(f'⏰ Gemini {model_name} missed the turn deadline')
+
+
+def send_gemini_turn(interview_id, record, prompt, deadline=None):
+    """Send prompt on the routed chat; returns (text, prompt_tokens), failing over between models
+
+    Raises DeadlineExceeded once deadline passes.
+    """
+    deadline = deadline or Deadline()
+    for model_name, chat in routed_chats(interview_id, record, deadline):
+        recorded = False
+        try:
+            prompt_tokens = chat_tokens(chat) + estimate_tokens(prompt)
+            started_at = time.perf_counter()
+            try:
+                text = run_with_deadline(gemini_pool, deadline, 'llm', chat.send_message, prompt).text
+            except DeadlineExceeded:
+                recorded = True
+                abandon_gemini_call(interview_id, model_name, started_at)
+                raise
+            except Exception as e:
+                recorded = True
+                model_router.record(model_name, False, time.perf_counter() - started_at)
+                print(f'⚠️ Gemini {model_name} failed: {str(e)}')
+                continue
+            recorded = True
+            model_router.record(model_name, True, time.perf_counter() - started_at)
+            return text, prompt_tokens
+        finally:
+            if not recorded:
+                model_router.release(model_name)
+
+
+def stream_gemini_turn(interview_id, record, prompt, deadline=None):
+    """Yield the routed chat's response chunks; returns (full_response, prompt_tokens)
+
+    Fails over to the next model only while nothing has been yielded yet.
+    deadline bounds the first chunk; after it each chunk gets LLM_BUDGET_SECONDS,
+    and a stream that stalls past that ends with what it has said so far.
+    """
+    deadline = deadline or Deadline()
+    for model_name, chat in routed_chats(interview_id, record, deadline):
+        prompt_tokens = chat_tokens(chat) + estimate_tokens(prompt)
+        started_at = time.perf_counter()
+        full_response = ""
+        chunk_deadline = deadline
+        done = object()
+        recorded = False
+        try:
+            response_stream = run_with_deadline(gemini_pool, deadline, 'llm', chat.send_message, prompt, stream=True)
+            # Each streamed chunk is pulled on a Gemini pool thread
+            while True:
+                chunk = run_with_deadline(gemini_pool, chunk_deadline, 'llm', next, response_stream, done)
+                if chunk is done:
+                    break
+                if chunk.text:
+                    full_response += chunk.text
+                    chunk_deadline = deadline.renewed(LLM_BUDGET_SECONDS)
+                    yield chunk.text
+        except DeadlineExceeded:
+            recorded = True
+            abandon_gemini_call(interview_id, model_name, started_at)
+            if not full_response:
+                raise
+            return full_response, prompt_tokens
+        except Exception as e:
+            recorded = True
+            model_router.record(model_name, False, time.perf_counter() - started_at)
+            print(f'⚠️ Gemini {model_name} failed: {str(e)}')
+            if full_response:
+                raise
+            continue
+        else:
+            recorded = True
+            model_router.record(model_name, True, time.perf_counter() - started_at)
+            return full_response, prompt_tokens
+        finally:
+            # Closed early (the consumer stopped reading): no outcome to judge the model by
+            if not recorded:
+                model_router.release(model_name)
+
+
+def record_gemini_turn(interview_id, prompt_tokens, started_at):
+    """Log one follow-up request's size and latency, and refresh the summary in the background if due"""
+    latency = time.perf_counter() - started_at
+    gemini_turn_stats['prompt_tokens'].record(prompt_tokens)
+    gemini_turn_stats['latency'].record(latency)
+    print(f'📏 Gemini turn for {interview_id}: ~{prompt_tokens} prompt tokens, {latency * 1000:.0f} ms')
+    if CONTEXT_TOKEN_BUDGET:
+        record = session_store.load(interview_id)
+        if record:
+            context_summaries.maybe_refresh(interview_id, record['turns'], CONTEXT_KEEP_TURNS)
+
+
+def get_ai_response(session_id, user_text, deadline=None):
+    """Get AI interviewer response using Gemini; a generic follow-up if deadline passes first"""
     try:
         print(f' Getting AI response for session: {session_id}')
         print(f' User text: "{user_text}"')
         
-        # Check if chat session exists (it should have been created in start_interview)
-        if session_id not in chat_sessions:
+        # Check if the interview exists (it should have been created in start_interview)
+        interview_id = interview_id_for(session_id)
+        record = session_store.load(interview_id)
+        if record is None:
             print(f'️ No existing chat session for {session_id}, creating new one')
-            chat_sessions[session_id] = gemini_model.start_chat()
-            conversation_histories[session_id] = []
+            record = start_interview_record(interview_id, None)
             
             # If no text provided, get initial greeting
             if not user_text or not user_text.strip():
@@ -486,23 +907,16 @@ def get_ai_response(session_id, user_text):
 
 Keep it to 2-3 sentences."""
                 
-                response = chat_sessions[session_id].send_message(initial_prompt)
-                ai_response = response.text
+                ai_response, _ = send_gemini_turn(interview_id, record, initial_prompt, deadline)
                 
-                conversation_histories[session_id].append({
-                    'role': 'interviewer',
-                    'content': ai_response
-                })
+                session_store.append(interview_id, ROLE_INTERVIEWER, ai_response)
                 
                 print(f' Initial greeting: {ai_response}')
                 return ai_response
         
         # Add user's response to history if not empty
         if user_text and user_text.strip():
-            conversation_histories[session_id].append({
-                'role': 'candidate',
-                'content': user_text
-            })
+            session_store.append(interview_id, ROLE_CANDIDATE, user_text)
             
             # Generate follow-up question
             prompt = f"""The candidate just said: "{user_text}"
@@ -515,18 +929,21 @@ Be encouraging and professional."""
             prompt = "The candidate seems to have paused or you didn't hear them clearly. Politely ask them to repeat or elaborate on their answer. Keep it to 1-2 sentences."
         
         print(f' Sending prompt to Gemini...')
-        response = chat_sessions[session_id].send_message(prompt)
-        ai_response = response.text
+        started_at = time.perf_counter()
+        ai_response, prompt_tokens = send_gemini_turn(interview_id, record, prompt, deadline)
         
         # Add AI's response to history
-        conversation_histories[session_id].append({
-            'role': 'interviewer',
-            'content': ai_response
-        })
+        session_store.append(interview_id, ROLE_INTERVIEWER, ai_response)
+        record_gemini_turn(interview_id, prompt_tokens, started_at)
         
         print(f' AI response: {ai_response}')
         return ai_response
     
+    except DeadlineExceeded:
+        # Keep the interview moving; the fallback is stored so the rebuilt chat knows it was asked
+        session_store.append(interview_id, ROLE_INTERVIEWER, LLM_FALLBACK_RESPONSE)
+        return LLM_FALLBACK_RESPONSE
+    
     except Exception as e:
         error_msg = f'Error getting AI response: {str(e)}'
         print(f' {error_msg}')
@@ -535,44 +952,51 @@ Be encouraging and professional."""
         return "I'm having trouble processing that. Could you please repeat your answer?"
 
 
-def get_ai_response_streaming(session_id, user_text):
-    """Get AI interviewer response using Gemini with streaming"""
+def _tee_chunks(stream, chunks):
+    """yield from stream, keeping each chunk in chunks; returns the stream's value"""
+    try:
+        while True:
+            try:
+                chunk = next(stream)
+            except StopIteration as stop:
+                return stop.value
+            chunks.append(chunk)
+            yield chunk
+    finally:
+        stream.close()
+
+
+def get_ai_response_streaming(session_id, user_text, deadline=None):
+    """Get AI interviewer response using Gemini with streaming; a generic follow-up if deadline passes first
+
+    An error after part of the answer has streamed ends the answer there rather
+    than appending the apology to it.
+    """
+    streamed = []
     try:
         print(f' Getting AI response for session: {session_id}')
         print(f' User text: {user_text}')
         
-        # Initialize chat session if it doesn't exist
-        if session_id not in chat_sessions:
+        # Initialize the interview if it doesn't exist
+        interview_id = interview_id_for(session_id)
+        record = session_store.load(interview_id)
+        if record is None:
             print(f' Creating new chat session for: {session_id}')
-            chat_sessions[session_id] = gemini_model.start_chat()
-            conversation_histories[session_id] = []
+            record = start_interview_record(interview_id, None)
             
             # Get initial greeting with streaming
             initial_prompt = "Start the interview with a warm, professional greeting and your first question about the candidate's background. Keep it to 2-3 sentences."
             print(f' Sending initial prompt to Gemini...')
-            response_stream = chat_sessions[session_id].send_message(
-                initial_prompt,
-                stream=True
+            full_response, _ = yield from _tee_chunks(
+                stream_gemini_turn(interview_id, record, initial_prompt, deadline), streamed
             )
             
-            full_response = ""
-            for chunk in response_stream:
-                if chunk.text:
-                    full_response += chunk.text
-                    yield chunk.text
-            
-            conversation_histories[session_id].append({
-                'role': 'interviewer',
-                'content': full_response
-            })
+            session_store.append(interview_id, ROLE_INTERVIEWER, full_response)
             print(f' Initial response complete: {full_response}')
             return
         
         # Add user's response to history
-        conversation_histories[session_id].append({
-            'role': 'candidate',
-            'content': user_text
-        })
+        session_store.append(interview_id, ROLE_CANDIDATE, user_text)
         
         # Generate follow-up question with streaming
         prompt = f"""The candidate just said: "{user_text}"
@@ -580,38 +1004,345 @@ def get_ai_response_streaming(session_id, user_text):
 Based on their response, ask a relevant follow-up question or move to the next topic. Keep your response to 1-3 sentences. Be natural and conversational."""
         
         print(f' Sending follow-up prompt to Gemini...')
-        response_stream = chat_sessions[session_id].send_message(
-            prompt,
-            stream=True
+        started_at = time.perf_counter()
+        full_response, prompt_tokens = yield from _tee_chunks(
+            stream_gemini_turn(interview_id, record, prompt, deadline), streamed
         )
         
-        full_response = ""
-        for chunk in response_stream:
-            if chunk.text:
-                full_response += chunk.text
-                yield chunk.text
-        
         # Add AI's response to history
-        conversation_histories[session_id].append({
-            'role': 'interviewer',
-            'content': full_response
-        })
+        session_store.append(interview_id, ROLE_INTERVIEWER, full_response)
+        record_gemini_turn(interview_id, prompt_tokens, started_at)
         print(f' Follow-up response complete: {full_response}')
     
+    except DeadlineExceeded:
+        session_store.append(interview_id, ROLE_INTERVIEWER, LLM_FALLBACK_RESPONSE)
+        yield LLM_FALLBACK_RESPONSE
+    
     except Exception as e:
         error_msg = f'Error getting AI response: {str(e)}'
-        print(f' {error_msg}')
+        print(f'❌ {error_msg}')
         import traceback
         traceback.print_exc()
+        if streamed:
+            # The candidate already heard part of the answer; keep it in the history as said
+            session_store.append(interview_id, ROLE_INTERVIEWER, ''.join(streamed).strip())
+            return
         yield "I'm having trouble processing that. Could you please repeat?"
 
 
+def new_audio_buffer():
+    """Empty PCM buffer for one answer, capped per session and drawing on the worker-wide budget"""
+    return PCMBuffer(
+        AUDIO_SESSION_MAX_BYTES,
+        audio_memory_budget,
+        initial_bytes=int(AUDIO_PREALLOCATE_SECONDS * SAMPLE_RATE) * SAMPLE_WIDTH,
+    )
+
+
+def release_audio_buffer(session_id):
+    """Free a session's PCM buffer, if any"""
+    buffer = audio_stream_buffers.pop(session_id, None)
+    if buffer is not None:
+        buffer.release()
+
+
+def release_session(session_id):
+    """Free everything a socket session holds; the stored history stays for interviews resumable by id"""
+    interview_id = interview_ids.pop(session_id, session_id)
+    drop_chat(interview_id)
+    context_summaries.drop(interview_id)
+    if interview_id == session_id:
+        session_store.delete(interview_id)
+    blend_formats.pop(session_id, None)
+    streaming_sessions.pop(session_id, None)
+    ack_sessions.pop(session_id, None)
+    stt_stream_configs.pop(session_id, None)
+    endpointers.pop(session_id, None)
+    release_audio_buffer(session_id)
+    recognizer = stt_streams.pop(session_id, None)
+    if recognizer:
+        recognizer.cancel()
+
+
+def evict_session(session_id, reason):
+    """Release an idle or least recently active session and close its socket"""
+    release_session(session_id)
+    socketio.emit('session_expired', {'reason': reason}, room=session_id)
+    socketio.server.disconnect(session_id, namespace='/')
+
+
+def chat_text_bytes(chat):
+    """Approximate size of a live Gemini chat's history text"""
+    total = 0
+    for content in getattr(chat, 'history', None) or []:
+        for part in content.parts:
+            total += len(getattr(part, 'text', '') or '')
+    return total
+
+
+# Every connected socket session, by last activity: sessions idle for SESSION_IDLE_SECONDS are
+# reaped, and connecting past MAX_LIVE_SESSIONS evicts the least recently active one
+session_registry = SessionRegistry(
+    evict_session,
+    idle_ttl_seconds=float(os.environ.get('SESSION_IDLE_SECONDS', str(30 * 60))),
+    max_sessions=int(os.environ.get('MAX_LIVE_SESSIONS', '200')),
+)
+SESSION_REAP_INTERVAL_SECONDS = float(os.environ.get('SESSION_REAP_INTERVAL_SECONDS', '60'))
+session_registry.register_component(
+    'audio_buffer', lambda sid: audio_stream_buffers[sid].capacity if sid in audio_stream_buffers else 0
+)
+session_registry.register_component(
+    'stt_stream', lambda sid: stt_streams[sid].buffered_bytes if sid in stt_streams else 0
+)
+session_registry.register_component('chat', lambda sid: chat_text_bytes(chat_sessions.get(interview_id_for(sid))))
+session_registry.register_component('history', lambda sid: session_store.memory_bytes(interview_id_for(sid)))
+
+
+def build_recognition_config(encoding=ENCODING_LINEAR16, model='latest_long'):
+    """Speech-to-Text config for 16 kHz candidate answers (LINEAR16 unless compressed for upload)"""
+    return speech.RecognitionConfig(
+        encoding=STT_ENCODING_ENUMS[encoding],
+        sample_rate_hertz=16000,
+        language_code='en-US',
+        enable_automatic_punctuation=True,
+        model=model,  # latest_long for answers, latest_short for quick replies
+        use_enhanced=True,
+        profanity_filter=False,
+        enable_word_confidence=True,
+        enable_word_time_offsets=True,
+        speech_contexts=[speech.SpeechContext(
+            phrases=["interview", "experience", "project", "technology", "software", "developer"]
+        )]
+    )
+
+
+def recognize_pcm(pcm_bytes, route=None, deadline=None):
+    """Recognize one LINEAR16 buffer (optionally compressed for upload) and return the RecognizeResponse
+
+    Short requests are hedged; every route gives up when deadline passes.
+    """
+    deadline = deadline or Deadline()
+    deadline.check('stt')
+    audio_seconds = len(pcm_bytes) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    if route is None:
+        route = choose_stt_route(audio_seconds, audio_seconds, STT_SHORT_MAX_SECONDS, STT_SYNC_MAX_SECONDS)
+    
+    # Optionally compress for upload, on a native thread so other sessions keep streaming
+    encode_started = time.perf_counter()
+    upload_bytes, upload_encoding = run_blocking(encode_pcm, pcm_bytes, STT_UPLOAD_ENCODING)
+    stt_upload_stats['requests'] += 1
+    stt_upload_stats['pcm_bytes'] += len(pcm_bytes)
+    stt_upload_stats['uploaded_bytes'] += len(upload_bytes)
+    stt_upload_stats['encode_seconds'] += time.perf_counter() - encode_started
+    
+    audio = speech.RecognitionAudio(content=upload_bytes)
+    config = build_recognition_config(upload_encoding, ROUTE_MODELS[route])
+    print(f'🎤 Sending {len(upload_bytes)} bytes {upload_encoding} ({audio_seconds:.2f}s) to Speech-to-Text API via {route}...')
+    if route == ROUTE_SHORT:
+        return stt_hedger.run(
+            stt_pool,
+            lambda client, timeout: client.recognize(config=config, audio=audio, **grpc_timeout(timeout)),
+            deadline,
+            timeout_cap=300,
+        )
+    # At most 300 seconds (5 minutes) for the whole request, polling included
+    return recognize_routed(stt_pool.client, route, audio, config, timeout=deadline.timeout(300),
+                            poll_interval=STT_POLL_INTERVAL_SECONDS, run=stt_pool.run)
+
+
+def start_stt_stream(session_id):
+    """Open a streaming recognizer for the session's next answer, or None when not streaming"""
+    previous = stt_streams.pop(session_id, None)
+    if previous:
+        previous.cancel()
+    if not stt_stream_configs.get(session_id, {}).get('streaming', STT_STREAMING):
+        return None
+    
+    def on_interim(transcript, is_final):
+        socketio.emit('transcription_interim', {'transcript': transcript, 'final': is_final}, room=session_id)
+    
+    if STT_RECOGNIZER == 'fake':
+        recognizer = FakeRecognizer(socketio.start_background_task, on_interim)
+    elif stt_client:
+        if len(stt_streams) >= stt_stream_pool.size:
+            # Every stream thread is taken; this answer is recognized in one call when it ends
+            print(f'⚠️ No streaming recognition thread free - {session_id} falls back to batch recognition')
+            return None
+        recognizer = GoogleStreamingRecognizer(
+            stt_stream_pool, build_recognition_config(), socketio.start_background_task, on_interim
+        )
+    else:
+        return None
+    stt_streams[session_id] = recognizer
+    print(f'🎤 Streaming recognition started for session: {session_id}')
+    return recognizer
+
+
+class _SentenceJob:
+    """TTS for one sentence of a streamed response"""
+
+    def __init__(self, index, sentence, deadline):
+        self.index = index
+        self.sentence = sentence
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def stream_avatar_response(session_id, user_text, started_at=None, first_sound=None, deadline=None, shed=False):
+    """Pipeline streamed Gemini sentences into TTS and emit them as in-order avatar_speaks_chunk events
+
+    first_sound, if given, also records the time to the first sentence. The
+    first sentence must be spoken by the turn deadline; later ones, synthesized
+    while earlier ones play, get TTS_BUDGET_SECONDS each. A sentence whose
+    synthesis runs out of time (or, with shed, is not cached) is sent as text only.
+    """
+    started_at = started_at or time.perf_counter()
+    deadline = deadline or turn_deadline()
+    jobs = queue.Queue()
+    # Bound how far synthesis may run ahead of what has been emitted
+    synth_slots = threading.Semaphore(STREAMING_MAX_SYNTH_AHEAD)
+    emitter_done = threading.Event()
+    emitter_errors = []
+    sentences = []
+    emitted = []
+    voiced = []  # Sentences sent with audio
+    
+    def synthesize(job):
+        try:
+            job.result = generate_speech_clip(job.sentence, job.deadline, shed)
+        except Exception as e:
+            job.error = e
+        finally:
+            job.done.set()
+    
+    def emit_in_order():
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                job.done.wait()
+                synth_slots.release()
+                if isinstance(job.error, (DeadlineExceeded, LoadShed)):
+                    if isinstance(job.error, DeadlineExceeded):
+                        turn_fallbacks['tts'] += 1
+                    print(f'⏰ {str(job.error)} - sending sentence {job.index} without audio')
+                    payload = {'filename': None, 'transcript': job.sentence}
+                elif job.error is not None:
+                    print(f'❌ Skipping sentence {job.index} after TTS error: {job.error}')
+                    continue
+                else:
+                    clip, audio_filename = job.result
+                    payload = build_avatar_payload(clip, audio_filename, job.sentence, **blend_formats.get(session_id, {}))
+                payload['text_chunk'] = job.sentence + ' '
+                payload['index'] = job.index
+                
+                if not voiced and payload['filename']:
+                    first_audio = time.perf_counter() - started_at
+                    time_to_first_audio['streaming'].record(first_audio)
+                    if first_sound is not None:
+                        first_sound.record(first_audio)
+                    print(f'⏱️ First streamed audio after {first_audio:.2f}s')
+                print(f'📤 Sending avatar_speaks_chunk {job.index} with audio: {payload["filename"]}')
+                socketio.emit('avatar_speaks_chunk', payload, room=session_id)
+                emitted.append(job.index)
+                if payload['filename']:
+                    voiced.append(job.index)
+        except Exception as e:
+            print(f'❌ Streaming emitter failed: {str(e)}')
+            emitter_errors.append(e)
+        finally:
+            emitter_done.set()
+            # Never leave the producer blocked on a slot the emitter will not release
+            for _ in range(STREAMING_MAX_SYNTH_AHEAD):
+                synth_slots.release()
+    
+    socketio.start_background_task(emit_in_order)
+    try:
+        llm_deadline = deadline.within(TTS_BUDGET_SECONDS)
+        for index, sentence in enumerate(split_sentences(get_ai_response_streaming(session_id, user_text, llm_deadline))):
+            synth_slots.acquire()
+            if emitter_done.is_set():
+                break
+            sentences.append(sentence)
+            job = _SentenceJob(index, sentence, deadline if index == 0 else deadline.renewed(TTS_BUDGET_SECONDS))
+            socketio.start_background_task(synthesize, job)
+            jobs.put(job)
+    finally:
+        jobs.put(None)
+        emitter_done.wait()
+    if emitter_errors:
+        raise emitter_errors[0]
+    
+    transcript = ' '.join(sentences)
+    if sentences and not emitted:
+        socketio.emit('error', {'message': 'Failed to generate interviewer audio. Please try again.'}, room=session_id)
+    socketio.emit('avatar_speaks_complete', {'transcript': transcript}, room=session_id)
+    print(f'✅ Streamed {len(emitted)}/{len(sentences)} sentences in {time.perf_counter() - started_at:.2f}s')
+    return transcript
+
+
+def admit_turn(session_id, busy_reply=True):
+    """Wait for a turn slot, telling the client about any queue wait; None (after a busy event) when refused
+
+    With busy_reply the refusal is also spoken, from cached audio when available.
+    """
+    def on_queued(position, expected_wait):
+        print(f'🚦 Turn for {session_id} queued at position {position} (~{expected_wait:.1f}s)')
+        socketio.emit('busy', {
+            'queued': True,
+            'position': position,
+            'expectedWaitSeconds': round(expected_wait, 1),
+        }, room=session_id)
+    
+    ticket = admission.admit(on_queued)
+    if ticket is None:
+        print(f'🚦 No turn slot for {session_id} - asking the candidate to retry')
+        socketio.emit('busy', {
+            'queued': False,
+            'retryAfterSeconds': round(admission.expected_wait(admission.queue_depth + 1), 1),
+        }, room=session_id)
+        if busy_reply:
+            send_avatar_speech(session_id, BUSY_RESPONSE, shed=True)
+    return ticket
+
+
+def respond_to_candidate(session_id, user_text, deadline=None, shed=False):
+    """Run one interviewer turn: AI response, speech and animation, sent to the client
+
+    deadline is the turn's; Gemini must leave TTS_BUDGET_SECONDS of it for speech.
+    shed (admitted under overload) limits speech to cached audio.
+    """
+    session_registry.touch(session_id)
+    started_at = time.perf_counter()
+    deadline = deadline or turn_deadline()
+    # The client queues the real response right behind the acknowledgement
+    acknowledged = bool(user_text and user_text.strip()) and send_acknowledgement(session_id, started_at)
+    first_sound = None if acknowledged else time_to_first_sound['without_ack']
+    if streaming_sessions.get(session_id, STREAMING_TURNS):
+        return stream_avatar_response(session_id, user_text, started_at, first_sound, deadline, shed)
+    
+    ai_response = get_ai_response(session_id, user_text, deadline.within(TTS_BUDGET_SECONDS))
+    
+    # Generate speech and animation and send complete response to client
+    print(f'🎤 Generating speech for AI response...')
+    send_avatar_speech(session_id, ai_response, deadline=deadline, shed=shed)
+    first_audio = time.perf_counter() - started_at
+    time_to_first_audio['full'].record(first_audio)
+    if first_sound is not None:
+        first_sound.record(first_audio)
+    return ai_response
+
+
 # ==================== WebSocket Events ====================
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     print(f' Client connected: {request.sid}')
+    session_registry.add(request.sid)
     emit('connection_response', {'status': 'connected', 'session_id': request.sid})
 
 
@@ -619,11 +1350,53 @@ def handle_connect():
 def handle_disconnect():
     """Handle client disconnection"""
     print(f' Client disconnected: {request.sid}')
-    # Clean up chat session
-    if request.sid in chat_sessions:
-        del chat_sessions[request.sid]
-    if request.sid in conversation_histories:
-        del conversation_histories[request.sid]
+    session_registry.remove(request.sid)
+    release_session(request.sid)
+
+
+def greet_candidate(session_id, interview_id, position, shed=False):
+    """Open a new interview with a greeting, or welcome the candidate back to a stored one"""
+    # Initialize the chat session with system instruction
+    record = session_store.load(interview_id)
+    resumed = bool(record and record['turns'])
+    if not resumed:
+        record = start_interview_record(interview_id, position)
+        
+        # Create personalized greeting based on position
+        initial_prompt = f"""You are Alicia, a professional AI interviewer. Start the interview with:
+1. A warm, friendly greeting
+2. Introduce yourself
+3. Mention you'll be interviewing them for the {position} position
+4. Ask them to introduce themselves briefly
+
+Keep your greeting natural, warm and professional. Keep it to 2-3 sentences maximum."""
+        
+        print(f'🤖 Getting initial greeting for {position} position...')
+        deadline = turn_deadline()
+        try:
+            ai_greeting, _ = send_gemini_turn(interview_id, record, initial_prompt,
+                                              deadline.within(TTS_BUDGET_SECONDS))
+        except DeadlineExceeded:
+            ai_greeting = (f"Hi, I'm Alicia, and I'll be interviewing you for the {position} position today. "
+                           'Could you start by briefly introducing yourself?')
+        
+        session_store.append(interview_id, ROLE_INTERVIEWER, ai_greeting)
+    else:
+        # The chat is rebuilt from the stored turns on the routed model at the next answer
+        last_question = next(
+            (turn['content'] for turn in reversed(record['turns']) if turn['role'] == ROLE_INTERVIEWER), ''
+        )
+        ai_greeting = f"Welcome back! Let's continue where we left off. {last_question}".strip()
+        print(f'♻️ Resuming interview {interview_id} ({len(record["turns"])} stored turns)')
+        deadline = turn_deadline()
+    
+    emit('interview_session', {'interview_id': interview_id, 'resumed': resumed})
+    
+    # Generate speech and animation and send to client
+    print(f'🎤 Generating speech for greeting...')
+    send_avatar_speech(session_id, ai_greeting, deadline=deadline, shed=shed)
+    
+    print(f'✅ AI says: {ai_greeting}')
 
 
 @socketio.on('start_interview')
@@ -631,9 +1404,43 @@ def handle_start_interview(data):
     """Initialize the interview with a greeting"""
     try:
         session_id = request.sid
+        session_registry.touch(session_id)
         position = data.get('position', 'Software Engineer') if data else 'Software Engineer'
         print(f' Starting interview for session: {session_id}, position: {position}')
         
+        # Clients resume a stored interview (after a reconnect or a server restart) with interviewId
+        interview_id = str((data or {}).get('interviewId') or session_id)
+        interview_ids[session_id] = interview_id
+        
+        # Clients opt in to binary blend data with blendFormat: 'f32' | 'u16' | 'u8',
+        # or to decimated keyframes with blendFormat: 'keyframes' (+ optional keyframeTolerance)
+        data = data or {}
+        blend_formats[session_id] = {
+            'blend_format': normalize_blend_format(data.get('blendFormat')),
+            'keyframe_tolerance': float(data.get('keyframeTolerance') or KEYFRAME_TOLERANCE),
+        }
+        streaming_sessions[session_id] = bool(data.get('streaming', STREAMING_TURNS))
+        if data.get('acknowledge', ACK_RESPONSES):
+            ack_sessions.setdefault(session_id, '')
+            ack_pool.ensure_warm(socketio.start_background_task)
+        else:
+            ack_sessions.pop(session_id, None)
+        stt_stream_configs[session_id] = {
+            'streaming': bool(data.get('streamingStt', STT_STREAMING)),
+            'hands_free': bool(data.get('handsFree', HANDS_FREE)),
+            'end_silence_seconds': float(data.get('endSilenceSeconds') or HANDS_FREE_SILENCE_SECONDS),
+        }
+        
+        # After a cold start the clients may still be initializing; wait a little for the ones a turn needs
+        services.wait(('gemini', 'tts'), SERVICE_WAIT_SECONDS)
+        if services.starting('gemini', 'tts'):
+            print(f'⏳ Services still starting - asking {session_id} to retry')
+            emit('error', {
+                'message': 'The interviewer is still starting up. Please try again in a few seconds.',
+                'retryable': True
+            })
+            return
+        
         # Check if Gemini model is initialized
         if gemini_model is None:
             error_msg = 'Gemini model is not initialized. Cannot generate AI responses.'
@@ -648,44 +1455,18 @@ def handle_start_interview(data):
             emit('error', {'message': error_msg})
             return
         
-        # Initialize the chat session with system instruction
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = gemini_model.start_chat()
-            conversation_histories[session_id] = []
-            
-            # Create personalized greeting based on position
-            initial_prompt = f"""You are Alicia, a professional AI interviewer. Start the interview with:
-1. A warm, friendly greeting
-2. Introduce yourself
-3. Mention you'll be interviewing them for the {position} position
-4. Ask them to introduce themselves briefly
-
-Keep your greeting natural, warm and professional. Keep it to 2-3 sentences maximum."""
-            
-            print(f' Getting initial greeting for {position} position...')
-            response = chat_sessions[session_id].send_message(initial_prompt)
-            ai_greeting = response.text
-            
-            conversation_histories[session_id].append({
-                'role': 'interviewer',
-                'content': ai_greeting
+        # The greeting is a turn like any other; a full worker asks the client to retry
+        ticket = admit_turn(session_id, busy_reply=False)
+        if ticket is None:
+            emit('error', {
+                'message': 'The interviewer is busy with other candidates. Please try again in a few seconds.',
+                'retryable': True
             })
-        else:
-            ai_greeting = "Welcome back! Let's continue our interview. Please tell me about yourself."
-        
-        # Generate speech and animation
-        print(f'🎤 Generating speech for greeting...')
-        blend_data, audio_filename = generate_speech_and_animation(ai_greeting)
-        
-        # Send to client
-        print(f'📤 Sending avatar_speaks event with audio: {audio_filename}')
-        emit('avatar_speaks', {
-            'blendData': blend_data,
-            'filename': audio_filename,
-            'transcript': ai_greeting
-        })
-        
-        print(f'✅ AI says: {ai_greeting}')
+            return
+        try:
+            greet_candidate(session_id, interview_id, position, ticket.shed)
+        finally:
+            admission.release(ticket)
     
     except Exception as e:
         error_msg = str(e)
@@ -702,38 +1483,86 @@ Keep your greeting natural, warm and professional. Keep it to 2-3 sentences maxi
         })
 
 
+@socketio.on('end_interview')
+def handle_end_interview():
+    """Forget the interview: its live chat and stored history"""
+    interview_id = interview_ids.pop(request.sid, request.sid)
+    drop_chat(interview_id)
+    context_summaries.drop(interview_id)
+    session_store.delete(interview_id)
+    print(f'👋 Interview ended: {interview_id}')
+
+
 @socketio.on('audio_stream_start')
 def handle_audio_stream_start():
     """Handle start of audio streaming"""
     session_id = request.sid
+    session_registry.touch(session_id)
     print(f'️ Audio stream started for session: {session_id}')
     
     # Initialize buffer for this session
-    audio_stream_buffers[session_id] = []
+    release_audio_buffer(session_id)
+    audio_stream_buffers[session_id] = new_audio_buffer()
     
-    emit('stream_ready', {'status': 'ready'})
+    # Start recognizing while the candidate talks
+    recognizer = start_stt_stream(session_id)
+    
+    # Hands-free: watch for the end of the answer as chunks arrive
+    stt_config = stt_stream_configs.get(session_id, {})
+    hands_free = stt_config.get('hands_free', HANDS_FREE)
+    endpointers.pop(session_id, None)
+    if hands_free:
+        endpointers[session_id] = EndpointDetector(stt_config.get('end_silence_seconds', HANDS_FREE_SILENCE_SECONDS))
+    
+    emit('stream_ready', {'status': 'ready', 'streaming': recognizer is not None, 'handsFree': hands_free})
 
 
 @socketio.on('audio_stream_data')
 def handle_audio_stream_data(data):
-    """Handle incoming audio data chunks from client"""
+    """Handle incoming audio data chunks from client
+    
+    audio is a binary Int16 attachment, or a JSON list of ints from older clients.
+    """
     try:
         session_id = request.sid
+        session_registry.touch(session_id)
         audio_chunk = data.get('audio', [])
         
         if not audio_chunk:
             print(f'️ Received empty audio chunk for session: {session_id}')
             return
         
-        # Accumulate audio chunks in buffer
-        if session_id not in audio_stream_buffers:
-            audio_stream_buffers[session_id] = []
+        # The server already closed this answer; anything after it belongs to no turn
+        endpointer = endpointers.get(session_id)
+        if endpointer and endpointer.ended:
+            return
+        
+        # Accumulate raw PCM in the session's buffer
+        pcm_bytes = pcm_chunk_bytes(audio_chunk)
+        buffer = audio_stream_buffers.get(session_id)
+        if buffer is None:
+            buffer = audio_stream_buffers[session_id] = new_audio_buffer()
         
-        chunk_size = len(audio_chunk)
-        audio_stream_buffers[session_id].extend(audio_chunk)
+        chunk_size = sample_count(pcm_bytes)
+        already_limited = buffer.limit_reason is not None
+        accepted = buffer.append(pcm_bytes)
+        
+        recognizer = stt_streams.get(session_id)
+        if recognizer and accepted:
+            recognizer.feed(pcm_bytes if accepted == len(pcm_bytes) else pcm_bytes[:accepted])
+        
+        # Past the limit: the extra audio is dropped and the client is told once per answer
+        if buffer.limit_reason and not already_limited:
+            print(f'⚠️ Audio limit reached ({buffer.limit_reason}) for session {session_id}: '
+                  f'kept {sample_count(buffer)/16000:.1f}s, dropping further audio')
+            socketio.emit('audio_limit_reached', {
+                'reason': buffer.limit_reason,
+                'maxSeconds': AUDIO_SESSION_MAX_SECONDS,
+                'bufferedSeconds': sample_count(buffer) / SAMPLE_RATE,
+            }, room=session_id)
         
         # Log progress every few chunks
-        total_samples = len(audio_stream_buffers[session_id])
+        total_samples = sample_count(buffer)
         if total_samples % 8000 == 0 and total_samples > 0:  # Log every 0.5 seconds
             print(f' Buffered {total_samples} samples ({total_samples/16000:.2f}s) for session: {session_id}')
         
@@ -741,6 +1570,17 @@ def handle_audio_stream_data(data):
         if total_samples == chunk_size:
             print(f' First audio chunk received: {chunk_size} samples for session: {session_id}')
         
+        # Hands-free: close the turn once the candidate has stopped talking
+        if endpointer and accepted and endpointer.feed(pcm_bytes):
+            print(f'🔚 End of speech detected after {endpointer.trailing_silence_seconds:.2f}s of silence '
+                  f'({endpointer.speech_seconds:.2f}s of speech) for session: {session_id}')
+            socketio.emit('turn_closed', {
+                'reason': 'end_of_speech',
+                'speechSeconds': endpointer.speech_seconds,
+                'trailingSilenceSeconds': endpointer.trailing_silence_seconds,
+            }, room=session_id)
+            process_candidate_audio(session_id)
+        
     except Exception as e:
         print(f' Error processing audio chunk: {str(e)}')
         import traceback
@@ -762,116 +1602,166 @@ def handle_audio_chunk(data):
 def handle_audio_stream_end(data=None):
     """Handle end of audio streaming and process the complete audio"""
     session_id = request.sid
+    session_registry.touch(session_id)
+    endpointer = endpointers.pop(session_id, None)
+    if endpointer and endpointer.ended:
+        print(f'⚠️ Ignoring audio_stream_end - turn was already closed by the server for session: {session_id}')
+        return
+    process_candidate_audio(session_id)
+
+
+def process_candidate_audio(session_id):
+    """Recognize the session's buffered answer and respond to it on a background task"""
+    ended_at = time.perf_counter()
+    recognizer = stt_streams.pop(session_id, None)
+    # Take this answer's audio; the next audio_stream_start (or chunk) gets a fresh buffer
+    audio_buffer = audio_stream_buffers.pop(session_id, None)
     
     # Process audio in a background thread to prevent blocking and timeout
     def process_audio_async():
+        ticket = None
         try:
             print(f' Received audio_stream_end for session: {session_id}')
             
-            # Get accumulated audio from buffer
-            if session_id not in audio_stream_buffers or not audio_stream_buffers[session_id]:
+            if not audio_buffer:
                 print(f'️ No audio data buffered for session: {session_id}')
-                print(f'   Buffer exists: {session_id in audio_stream_buffers}')
-                if session_id in audio_stream_buffers:
-                    print(f'   Buffer length: {len(audio_stream_buffers[session_id])}')
+                print(f'   Buffer exists: {audio_buffer is not None}')
+                if recognizer:
+                    recognizer.cancel()
                 socketio.emit('transcription_result', {'transcript': '', 'confidence': 0}, room=session_id)
                 socketio.emit('error', {'message': 'No audio data received. Please speak clearly and try again.'}, room=session_id)
                 return
             
-            print(f' Processing {len(audio_stream_buffers[session_id])} audio samples for session: {session_id}')
-            
-            # Convert PCM samples to bytes
-            import struct
+            # Int16 view of the buffer (no copy)
+            audio_samples = pcm_samples(audio_buffer.view())
+            print(f'🎤 Processing {len(audio_samples)} audio samples for session: {session_id}')
             
             # If audio is too short, inform user
-            audio_samples = audio_stream_buffers[session_id]
-            min_samples = 16000 * 0.2  # 0.2 seconds minimum (very lenient)
+            min_samples = SAMPLE_RATE * 0.2  # 0.2 seconds minimum (very lenient)
             
             if len(audio_samples) < min_samples:
                 print(f'️ Audio too short: {len(audio_samples)} samples ({len(audio_samples)/16000:.2f}s) - minimum is {min_samples/16000:.2f}s')
-                # Clear the buffer
-                audio_stream_buffers[session_id] = []
+                if recognizer:
+                    recognizer.cancel()
                 socketio.emit('transcription_result', {'transcript': '', 'confidence': 0}, room=session_id)
                 socketio.emit('error', {'message': f'Recording too short ({len(audio_samples)/16000:.1f}s). Please hold the button longer and speak.'}, room=session_id)
                 return
             
-            # Check if audio has actual content (not just silence)
-            import array
-            audio_array = array.array('h', audio_samples)
-            max_amplitude = max(abs(min(audio_array)), abs(max(audio_array)))
-            print(f' Audio level check - Max amplitude: {max_amplitude} (threshold: 100)')
+            # Check if audio has actual content: frame energy and zero-crossing rate, not a single peak sample
+            max_amplitude = peak_amplitude(audio_buffer.view())
+            vad = detect_speech(audio_samples, padding_seconds=VAD_PADDING_SECONDS)
+            print(f'🔊 VAD: {vad.speech_seconds:.2f}s of speech in {vad.total_seconds:.2f}s '
+                  f'(noise floor {vad.noise_floor:.0f}, peak RMS {vad.peak_rms:.0f}, max amplitude {max_amplitude})')
+            vad_stats['answers'] += 1
+            vad_stats['received_seconds'] += vad.total_seconds
+            vad_stats['speech_seconds'] += vad.speech_seconds
             
-            if max_amplitude < 100:  # Very quiet or silence
-                print(f'️ Audio too quiet - max amplitude: {max_amplitude}')
-                audio_stream_buffers[session_id] = []
-                socketio.emit('transcription_result', {'transcript': '', 'confidence': 0}, room=session_id)
+            if not vad.is_speech:  # Silence, steady noise, or a stray click
+                print(f'⚠️ No speech detected - {vad.speech_seconds:.2f}s of speech-like frames')
+                vad_stats['rejected_silent'] += 1
+                if recognizer:
+                    recognizer.cancel()
+                socketio.emit('transcription_result', {'transcript': '', 'confidence': 0, 'speechSeconds': vad.speech_seconds}, room=session_id)
                 socketio.emit('error', {'message': 'Audio is too quiet. Please speak louder and closer to the microphone.'}, room=session_id)
                 return
             
-            audio_bytes = struct.pack(f'{len(audio_samples)}h', *audio_samples)
+            # The buffer already holds LINEAR16 bytes; only the speech span is copied out
+            if VAD_TRIM:
+                audio_bytes = bytes(audio_buffer.view()[vad.start_byte:vad.end_byte])
+            else:
+                audio_bytes = bytes(audio_buffer.view())
+            audio_samples = pcm_samples(audio_bytes)
+            audio_buffer.release()
+            vad_stats['sent_seconds'] += len(audio_samples) / SAMPLE_RATE
+            if VAD_TRIM and len(audio_samples) < vad.total_seconds * SAMPLE_RATE:
+                print(f'✂️ Trimmed silence: sending {len(audio_samples)/16000:.2f}s of {vad.total_seconds:.2f}s')
             
-            # Clear the buffer
-            audio_stream_buffers[session_id] = []
+            # Wait for a turn slot; time in the queue does not count against the turn's budget
+            ticket = admit_turn(session_id)
+            if ticket is None:
+                if recognizer:
+                    recognizer.cancel()
+                return
             
-            # Configure Speech-to-Text for LINEAR16 PCM with longer audio support
-            audio = speech.RecognitionAudio(content=audio_bytes)
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-                language_code='en-US',
-                enable_automatic_punctuation=True,
-                model='latest_long',  # Use latest_long model for better long audio support
-                use_enhanced=True,
-                profanity_filter=False,
-                enable_word_confidence=True,
-                enable_word_time_offsets=True,
-                speech_contexts=[speech.SpeechContext(
-                    phrases=["interview", "experience", "project", "technology", "software", "developer"]
-                )]
-            )
+            # The turn's budget runs from the end of the answer; recognition leaves Gemini and TTS their share
+            audio_seconds = len(audio_samples) / SAMPLE_RATE
+            deadline = turn_deadline(audio_seconds, time.perf_counter() - ended_at - ticket.waited)
+            stt_deadline = deadline.within(LLM_BUDGET_SECONDS + TTS_BUDGET_SECONDS)
+            stt_timed_out = False
             
-            # Transcribe audio with extended timeout
-            print(f' Sending {len(audio_bytes)} bytes ({len(audio_samples)/16000:.2f}s) to Speech-to-Text API...')
+            # The streaming recognizer already heard the whole answer; just wait for its final result
+            result = None
+            if recognizer:
+                result = recognizer.finish(stt_deadline.timeout(10))
+                if result is None:
+                    print('⚠️ Streaming recognition failed - falling back to batch recognition')
+                else:
+                    stt_latency['streaming'].record(time.perf_counter() - ended_at)
             
-            try:
-                # For long audio, use recognize with proper timeout handling
-                response = stt_client.recognize(config=config, audio=audio, timeout=300)  # 300 second (5 minute) timeout
-            except Exception as stt_error:
-                print(f' Speech-to-Text API error: {str(stt_error)}')
-                import traceback
-                traceback.print_exc()
-                socketio.emit('error', {'message': 'Speech recognition failed. Please try again.'}, room=session_id)
-                return
+            words = []
+            if result is None:
+                services.wait(('stt',), SERVICE_WAIT_SECONDS)
+                try:
+                    if STT_SEGMENT_SECONDS and audio_seconds > STT_SEGMENT_SECONDS:
+                        # Long answer: split at pauses and recognize the segments concurrently
+                        route = ROUTE_SEGMENTED
+                        spans = split_at_pauses(audio_bytes, STT_SEGMENT_SECONDS)
+                        print(f'🎤 Recognizing {audio_seconds:.2f}s as {len(spans)} segments with up to {STT_SEGMENT_WORKERS} workers')
+                        stitched = recognize_segments(
+                            lambda segment: recognize_pcm(segment, deadline=stt_deadline),
+                            audio_bytes, spans, STT_SEGMENT_WORKERS
+                        )
+                    else:
+                        # Route by duration: short model, synchronous long model, or long-running operation
+                        route = choose_stt_route(audio_seconds, vad.speech_seconds,
+                                                 STT_SHORT_MAX_SECONDS, STT_SYNC_MAX_SECONDS)
+                        stitched = stitch_responses([recognize_pcm(audio_bytes, route, stt_deadline)], [0.0])
+                except Exception as stt_error:
+                    if not stt_deadline.expired():
+                        print(f'❌ Speech-to-Text API error: {str(stt_error)}')
+                        import traceback
+                        traceback.print_exc()
+                        socketio.emit('error', {'message': 'Speech recognition failed. Please try again.'}, room=session_id)
+                        return
+                    # Out of time (whatever the client raised): ask the candidate to repeat instead
+                    print(f'⏰ Speech-to-Text missed the turn deadline: {str(stt_error)}')
+                    turn_fallbacks['stt'] += 1
+                    stt_timed_out = True
+                    stitched = {'transcript': ''}
+                else:
+                    stt_latency[route].record(time.perf_counter() - ended_at)
+                
+                if stitched['transcript']:
+                    result = (stitched['transcript'], stitched['confidence'])
+                    words = stitched['words']
             
-            if not response.results:
+            if not result or not result[0]:
                 print('️ No transcription results - audio may be silence or unclear')
                 print(f'   Audio was {len(audio_samples)/16000:.2f}s long with max amplitude {max_amplitude}')
                 socketio.emit('transcription_result', {'transcript': '', 'confidence': 0}, room=session_id)
                 # Ask user to repeat - more specific feedback
-                if max_amplitude < 500:
+                if stt_timed_out:
+                    ai_response = "Sorry, I missed that. Could you say it again?"
+                elif max_amplitude < 500:
                     ai_response = "I can barely hear you. Please speak much louder and closer to your microphone."
                 else:
                     ai_response = "I didn't quite catch that. Please speak more clearly and a bit slower."
                 
                 # Generate speech and animation for the clarification
-                blend_data, audio_filename = generate_speech_and_animation(ai_response)
-                socketio.emit('avatar_speaks', {
-                    'blendData': blend_data,
-                    'filename': audio_filename,
-                    'transcript': ai_response
-                }, room=session_id)
+                send_avatar_speech(session_id, ai_response, shed=ticket.shed)
                 return
             
             # Get the transcript
-            transcript = response.results[0].alternatives[0].transcript
-            confidence = response.results[0].alternatives[0].confidence if hasattr(response.results[0].alternatives[0], 'confidence') else 1.0
+            transcript, confidence = result
             
             print(f' Transcription: "{transcript}" (confidence: {confidence:.2%})')
             
             # Send transcription to client
             socketio.emit('transcription_result', {
                 'transcript': transcript,
-                'confidence': confidence
+                'confidence': confidence,
+                'speechSeconds': vad.speech_seconds,
+                'words': words
             }, room=session_id)
             
             # Process with AI only if transcript has meaningful content
@@ -879,29 +1769,12 @@ def handle_audio_stream_end(data=None):
                 print(' Very short transcript - asking user to elaborate')
                 ai_response = "I heard you, but could you elaborate a bit more on that?"
                 
-                blend_data, audio_filename = generate_speech_and_animation(ai_response)
-                socketio.emit('avatar_speaks', {
-                    'blendData': blend_data,
-                    'filename': audio_filename,
-                    'transcript': ai_response
-                }, room=session_id)
+                send_avatar_speech(session_id, ai_response, shed=ticket.shed)
                 return
             
-            # Get AI response based on user's answer
+            # Get AI response based on user's answer and send it to the client
             print(f' Getting AI response for: "{transcript}"')
-            ai_response = get_ai_response(session_id, transcript)
-            
-            # Generate speech and animation
-            print(f'🎤 Generating speech for AI response...')
-            blend_data, audio_filename = generate_speech_and_animation(ai_response)
-            
-            # Send complete response to client
-            print(f'📤 Sending avatar_speaks event with audio: {audio_filename}')
-            socketio.emit('avatar_speaks', {
-                'blendData': blend_data,
-                'filename': audio_filename,
-                'transcript': ai_response
-            }, room=session_id)
+            ai_response = respond_to_candidate(session_id, transcript, deadline, ticket.shed)
             
             print(f'✅ Complete AI response sent: {ai_response}')
         
@@ -919,14 +1792,14 @@ def handle_audio_stream_end(data=None):
             # Send a fallback response
             fallback_response = "I'm having some technical difficulties. Could you please try speaking again?"
             try:
-                blend_data, audio_filename = generate_speech_and_animation(fallback_response)
-                socketio.emit('avatar_speaks', {
-                    'blendData': blend_data,
-                    'filename': audio_filename,
-                    'transcript': fallback_response
-                }, room=session_id)
+                send_avatar_speech(session_id, fallback_response)
             except:
                 pass
+        finally:
+            if audio_buffer is not None:
+                audio_buffer.release()
+            if ticket is not None:
+                admission.release(ticket)
     
     # Start background processing with thread
     socketio.start_background_task(process_audio_async)
@@ -937,6 +1810,7 @@ def handle_text_message(data):
     """Handle text-based input (fallback for testing without audio)"""
     try:
         session_id = request.sid
+        session_registry.touch(session_id)
         user_text = data.get('text', '')
         
         if not user_text:
@@ -944,20 +1818,14 @@ def handle_text_message(data):
         
         print(f' Text message from {session_id}: {user_text}')
         
-        # Get AI response
-        ai_response = get_ai_response(session_id, user_text)
-        
-        # Generate speech and animation
-        print(f'🎤 Generating speech for text message response...')
-        blend_data, audio_filename = generate_speech_and_animation(ai_response)
-        
-        # Send to client
-        print(f'📤 Sending avatar_speaks event with audio: {audio_filename}')
-        emit('avatar_speaks', {
-            'blendData': blend_data,
-            'filename': audio_filename,
-            'transcript': ai_response
-        })
+        ticket = admit_turn(session_id)
+        if ticket is None:
+            return
+        try:
+            # Get AI response, generate speech and animation, and send to client
+            ai_response = respond_to_candidate(session_id, user_text, shed=ticket.shed)
+        finally:
+            admission.release(ticket)
         
         print(f'✅ AI responds: {ai_response}')
     
@@ -974,25 +1842,26 @@ def handle_text_message(data):
 
 @app.route('/audio/<filename>', methods=['GET'])
 def serve_audio(filename):
-    """Serve generated audio files"""
+    """Serve generated audio files (from memory when hot, with ETag and Range support)"""
     try:
-        filepath = os.path.join(AUDIO_DIR, filename)
-        print(f'📁 Serving audio file: {filepath}')
-        
-        # Check if file exists
-        if not os.path.exists(filepath):
-            print(f'❌ Audio file not found: {filepath}')
+        entry = audio_store.read(filename)
+        if entry is None:
+            print(f'❌ Audio file not found: {filename}')
             return jsonify({'error': f'Audio file not found: {filename}'}), 404
         
-        # Log file size
-        file_size = os.path.getsize(filepath)
-        print(f'✅ Audio file found: {filename} ({file_size} bytes)')
+        # Keep files that clients are still fetching pinned against eviction
+        audio_store.touch(filename)
+        audio_bytes, etag = entry
         
-        # Send file with proper CORS headers
-        response = send_file(filepath, mimetype='audio/mpeg')
+        # Names are unique per content, so the bytes behind a URL never change
+        response = Response(audio_bytes, mimetype='audio/mpeg')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'GET'
-        return response
+        
+        # Answers If-None-Match with 304 and Range requests with 206 partial content
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(audio_bytes))
     except Exception as e:
         print(f'❌ Error serving audio file {filename}: {str(e)}')
         import traceback
@@ -1003,24 +1872,28 @@ def serve_audio(filename):
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    readiness = services.status()
     status = {
-        'status': 'healthy',
+        'status': 'healthy' if readiness['complete'] else 'starting',
+        'ready': readiness['ready'],
+        'readiness': readiness,
         'timestamp': datetime.now().isoformat(),
-        'active_sessions': len(chat_sessions),
+        'active_sessions': len(session_registry),
+        'session_memory_bytes': session_registry.stats(top=0)['memory_bytes'],
         'tts_initialized': tts_client is not None,
         'stt_initialized': stt_client is not None,
         'gemini_initialized': gemini_model is not None
     }
     
-    # Check if critical services are available
-    if not tts_client:
+    # Check if critical services are available (once they have finished starting)
+    if readiness['complete'] and not tts_client:
         status['status'] = 'degraded'
         status['warnings'] = ['Text-to-Speech client not initialized - interviewer cannot speak']
-    if not stt_client:
+    if readiness['complete'] and not stt_client:
         if 'warnings' not in status:
             status['warnings'] = []
         status['warnings'].append('Speech-to-Text client not initialized - speech recognition disabled')
-    if not gemini_model:
+    if readiness['complete'] and not gemini_model:
         if 'warnings' not in status:
             status['warnings'] = []
         status['warnings'].append('Gemini model not initialized - AI responses disabled')
@@ -1029,6 +1902,41 @@ def health():
     return jsonify(status), status_code
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters for caches and pipelines"""
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'tts_cache': tts_cache.stats(),
+        'audio_store': audio_store.stats(),
+        'time_to_first_audio': {mode: stats.snapshot() for mode, stats in time_to_first_audio.items()},
+        'time_to_first_sound': {mode: stats.snapshot() for mode, stats in time_to_first_sound.items()},
+        'acknowledgements': ack_pool.stats(),
+        'stt_latency': {mode: stats.snapshot() for mode, stats in stt_latency.items()},
+        'audio_ingest': dict(audio_memory_budget.stats(), active_buffers=len(audio_stream_buffers)),
+        'vad': vad_stats,
+        'providers': {pool.name: pool.stats() for pool in provider_pools},
+        'models': model_router.stats(),
+        'deadlines': {
+            'turn_budget_seconds': TURN_BUDGET_SECONDS,
+            'fallbacks': turn_fallbacks,
+            'hedging': {'tts': tts_hedger.stats(), 'stt_short': stt_hedger.stats()},
+        },
+        'admission': admission.stats(),
+        'event_loop_lag': event_loop_lag.snapshot(),
+        'sessions': dict(session_registry.stats(), live_chats=len(chat_sessions)),
+        'session_store': dict(session_store.stats(), rehydrate=chat_rehydrate_latency.snapshot()),
+        'gemini_turns': {
+            'prompt_tokens': gemini_turn_stats['prompt_tokens'].snapshot(),
+            'latency': gemini_turn_stats['latency'].snapshot(),
+            'context_rebuilds': gemini_turn_stats['context_rebuilds'],
+            'token_budget': CONTEXT_TOKEN_BUDGET,
+            'summaries': context_summaries.stats(),
+        },
+        'stt_upload': dict(stt_upload_stats, encoding=STT_UPLOAD_ENCODING)
+    })
+
+
 @app.route('/talk', methods=['POST'])
 def talk():
     """Legacy endpoint for backward compatibility"""
@@ -1039,10 +1947,27 @@ def talk():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        blend_data, audio_filename = generate_speech_and_animation(text)
+        services.wait(('tts',), SERVICE_WAIT_SECONDS)
+        if services.starting('tts'):
+            return jsonify({'error': 'Text-to-Speech is still starting up', 'retryable': True}), 503
+        
+        clip, audio_filename = generate_speech_clip(text)
+        
+        # Opt-in binary body: uint32 header length + JSON header + packed frames x shapes buffer
+        blend_format = normalize_blend_format(data.get('format'))
+        if blend_format in BINARY_BLEND_FORMATS:
+            header, buffer = encode_blend_matrix(clip, blend_format)
+            header['filename'] = audio_filename
+            return Response(pack_blend_envelope(header, buffer), mimetype='application/octet-stream')
+        if blend_format == BLEND_FORMAT_KEYFRAMES:
+            tolerance = float(data.get('keyframeTolerance') or KEYFRAME_TOLERANCE)
+            return jsonify({
+                'blendKeyframes': encode_blend_keyframes(clip, tolerance),
+                'filename': audio_filename
+            })
         
         return jsonify({
-            'blendData': blend_data,
+            'blendData': blend_matrix_to_frames(clip),
             'filename': audio_filename
         })
     
@@ -1051,20 +1976,78 @@ def talk():
         return jsonify({'error': str(e)}), 500
 
 
-# Print startup summary
-print('\n' + '='*60)
-print('🚀 AI Interviewer Backend Server - Startup Summary')
-print('='*60)
-print(f'✅ Text-to-Speech: {"Initialized" if tts_client else "❌ FAILED - Interviewer cannot speak!"}')
-print(f'✅ Speech-to-Text: {"Initialized" if stt_client else "❌ FAILED - Speech recognition disabled!"}')
-print(f'✅ Gemini Model: {"Initialized" if gemini_model else "❌ FAILED - AI responses disabled!"}')
-print(f'✅ Audio Directory: {AUDIO_DIR} (exists: {os.path.exists(AUDIO_DIR)})')
-if project_id:
-    print(f'✅ Project ID: {project_id}')
-else:
-    print('⚠️  Project ID: Not set')
-print('='*60)
-print()
+# ==================== Service initialization ====================
+
+# How long a request waits for a service that is still starting before giving up
+SERVICE_WAIT_SECONDS = float(os.environ.get('SERVICE_WAIT_SECONDS', '20'))
+# Prime every gRPC channel and the first Gemini call once the clients exist
+SERVICE_WARMUP = os.environ.get('SERVICE_WARMUP', '').lower() in ('1', 'true', 'yes')
+
+
+def warm_up_tts():
+    for client in tts_pool.clients:
+        tts_pool.run(
+            client.synthesize_speech,
+            input=texttospeech.SynthesisInput(text='Hello.'),
+            voice=texttospeech.VoiceSelectionParams(
+                language_code='en-US', name=os.environ.get('VOICE_NAME', 'en-US-Neural2-F')
+            ),
+            audio_config=texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3),
+        )
+
+
+def warm_up_stt():
+    silence = speech.RecognitionAudio(content=bytes(int(0.1 * SAMPLE_RATE) * SAMPLE_WIDTH))
+    for client in stt_pool.clients:
+        stt_pool.run(client.recognize, config=build_recognition_config(model='latest_short'), audio=silence, timeout=30)
+
+
+def warm_up_gemini():
+    gemini_pool.run(gemini_model.generate_content, 'Reply with the single word: ready')
+
+
+def print_startup_summary():
+    print('\n' + '='*60)
+    print('🚀 AI Interviewer Backend Server - Startup Summary')
+    print('='*60)
+    print(f'✅ Text-to-Speech: {"Initialized" if tts_client else "❌ FAILED - Interviewer cannot speak!"}')
+    print(f'✅ Speech-to-Text: {"Initialized" if stt_client else "❌ FAILED - Speech recognition disabled!"}')
+    if not encoding_available(STT_UPLOAD_ENCODING):
+        print(f'⚠️  STT upload encoding {STT_UPLOAD_ENCODING} unavailable (install soundfile) - sending LINEAR16')
+    print(f'✅ Gemini Model: {"Initialized" if gemini_model else "❌ FAILED - AI responses disabled!"}')
+    print(f'✅ Audio Directory: {AUDIO_DIR} (exists: {os.path.exists(AUDIO_DIR)})')
+    if project_id:
+        print(f'✅ Project ID: {project_id}')
+    else:
+        print('⚠️  Project ID: Not set')
+    for name, service in services.status()['services'].items():
+        print(f'   {name}: {service["state"]} in {(service["seconds"] or 0) * 1000:.0f} ms')
+    print('='*60)
+    print()
+
+
+# Clients are built concurrently on native threads; warm-ups are optional and never gate readiness
+services = ServiceInitializer(socketio.start_background_task, run_blocking)
+services.add('tts', init_tts)
+services.add('stt', init_stt)
+services.add('gemini', init_gemini)
+if SERVICE_WARMUP:
+    services.add('warmup_tts', warm_up_tts, depends_on=('tts',), required=False, blocking=False)
+    services.add('warmup_stt', warm_up_stt, depends_on=('stt',), required=False, blocking=False)
+    services.add('warmup_gemini', warm_up_gemini, depends_on=('gemini',), required=False, blocking=False)
+# Synthesize acknowledgement clips up front when every session gets them by default
+if ACK_RESPONSES:
+    services.add('acknowledgements', lambda: ack_pool.ensure_warm(lambda warm: warm()),
+                 depends_on=('tts',), required=False, blocking=False)
+services.on_complete(print_startup_summary)
+services.start()
+
+# Watch for anything still blocking the event loop
+if os.environ.get('LOOP_LAG_MONITOR', 'true').lower() in ('1', 'true', 'yes'):
+    socketio.start_background_task(monitor_event_loop_lag, event_loop_lag, 0.1, socketio.sleep)
+
+# Evict sessions whose clients went away without a clean disconnect
+socketio.start_background_task(session_registry.run_reaper, SESSION_REAP_INTERVAL_SECONDS, socketio.sleep)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -1075,16 +2058,9 @@ if __name__ == '__main__':
      AI Interviewer Avatar Server Starting...
      Host: {host}
      Port: {port}
-     AI Model: {"Gemini 1.5 Flash (via Vertex AI)" if gemini_model else "❌ NOT INITIALIZED"}
-     Speech-to-Text: {"✅ Enabled" if stt_client else "❌ DISABLED"}
-     Text-to-Speech: {"✅ Enabled" if tts_client else "❌ DISABLED - Interviewer cannot speak!"}
+     Google services: initializing in the background (see /health for readiness)
     """)
     
-    if not tts_client:
-        print('\n⚠️  WARNING: Text-to-Speech is not initialized!')
-        print('   The interviewer will NOT be able to speak.')
-        print('   Check your GOOGLE_APPLICATION_CREDENTIALS and service account permissions.\n')
-    
     # Run with SocketIO
     socketio.run(
         app,
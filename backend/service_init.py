@@ -0,0 +1,135 @@
+"""
+Background initialization of external services
+Each service (TTS, STT, Gemini, optional warm-ups) starts concurrently off
+the request path, so the server can bind its port right away; handlers wait
+on the services they need and /health reports readiness and timings
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+STATE_PENDING = 'pending'
+STATE_INITIALIZING = 'initializing'
+STATE_READY = 'ready'
+STATE_FAILED = 'failed'
+
+
+class _Service:
+    def __init__(self, name, init, depends_on, required, blocking):
+        self.name = name
+        self.init = init
+        self.depends_on = tuple(depends_on)
+        self.required = required
+        self.blocking = blocking
+        self.state = STATE_PENDING
+        self.done = threading.Event()
+        self.started_at = None
+        self.seconds = None
+        self.error = None
+
+
+class ServiceInitializer:
+    """Runs named init functions concurrently, each once its dependencies are done
+
+    spawn(fn) starts a cooperative task; run(fn) runs blocking work (client
+    construction, credential lookup) without stalling the event loop.
+    """
+
+    def __init__(self, spawn, run):
+        self.spawn = spawn
+        self.run = run
+        self._services = OrderedDict()
+        self.started_at = None
+        self.finished_at = None
+        self._on_complete = []
+
+    def add(self, name, init, depends_on=(), required=True, blocking=True):
+        """Register init() for name; optional services (warm-ups) never affect readiness
+
+        blocking=False runs init() on the task itself, for work that already
+        offloads its own blocking calls (e.g. through a ProviderPool).
+        """
+        self._services[name] = _Service(name, init, depends_on, required, blocking)
+
+    def on_complete(self, callback):
+        """Call callback() once every service has finished (ready or failed)"""
+        self._on_complete.append(callback)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        for service in self._services.values():
+            self.spawn(self._initialize, service)
+        self.spawn(self._wait_all)
+
+    def _initialize(self, service):
+        for dependency in service.depends_on:
+            self._services[dependency].done.wait()
+        failed = [dependency for dependency in service.depends_on
+                  if self._services[dependency].state != STATE_READY]
+        service.state = STATE_INITIALIZING
+        service.started_at = time.perf_counter()
+        try:
+            if failed:
+                raise RuntimeError(f'dependency failed: {", ".join(failed)}')
+            if service.blocking:
+                self.run(service.init)
+            else:
+                service.init()
+            service.state = STATE_READY
+        except Exception as e:
+            service.state = STATE_FAILED
+            service.error = f'{type(e).__name__}: {e}'
+            print(f'❌ {service.name} failed to initialize: {service.error}')
+        finally:
+            service.seconds = time.perf_counter() - service.started_at
+            if service.state == STATE_READY:
+                print(f'✅ {service.name} ready in {service.seconds * 1000:.0f} ms')
+            service.done.set()
+
+    def _wait_all(self):
+        for service in self._services.values():
+            service.done.wait()
+        self.finished_at = time.perf_counter()
+        for callback in self._on_complete:
+            try:
+                callback()
+            except Exception as e:
+                print(f'❌ Startup callback error: {str(e)}')
+
+    def wait(self, names, timeout=None):
+        """Block until the named services are done; True if they are all ready"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in names:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not self._services[name].done.wait(remaining):
+                return False
+        return all(self._services[name].state == STATE_READY for name in names)
+
+    def ready(self, *names):
+        names = names or [name for name, service in self._services.items() if service.required]
+        return all(self._services[name].state == STATE_READY for name in names)
+
+    def starting(self, *names):
+        """True while any of the named services has not finished initializing"""
+        return any(not self._services[name].done.is_set() for name in names)
+
+    def done(self):
+        return self.finished_at is not None
+
+    def status(self):
+        services = {}
+        for name, service in self._services.items():
+            services[name] = {
+                'state': service.state,
+                'required': service.required,
+                'seconds': None if service.seconds is None else round(service.seconds, 3),
+            }
+            if service.error:
+                services[name]['error'] = service.error
+        return {
+            'ready': self.ready(),
+            'complete': self.done(),
+            'total_seconds': None if self.finished_at is None else round(self.finished_at - self.started_at, 3),
+            'services': services,
+        }
@@ -0,0 +1,138 @@
+"""
+Lifecycle of live socket sessions
+Tracks last activity for every connected session, evicts sessions that go
+idle or push the worker past its session cap (least recently active first),
+and reports how much memory each session holds per component
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+EVICT_IDLE = 'idle'
+EVICT_CAPACITY = 'capacity'
+
+
+class SessionRegistry:
+    """Last-activity registry with idle TTL, LRU cap and per-component memory accounting
+
+    on_evict(session_id, reason) must release everything the session holds;
+    it is called outside the registry lock.
+    """
+
+    def __init__(self, on_evict, idle_ttl_seconds=30 * 60, max_sessions=200):
+        self.on_evict = on_evict
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session_id -> [created_at, last_active_at], least recently active first
+        self._components = OrderedDict()  # name -> sizer(session_id) -> bytes
+        self.evicted = {EVICT_IDLE: 0, EVICT_CAPACITY: 0}
+        self.peak_sessions = 0
+
+    def register_component(self, name, sizer):
+        """Count sizer(session_id) bytes under name in memory reports"""
+        self._components[name] = sizer
+
+    def add(self, session_id):
+        """Register a new session; past the cap the least recently active ones are evicted"""
+        now = time.time()
+        evicted = []
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            while self.max_sessions and len(self._sessions) >= self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[0])
+                self.evicted[EVICT_CAPACITY] += 1
+            self._sessions[session_id] = [now, now]
+            self.peak_sessions = max(self.peak_sessions, len(self._sessions))
+        for victim in evicted:
+            self._evict(victim, EVICT_CAPACITY)
+
+    def touch(self, session_id):
+        """Record activity on a registered session (unknown or evicted sessions are ignored)"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry[1] = time.time()
+                self._sessions.move_to_end(session_id)
+
+    def remove(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def reap(self):
+        """Evict sessions idle for longer than the TTL; returns their ids"""
+        cutoff = time.time() - self.idle_ttl_seconds
+        expired = []
+        with self._lock:
+            while self._sessions:
+                session_id, (_, last_active_at) = next(iter(self._sessions.items()))
+                if last_active_at > cutoff:
+                    break
+                del self._sessions[session_id]
+                expired.append(session_id)
+            self.evicted[EVICT_IDLE] += len(expired)
+        for session_id in expired:
+            self._evict(session_id, EVICT_IDLE)
+        return expired
+
+    def run_reaper(self, interval_seconds=60, sleep=time.sleep):
+        """Loop forever reaping idle sessions (run as a background task)
+
+        Pass the server's cooperative sleep (socketio.sleep) so the loop never
+        blocks an event loop that is not monkey patched.
+        """
+        while True:
+            sleep(interval_seconds)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f'❌ Session reaper error: {str(e)}')
+
+    def _evict(self, session_id, reason):
+        print(f'🧹 Evicting session {session_id} ({reason})')
+        try:
+            self.on_evict(session_id, reason)
+        except Exception as e:
+            print(f'❌ Error evicting session {session_id}: {str(e)}')
+
+    def memory(self, session_id):
+        """Approximate bytes held by one session, per component"""
+        usage = {}
+        for name, sizer in self._components.items():
+            try:
+                usage[name] = int(sizer(session_id) or 0)
+            except Exception:
+                usage[name] = 0
+        return usage
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self, top=5):
+        now = time.time()
+        with self._lock:
+            sessions = [(session_id, entry[0], entry[1]) for session_id, entry in self._sessions.items()]
+        totals = dict.fromkeys(self._components, 0)
+        largest = []
+        for session_id, created_at, last_active_at in sessions:
+            usage = self.memory(session_id)
+            for name, size in usage.items():
+                totals[name] += size
+            largest.append({
+                'session_id': session_id,
+                'bytes': sum(usage.values()),
+                'components': usage,
+                'age_seconds': round(now - created_at, 1),
+                'idle_seconds': round(now - last_active_at, 1),
+            })
+        largest.sort(key=lambda session: session['bytes'], reverse=True)
+        return {
+            'live': len(sessions),
+            'peak': self.peak_sessions,
+            'max_sessions': self.max_sessions,
+            'idle_ttl_seconds': self.idle_ttl_seconds,
+            'evicted': dict(self.evicted),
+            'memory_bytes': dict(totals, total=sum(totals.values())),
+            'largest': largest[:top],
+        }
@@ -0,0 +1,233 @@
+"""
+Interview session state kept outside the live Gemini chat objects
+Stores the compact turn history of each interview (in memory with a TTL, or
+durably in SQLite) so a restarted or different worker can rebuild the chat
+and carry on where the candidate left off
+"""
+
+import abc
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+ROLE_INTERVIEWER = 'interviewer'
+ROLE_CANDIDATE = 'candidate'
+
+
+def new_record(position):
+    return {'position': position, 'turns': [], 'updated_at': time.time()}
+
+
+class SessionStore(abc.ABC):
+    """Interview id -> {'position', 'turns': [{'role', 'content'}], 'updated_at'}
+
+    Records are returned as copies; change them through create/append/delete.
+    """
+
+    @abc.abstractmethod
+    def load(self, interview_id):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def create(self, interview_id, position):
+        """Start an empty interview, replacing any stored one with the same id"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append(self, interview_id, role, content):
+        """Add one turn; creates the interview (without a position) if it does not exist"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, interview_id):
+        raise NotImplementedError
+
+    def memory_bytes(self, interview_id):
+        """Approximate process memory held for one interview (0 when kept on disk)"""
+        return 0
+
+    @abc.abstractmethod
+    def stats(self):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store; interviews idle for longer than ttl_seconds are dropped"""
+
+    def __init__(self, ttl_seconds=2 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._records = OrderedDict()  # interview_id -> record, least recently updated first
+        self.expired = 0
+
+    def _expire(self, now):
+        while self._records:
+            interview_id, record = next(iter(self._records.items()))
+            if now - record['updated_at'] <= self.ttl_seconds:
+                break
+            del self._records[interview_id]
+            self.expired += 1
+
+    def load(self, interview_id):
+        with self._lock:
+            self._expire(time.time())
+            record = self._records.get(interview_id)
+            if record is None:
+                return None
+            return dict(record, turns=list(record['turns']))
+
+    def create(self, interview_id, position):
+        with self._lock:
+            self._records.pop(interview_id, None)
+            self._records[interview_id] = new_record(position)
+
+    def append(self, interview_id, role, content):
+        now = time.time()
+        with self._lock:
+            record = self._records.pop(interview_id, None) or new_record(None)
+            record['turns'].append({'role': role, 'content': content})
+            record['updated_at'] = now
+            self._records[interview_id] = record
+            self._expire(now)
+
+    def delete(self, interview_id):
+        with self._lock:
+            self._records.pop(interview_id, None)
+
+    def memory_bytes(self, interview_id):
+        with self._lock:
+            record = self._records.get(interview_id)
+            return sum(len(turn['content']) for turn in record['turns']) if record else 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'interviews': len(self._records),
+                'turns': sum(len(record['turns']) for record in self._records.values()),
+                'expired': self.expired,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """Durable store in a local SQLite file (WAL), shared by every worker on the host"""
+
+    def __init__(self, path, ttl_seconds=24 * 3600, sweep_interval_seconds=300):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS interviews (
+                interview_id TEXT PRIMARY KEY,
+                position TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS turns (
+                interview_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (interview_id, seq)
+            );
+        """)
+        self._last_sweep = 0.0
+        self.expired = 0
+
+    def _sweep(self, now):
+        """Delete interviews idle for longer than the TTL, at most once per sweep interval"""
+        if now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = now
+        cutoff = now - self.ttl_seconds
+        with self._conn:
+            self._conn.execute('DELETE FROM turns WHERE interview_id IN '
+                               '(SELECT interview_id FROM interviews WHERE updated_at < ?)', (cutoff,))
+            self.expired += self._conn.execute('DELETE FROM interviews WHERE updated_at < ?', (cutoff,)).rowcount
+
+    def load(self, interview_id):
+        with self._lock:
+            row = self._conn.execute('SELECT position, updated_at FROM interviews WHERE interview_id = ?',
+                                     (interview_id,)).fetchone()
+            if row is None or time.time() - row[1] > self.ttl_seconds:
+                return None
+            turns = self._conn.execute('SELECT role, content FROM turns WHERE interview_id = ? ORDER BY seq',
+                                       (interview_id,)).fetchall()
+        return {
+            'position': row[0],
+            'turns': [{'role': role, 'content': content} for role, content in turns],
+            'updated_at': row[1],
+        }
+
+    def create(self, interview_id, position):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM turns WHERE interview_id = ?', (interview_id,))
+            self._conn.execute('INSERT OR REPLACE INTO interviews (interview_id, position, updated_at) VALUES (?, ?, ?)',
+                               (interview_id, position, now))
+
+    def append(self, interview_id, role, content):
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute('INSERT INTO interviews (interview_id, position, updated_at) VALUES (?, NULL, ?) '
+                                   'ON CONFLICT(interview_id) DO UPDATE SET updated_at = excluded.updated_at',
+                                   (interview_id, now))
+                self._conn.execute('INSERT INTO turns (interview_id, seq, role, content) '
+                                   'SELECT ?, COALESCE(MAX(seq), -1) + 1, ?, ? FROM turns WHERE interview_id = ?',
+                                   (interview_id, role, content, interview_id))
+            self._sweep(now)
+
+    def delete(self, interview_id):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM turns WHERE interview_id = ?', (interview_id,))
+            self._conn.execute('DELETE FROM interviews WHERE interview_id = ?', (interview_id,))
+
+    def stats(self):
+        with self._lock:
+            interviews = self._conn.execute('SELECT COUNT(*) FROM interviews').fetchone()[0]
+            turns = self._conn.execute('SELECT COUNT(*) FROM turns').fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'interviews': interviews,
+            'turns': turns,
+            'expired': self.expired,
+        }
+
+
+def build_session_store(backend='memory', path='sessions.db', ttl_seconds=None):
+    """SessionStore for a SESSION_STORE setting: 'memory' or 'sqlite'"""
+    backend = (backend or 'memory').lower()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(path, ttl_seconds=ttl_seconds or 24 * 3600)
+    if backend != 'memory':
+        raise ValueError(f'Unknown session store: {backend}')
+    return MemorySessionStore(ttl_seconds=ttl_seconds or 2 * 3600)
+
+
+def chat_history(record, context_prompt):
+    """Rebuild Gemini chat history as alternating [(role, text)] pairs from a stored interview
+
+    context_prompt stands in for the prompt that opened the interview. Candidate
+    turns become 'user' messages and interviewer turns 'model' messages; runs of
+    the same role are merged, and an unanswered trailing candidate turn is dropped
+    so the next send_message() keeps the roles alternating.
+    """
+    messages = [['user', context_prompt]]
+    for turn in record['turns']:
+        if turn['role'] == ROLE_CANDIDATE:
+            role, text = 'user', f'The candidate just said: "{turn["content"]}"'
+        else:
+            role, text = 'model', turn['content']
+        if messages[-1][0] == role:
+            messages[-1][1] += '\n\n' + text
+        else:
+            messages.append([role, text])
+    if messages[-1][0] == 'user':
+        messages.pop()
+    return [(role, text) for role, text in messages]
@@ -0,0 +1,118 @@
+"""
+Duration-aware routing of batch Speech-to-Text requests
+Quick replies go to the short-utterance model, medium answers to synchronous
+latest_long, and anything past the synchronous duration limit to
+long_running_recognize with polling (or, when enabled, to concurrent
+recognition of segments split at pauses)
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pcm_audio import SAMPLE_RATE, SAMPLE_WIDTH
+
+ROUTE_SHORT = 'short'
+ROUTE_SYNC_LONG = 'sync_long'
+ROUTE_LONG_RUNNING = 'long_running'
+ROUTE_SEGMENTED = 'segmented'  # split at pauses, segments recognized concurrently
+STT_ROUTES = (ROUTE_SHORT, ROUTE_SYNC_LONG, ROUTE_LONG_RUNNING, ROUTE_SEGMENTED)
+
+ROUTE_MODELS = {
+    ROUTE_SHORT: 'latest_short',
+    ROUTE_SYNC_LONG: 'latest_long',
+    ROUTE_LONG_RUNNING: 'latest_long',
+}
+
+# Synchronous recognize() rejects audio longer than one minute
+SYNC_LIMIT_SECONDS = 60.0
+
+
+def choose_stt_route(audio_seconds, speech_seconds, short_max_seconds=10.0, sync_max_seconds=55.0):
+    """Pick a route from the length of the audio being sent and the speech found in it"""
+    if audio_seconds > min(sync_max_seconds, SYNC_LIMIT_SECONDS):
+        return ROUTE_LONG_RUNNING
+    if speech_seconds <= short_max_seconds:
+        return ROUTE_SHORT
+    return ROUTE_SYNC_LONG
+
+
+def _call(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+
+def recognize_routed(client, route, audio, config, timeout=300, poll_interval=0.5, run=_call):
+    """Run one recognition request on the given route and return the RecognizeResponse
+
+    config must already carry ROUTE_MODELS[route] as its model. Blocking
+    client calls go through run(fn, *args, **kwargs), e.g. a ProviderPool.
+    """
+    if route != ROUTE_LONG_RUNNING:
+        return run(client.recognize, config=config, audio=audio, timeout=timeout)
+
+    operation = run(client.long_running_recognize, config=config, audio=audio)
+    deadline = time.monotonic() + timeout
+    # Poll instead of operation.result() so waiting yields to other sessions
+    while not run(operation.done):
+        if time.monotonic() > deadline:
+            operation.cancel()
+            raise TimeoutError(f'long_running_recognize did not finish within {timeout}s')
+        time.sleep(poll_interval)
+    return run(operation.result)
+
+
+def _seconds(offset):
+    """Word offset as float seconds (timedelta from proto-plus, or a raw Duration)"""
+    if offset is None:
+        return 0.0
+    if hasattr(offset, 'total_seconds'):
+        return offset.total_seconds()
+    return offset.seconds + offset.nanos / 1e9
+
+
+def stitch_responses(responses, offsets):
+    """Merge RecognizeResponses for consecutive segments into one transcript
+
+    offsets[i] is where segment i starts in the full answer (seconds); word
+    times are shifted by it. Returns {'transcript', 'confidence', 'words'}.
+    """
+    transcripts = []
+    confidences = []
+    words = []
+    for response, offset in zip(responses, offsets):
+        for result in response.results:
+            if not result.alternatives:
+                continue
+            alternative = result.alternatives[0]
+            text = alternative.transcript.strip()
+            if text:
+                transcripts.append(text)
+                confidences.append(getattr(alternative, 'confidence', 1.0) or 1.0)
+            for word in getattr(alternative, 'words', []):
+                words.append({
+                    'word': word.word,
+                    'start': round(offset + _seconds(word.start_time), 3),
+                    'end': round(offset + _seconds(word.end_time), 3),
+                    'confidence': getattr(word, 'confidence', 0.0),
+                })
+    return {
+        'transcript': ' '.join(transcripts),
+        'confidence': sum(confidences) / len(confidences) if confidences else 0.0,
+        'words': words,
+    }
+
+
+def recognize_segments(recognize_one, pcm_bytes, spans, max_workers=4):
+    """Recognize (start_sample, end_sample) spans of a PCM answer concurrently and stitch them in order
+
+    recognize_one(segment_bytes) must return a RecognizeResponse. At most
+    max_workers requests are in flight; the first failure is raised.
+    """
+    view = memoryview(pcm_bytes)
+
+    def run(span):
+        start, end = span
+        return recognize_one(bytes(view[start * SAMPLE_WIDTH:end * SAMPLE_WIDTH]))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(spans)))) as pool:
+        responses = list(pool.map(run, spans))
+    return stitch_responses(responses, [start / SAMPLE_RATE for start, _ in spans])
@@ -0,0 +1,152 @@
+"""
+Streaming speech recognition for candidate answers
+Each session's recognizer is fed audio as it arrives, so the transcript is
+ready almost as soon as the candidate stops talking
+"""
+
+import abc
+import math
+import queue
+import threading
+import time
+
+from google.cloud import speech
+
+
+class StreamingRecognizer(abc.ABC):
+    """Feeds audio chunks to a recognition backend on a background task
+
+    Subclasses implement _results(chunks), yielding (transcript, is_final, confidence)
+    for an iterator of raw LINEAR16 chunks.
+    """
+
+    def __init__(self, spawn, on_interim=None):
+        self.on_interim = on_interim
+        self._chunks = queue.Queue()
+        self._done = threading.Event()
+        self._cancelled = False
+        self.finals = []
+        self.confidences = []
+        self.error = None
+        self.bytes_fed = 0
+        self.started_at = time.perf_counter()
+        spawn(self._run)
+
+    def feed(self, pcm_bytes):
+        """Queue a chunk of 16-bit PCM audio"""
+        if pcm_bytes and not self._done.is_set():
+            self.bytes_fed += len(pcm_bytes)
+            self._chunks.put(bytes(pcm_bytes))
+
+    def finish(self, timeout=10):
+        """Close the stream and return (transcript, confidence), or None if recognition failed"""
+        self._chunks.put(None)
+        if not self._done.wait(timeout):
+            print(f'⚠️ Streaming recognition did not finish within {timeout}s')
+            return None
+        if self.error is not None:
+            return None
+        confidence = sum(self.confidences) / len(self.confidences) if self.confidences else 0.0
+        return ' '.join(self.finals).strip(), confidence
+
+    @property
+    def buffered_bytes(self):
+        """Audio fed but not yet sent to the backend"""
+        return sum(len(chunk) for chunk in list(self._chunks.queue) if chunk)
+
+    def cancel(self):
+        """Stop recognizing and drop any results"""
+        self._cancelled = True
+        self._chunks.put(None)
+
+    def _audio(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None or self._cancelled:
+                return
+            yield chunk
+
+    def _run(self):
+        try:
+            for transcript, is_final, confidence in self._results(self._audio()):
+                if self._cancelled:
+                    break
+                transcript = transcript.strip()
+                if is_final:
+                    if transcript:
+                        self.finals.append(transcript)
+                        self.confidences.append(confidence)
+                    partial = ' '.join(self.finals)
+                else:
+                    partial = ' '.join(self.finals + [transcript])
+                if self.on_interim and partial:
+                    self.on_interim(partial.strip(), is_final)
+        except Exception as e:
+            self.error = e
+            print(f'❌ Streaming recognition error: {str(e)}')
+        finally:
+            self._done.set()
+
+    @abc.abstractmethod
+    def _results(self, chunks):
+        raise NotImplementedError
+
+
+class GoogleStreamingRecognizer(StreamingRecognizer):
+    """Cloud Speech-to-Text streaming_recognize (streams are limited to about 5 minutes)
+
+    The blocking gRPC stream waits on one of pool's native threads for the
+    whole answer, so pool should be reserved for streams; only the results are
+    handled on the spawned task.
+    """
+
+    def __init__(self, pool, config, spawn, on_interim=None):
+        self.pool = pool
+        self.client = pool.client
+        self.streaming_config = speech.StreamingRecognitionConfig(config=config, interim_results=True)
+        super().__init__(spawn, on_interim)
+
+    def _results(self, chunks):
+        requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in chunks)
+        responses = self.pool.run(self.client.streaming_recognize, self.streaming_config, requests)
+        for response in self.pool.iterate(responses):
+            for result in response.results:
+                if not result.alternatives:
+                    continue
+                alternative = result.alternatives[0]
+                yield alternative.transcript, result.is_final, alternative.confidence or 1.0
+
+
+class FakeRecognizer(StreamingRecognizer):
+    """Offline stand-in that reveals a scripted transcript as audio arrives
+
+    Words are revealed at words_per_second of received audio; latency delays
+    each result to mimic a network round trip.
+    """
+
+    DEFAULT_TRANSCRIPT = (
+        'I worked on a team building a web application where I was responsible '
+        'for the backend services and the deployment pipeline'
+    )
+
+    def __init__(self, spawn, on_interim=None, transcript=None, words_per_second=2.5,
+                 latency=0.05, sample_rate=16000):
+        self.words = (transcript or self.DEFAULT_TRANSCRIPT).split()
+        self.words_per_second = words_per_second
+        self.latency = latency
+        self.sample_rate = sample_rate
+        super().__init__(spawn, on_interim)
+
+    def _results(self, chunks):
+        samples = 0
+        revealed = 0
+        for chunk in chunks:
+            samples += len(chunk) // 2
+            words = min(len(self.words), math.ceil(samples / self.sample_rate * self.words_per_second))
+            if words > revealed:
+                revealed = words
+                time.sleep(self.latency)
+                yield ' '.join(self.words[:revealed]), False, 0.0
+        if samples:
+            time.sleep(self.latency)
+            yield ' '.join(self.words), True, 0.9
@@ -0,0 +1,292 @@
+"""
+Two-tier cache for synthesized speech and its blend shape animation
+Bounded in-memory LRU backed by an on-disk store, with request coalescing
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+# A temp file this old was left by a write that never finished (e.g. a crashed worker)
+STALE_TEMP_SECONDS = 3600
+
+
+class _InFlight:
+    """A synthesis in progress that identical concurrent requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TTSCache:
+    """Cache of (audio bytes, animation clip) keyed on the full synthesis request"""
+
+    def __init__(self, cache_dir, max_entries=256, max_disk_bytes=200 * 1024 * 1024,
+                 max_memory_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self._remove_stale_temp_files()
+        # Entries only; a temp file still being written is counted once it is renamed into place
+        self._disk_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(cache_dir)
+            if entry.is_file() and not entry.name.endswith('.tmp')
+        )
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.coalesced_retries = 0  # Waiters that synthesized themselves after the shared call failed
+        self.errors = 0
+        self.synthesis_seconds = 0.0
+        self.saved_characters = 0
+
+    @staticmethod
+    def make_key(text, voice_name, speaking_rate, pitch, encoding):
+        """Stable key for one synthesis request"""
+        raw = '\x1f'.join([text, voice_name, repr(float(speaking_rate)), repr(float(pitch)), str(encoding)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_or_create(self, key, text, producer, wait_timeout=None, retry_on=()):
+        """Return (audio_bytes, clip) for key, calling producer() at most once across concurrent callers
+
+        Callers that find the same key in progress wait for it, for at most
+        wait_timeout seconds (TimeoutError after that). If that synthesis fails
+        with one of retry_on (e.g. the first caller ran out of its own time),
+        a waiter tries again with its own producer instead of sharing the error.
+        """
+        while True:
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.saved_characters += len(text)
+                    return entry
+
+                inflight = self._inflight.get(key)
+                owner = inflight is None
+                if owner:
+                    inflight = self._inflight[key] = _InFlight()
+                else:
+                    self.coalesced += 1
+                    self.saved_characters += len(text)
+            if owner:
+                return self._produce(key, text, producer, inflight)
+
+            if not inflight.done.wait(wait_timeout):
+                with self._lock:
+                    self.coalesced -= 1
+                    self.saved_characters -= len(text)
+                raise TimeoutError(f'coalesced synthesis still running after {wait_timeout:.2f}s')
+            if inflight.error is None:
+                return inflight.result
+            if not isinstance(inflight.error, retry_on):
+                raise inflight.error
+            with self._lock:
+                self.coalesced -= 1
+                self.saved_characters -= len(text)
+                self.coalesced_retries += 1
+
+    def _produce(self, key, text, producer, inflight):
+        """Load or synthesize key as the owner of inflight, then wake its waiters"""
+        try:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self.saved_characters += len(text)
+            else:
+                start = time.perf_counter()
+                entry = producer()
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.misses += 1
+                    self.synthesis_seconds += elapsed
+                self._save_to_disk(key, entry)
+
+            self._remember(key, entry)
+            inflight.result = entry
+            return entry
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.done.set()
+
+    def peek(self, key, text):
+        """Cached (audio_bytes, clip) for key, or None; never synthesizes"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.saved_characters += len(text)
+                return entry
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self.saved_characters += len(text)
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        entry[1].setflags(write=False)  # Shared between sessions, never modified in place
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= self._entry_bytes(previous)
+            self._memory[key] = entry
+            self._memory_bytes += self._entry_bytes(entry)
+            # Bounded by count and by bytes: a long reply's clip alone can be megabytes
+            while self._memory and (len(self._memory) > self.max_entries
+                                    or self._memory_bytes > self.max_memory_bytes):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= self._entry_bytes(evicted)
+
+    @staticmethod
+    def _entry_bytes(entry):
+        audio, clip = entry
+        return len(audio) + clip.nbytes
+
+    def _paths(self, key):
+        return os.path.join(self.cache_dir, f'{key}.mp3'), os.path.join(self.cache_dir, f'{key}.npy')
+
+    def audio_path(self, key):
+        """Path of key's MP3 in the disk tier (may not exist if the entry was never saved or is evicted)"""
+        return self._paths(key)[0]
+
+    def _load_from_disk(self, key):
+        audio_path, clip_path = self._paths(key)
+        try:
+            with open(audio_path, 'rb') as audio_file:
+                audio = audio_file.read()
+            clip = np.load(clip_path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        # Touch so disk eviction is least-recently-used
+        now = time.time()
+        for path in (audio_path, clip_path):
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return audio, clip
+
+    def _save_to_disk(self, key, entry):
+        audio, clip = entry
+        audio_path, clip_path = self._paths(key)
+        # Write to temp files of our own first so a crash never leaves a half-written entry
+        # and concurrent writers of the same key never share one
+        temp_paths = []
+        added = 0
+        try:
+            for path, write in ((clip_path, lambda f: np.save(f, clip, allow_pickle=False)),
+                                (audio_path, lambda f: f.write(audio))):
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                temp_paths.append(temp_path)
+                with os.fdopen(fd, 'wb') as temp_file:
+                    write(temp_file)
+            for path, temp_path in zip((clip_path, audio_path), temp_paths):
+                size = os.path.getsize(temp_path)
+                try:
+                    replaced = os.path.getsize(path)
+                except OSError:
+                    replaced = 0
+                os.replace(temp_path, path)
+                added += size - replaced
+        except OSError as e:
+            print(f'⚠️ Could not write TTS cache entry {key[:12]}: {e}')
+            for temp_path in temp_paths:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return
+
+        with self._lock:
+            self._disk_bytes += added
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _remove_stale_temp_files(self):
+        """Delete temp files abandoned by writes that never finished"""
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        for entry in os.scandir(self.cache_dir):
+            if not (entry.is_file() and entry.name.endswith('.tmp')):
+                continue
+            try:
+                size = entry.stat().st_size
+                if entry.stat().st_mtime > cutoff:
+                    continue
+                os.remove(entry.path)
+            except OSError:
+                continue
+            with self._lock:
+                self._disk_bytes -= size
+
+    def _evict_disk(self):
+        """Remove least recently used disk entries until under the byte budget"""
+        self._remove_stale_temp_files()
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.is_file() and entry.name.endswith('.mp3')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            with self._lock:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+            key = entry.name[:-len('.mp3')]
+            for path in self._paths(key):
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._disk_bytes -= size
+
+    def stats(self):
+        """Hit/miss counters and an estimate of the TTS latency and characters saved"""
+        with self._lock:
+            served_from_cache = self.hits + self.disk_hits + self.coalesced
+            lookups = served_from_cache + self.misses
+            mean_synthesis = self.synthesis_seconds / self.misses if self.misses else 0.0
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_bytes': self._disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'coalesced': self.coalesced,
+                'coalesced_retries': self.coalesced_retries,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': served_from_cache / lookups if lookups else 0.0,
+                'mean_synthesis_seconds': mean_synthesis,
+                'estimated_seconds_saved': served_from_cache * mean_synthesis,
+                'characters_saved': self.saved_characters,
+            }
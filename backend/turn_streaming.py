@@ -0,0 +1,34 @@
+"""
+Sentence-level streaming for interviewer turns
+Splits streamed LLM tokens into sentences so each can be synthesized while generation continues
+"""
+
+import re
+
+# Sentence-ending punctuation (plus closing quotes/brackets) followed by whitespace.
+# Requiring the whitespace means "3.5" or "e.g" mid-token never splits early.
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s)')
+
+
+def split_sentences(chunks, min_chars=24):
+    """Yield complete sentences from an iterable of text chunks as soon as they end
+
+    Sentences shorter than min_chars are merged with the next one so a lone
+    "Great." doesn't cost a whole TTS round trip.
+    """
+    buffer = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        while True:
+            boundary = next((m for m in _SENTENCE_END.finditer(buffer) if m.end() >= min_chars), None)
+            if boundary is None:
+                break
+            sentence = buffer[:boundary.end()].strip()
+            buffer = buffer[boundary.end():].lstrip()
+            if sentence:
+                yield sentence
+
+    if buffer.strip():
+        yield buffer.strip()
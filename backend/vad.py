@@ -0,0 +1,194 @@
+"""
+Energy / zero-crossing voice activity detection for 16-bit PCM
+Finds where speech starts and ends in a recording so silence can be trimmed
+before it is sent to Speech-to-Text
+"""
+
+import numpy as np
+
+from pcm_audio import SAMPLE_RATE, SAMPLE_WIDTH, pcm_samples
+
+FRAME_SECONDS = 0.02  # 20 ms analysis frames
+
+# A frame is speech when its RMS clears both an absolute floor and a multiple of the
+# recording's own noise floor, so a steady hiss or hum never counts as talking.
+MIN_SPEECH_RMS = 150.0
+NOISE_FLOOR_RATIO = 3.0
+# Cap on the adaptive threshold, so an answer with no pauses (whose "noise floor" is
+# itself speech) is still detected
+MAX_SPEECH_THRESHOLD = 800.0
+# Quieter frames with a high zero-crossing rate are unvoiced consonants (s, f, th)
+FRICATIVE_ZCR = 0.25
+
+
+class VADResult:
+    """Speech span found in a recording, in samples and seconds"""
+
+    def __init__(self, start_sample, end_sample, speech_frames, total_samples, noise_floor, peak_rms,
+                 frame_samples, min_speech_seconds):
+        self.start_sample = start_sample
+        self.end_sample = end_sample
+        self.speech_seconds = speech_frames * frame_samples / SAMPLE_RATE
+        self.total_seconds = total_samples / SAMPLE_RATE
+        self.noise_floor = noise_floor
+        self.peak_rms = peak_rms
+        self.is_speech = self.speech_seconds >= min_speech_seconds
+
+    @property
+    def start_byte(self):
+        return self.start_sample * SAMPLE_WIDTH
+
+    @property
+    def end_byte(self):
+        return self.end_sample * SAMPLE_WIDTH
+
+    @property
+    def trimmed_seconds(self):
+        return (self.end_sample - self.start_sample) / SAMPLE_RATE
+
+    def as_dict(self):
+        return {
+            'speech_seconds': round(self.speech_seconds, 3),
+            'total_seconds': round(self.total_seconds, 3),
+            'trimmed_seconds': round(self.trimmed_seconds, 3),
+            'noise_floor': round(self.noise_floor, 1),
+            'peak_rms': round(self.peak_rms, 1),
+            'is_speech': self.is_speech,
+        }
+
+
+def frame_features(samples, frame_samples):
+    """Per-frame RMS energy and zero-crossing rate (trailing partial frame ignored)"""
+    frames = len(samples) // frame_samples
+    if not frames:
+        return np.zeros(0, np.float32), np.zeros(0, np.float32)
+    framed = samples[:frames * frame_samples].reshape(frames, frame_samples).astype(np.float32)
+    rms = np.sqrt(np.mean(framed * framed, axis=1))
+    signs = np.signbit(framed)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_samples - 1)
+    return rms, zcr.astype(np.float32)
+
+
+def speech_frames(rms, zcr, noise_floor=None):
+    """Boolean mask of frames that look like speech"""
+    if not rms.size:
+        return np.zeros(0, bool)
+    if noise_floor is None:
+        noise_floor = float(np.percentile(rms, 10))
+    threshold = max(MIN_SPEECH_RMS, min(noise_floor * NOISE_FLOOR_RATIO, MAX_SPEECH_THRESHOLD))
+    voiced = rms >= threshold
+    unvoiced = (rms >= threshold * 0.5) & (zcr >= FRICATIVE_ZCR)
+    return voiced | unvoiced
+
+
+def detect_speech(pcm, padding_seconds=0.2, min_speech_seconds=0.15, frame_seconds=FRAME_SECONDS):
+    """Locate speech in a PCM buffer (bytes-like or Int16 array)
+
+    The span runs from the first to the last speech frame, widened by
+    padding_seconds on each side so word onsets and tails are not clipped.
+    """
+    samples = pcm if isinstance(pcm, np.ndarray) else pcm_samples(pcm)
+    frame_samples = max(1, int(SAMPLE_RATE * frame_seconds))
+    rms, zcr = frame_features(samples, frame_samples)
+    mask = speech_frames(rms, zcr)
+    noise_floor = float(np.percentile(rms, 10)) if rms.size else 0.0
+    peak_rms = float(rms.max()) if rms.size else 0.0
+
+    active = np.flatnonzero(mask)
+    if not active.size:
+        return VADResult(0, 0, 0, len(samples), noise_floor, peak_rms, frame_samples, min_speech_seconds)
+
+    padding = int(padding_seconds * SAMPLE_RATE)
+    start = max(0, int(active[0]) * frame_samples - padding)
+    end = min(len(samples), (int(active[-1]) + 1) * frame_samples + padding)
+    return VADResult(start, end, active.size, len(samples), noise_floor, peak_rms, frame_samples, min_speech_seconds)
+
+
+class EndpointDetector:
+    """Incremental end-of-utterance detection over streamed PCM chunks
+
+    feed() returns True once, when at least min_speech_seconds of speech has
+    been followed by trailing_silence_seconds without any.
+    """
+
+    def __init__(self, trailing_silence_seconds=0.8, min_speech_seconds=0.3, frame_seconds=FRAME_SECONDS):
+        self.frame_samples = max(1, int(SAMPLE_RATE * frame_seconds))
+        self.frame_seconds = self.frame_samples / SAMPLE_RATE
+        self.trailing_silence_frames = int(round(trailing_silence_seconds / self.frame_seconds))
+        self.min_speech_frames = int(round(min_speech_seconds / self.frame_seconds))
+        self.noise_floor = None
+        self.speech_frames = 0
+        self.silent_run = 0
+        self.ended = False
+        self._carry = b''
+
+    @property
+    def speech_seconds(self):
+        return self.speech_frames * self.frame_seconds
+
+    @property
+    def trailing_silence_seconds(self):
+        return self.silent_run * self.frame_seconds
+
+    def feed(self, pcm_bytes):
+        if self.ended:
+            return False
+        data = self._carry + bytes(pcm_bytes) if self._carry else pcm_bytes
+        frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        usable = len(data) - len(data) % frame_bytes
+        self._carry = bytes(data[usable:])
+        if not usable:
+            return False
+
+        rms, zcr = frame_features(pcm_samples(data[:usable]), self.frame_samples)
+        # Noise floor follows the quietest frames, rising only slowly so speech never becomes "noise"
+        chunk_floor = float(np.percentile(rms, 10))
+        self.noise_floor = chunk_floor if self.noise_floor is None else min(chunk_floor, self.noise_floor * 1.1)
+        active = np.flatnonzero(speech_frames(rms, zcr, self.noise_floor))
+
+        if active.size:
+            self.speech_frames += active.size
+            self.silent_run = len(rms) - 1 - int(active[-1])
+        else:
+            self.silent_run += len(rms)
+
+        if self.speech_frames >= self.min_speech_frames and self.silent_run >= self.trailing_silence_frames:
+            self.ended = True
+        return self.ended
+
+
+def split_at_pauses(pcm, max_segment_seconds=25.0, min_pause_seconds=0.3, frame_seconds=FRAME_SECONDS):
+    """Split a recording into consecutive (start_sample, end_sample) spans no longer than max_segment_seconds
+
+    Spans are balanced (no stray one-second tail) and each cut goes in the
+    middle of the pause of at least min_pause_seconds nearest the balanced
+    length, so words are never split; with no pause in reach it is a hard cut.
+    """
+    samples = pcm if isinstance(pcm, np.ndarray) else pcm_samples(pcm)
+    total = len(samples)
+    frame_samples = max(1, int(SAMPLE_RATE * frame_seconds))
+    max_segment = int(max_segment_seconds * SAMPLE_RATE)
+    if total <= max_segment:
+        return [(0, total)] if total else []
+
+    rms, zcr = frame_features(samples, frame_samples)
+    silent = ~speech_frames(rms, zcr)
+    # Runs of silent frames: [start, end) frame indexes
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    min_pause = max(1, int(round(min_pause_seconds / frame_seconds)))
+    long_runs = run_ends - run_starts >= min_pause
+    cut_points = ((run_starts[long_runs] + run_ends[long_runs]) // 2) * frame_samples
+
+    spans = []
+    start = 0
+    while total - start > max_segment:
+        remaining = total - start
+        target = start + remaining // -(-remaining // max_segment)  # Even split of what is left
+        candidates = cut_points[(cut_points > start + max_segment // 4) & (cut_points <= start + max_segment)]
+        cut = int(candidates[np.argmin(np.abs(candidates - target))]) if candidates.size else target
+        spans.append((start, cut))
+        start = cut
+    spans.append((start, total))
+    return spans